@@ -0,0 +1,46 @@
+"""
+Compare stored benchmark results against a baseline.
+
+Runs are selected by run id, label, driver version or git SHA prefix; samples
+of all matching runs are pooled per benchmark. Exits with status 1 if any
+benchmark regressed significantly. Run from the app directory:
+
+    PYTHONPATH=. python benchmarks/compare_results.py --baseline baseline
+    PYTHONPATH=. python benchmarks/compare_results.py --baseline 1a2b3c4d --current 5e6f7a8b
+"""
+import argparse
+import sys
+from src.utils.benchmark_store import BenchmarkStore, format_comparison
+from src.utils.config_util import load_config
+
+
+def main():
+    benchmark_config = load_config().get("benchmark", {})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", default=benchmark_config.get("store", "reports/benchmarks.jsonl"),
+                        help="Benchmark results JSONL file")
+    parser.add_argument("--baseline", required=True, help="Selector of the baseline run(s)")
+    parser.add_argument("--current", default=None, help="Selector of the current run(s) (default: latest run)")
+    parser.add_argument("--alpha", type=float, default=benchmark_config.get("alpha", 0.05),
+                        help="Significance level")
+    parser.add_argument("--min-change", type=float, default=benchmark_config.get("min_change", 0.05),
+                        help="Minimum relative change of the median")
+    parser.add_argument("--min-samples", type=int, default=benchmark_config.get("min_samples", 3),
+                        help="Minimum samples on each side")
+    args = parser.parse_args()
+
+    store = BenchmarkStore(args.store)
+    current = args.current or store.latest_run_id()
+    if current is None:
+        print(f"No benchmark results in {args.store}")
+        return 2
+
+    results = store.compare(current, args.baseline, alpha=args.alpha,
+                            min_change=args.min_change, min_samples=args.min_samples)
+    print(f"Current: {current}  Baseline: {args.baseline}")
+    print(format_comparison(results))
+    return 1 if any(result["verdict"] == "regression" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
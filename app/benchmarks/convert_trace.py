@@ -0,0 +1,40 @@
+"""
+Convert an access trace to the compact CSV format replayed by the trace replay feature.
+
+Input is strace output (recorded with
+`strace -f -tt -e trace=%file,read,pread64,lseek,close,getdents64 -o app.strace <command>`),
+a Parquet file or a CSV trace. Only accesses under --mount are kept. Run from the app directory:
+
+    PYTHONPATH=. python benchmarks/convert_trace.py app.strace traces/app.csv --mount /data
+"""
+import argparse
+import sys
+from src.utils.config_util import load_config
+from src.utils.trace_replay import load_trace, write_csv_trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="strace output, .parquet or .csv trace")
+    parser.add_argument("destination", help="CSV trace to write")
+    parser.add_argument("--mount", default=load_config().get("replay", {}).get("mount_path", "/data"),
+                        help="Mount point the recorded paths are relative to")
+    args = parser.parse_args()
+
+    records = load_trace(args.source, args.mount)
+    if not records:
+        print(f"No accesses under {args.mount} in {args.source}")
+        return 1
+    with open(args.destination, "w", newline="") as file:
+        write_csv_trace(records, file)
+    counts = {}
+    for record in records:
+        counts[record["op"]] = counts.get(record["op"], 0) + 1
+    span = records[-1]["timestamp"] - records[0]["timestamp"]
+    print(f"Wrote {len(records)} operations over {span:.1f}s to {args.destination}: "
+          + ", ".join(f"{count} {op}" for op, count in sorted(counts.items())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
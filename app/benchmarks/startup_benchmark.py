@@ -0,0 +1,84 @@
+"""
+Startup benchmark for the test harness.
+
+Measures how long it takes before any test talks to the cluster: pytest
+collection of the whole suite and of each step module on its own, and
+loading the settings file. Run from the app directory:
+
+    PYTHONPATH=. python benchmarks/startup_benchmark.py --runs 5
+"""
+import argparse
+import glob
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_command(command, runs):
+    """
+    Run a command repeatedly in a fresh interpreter and time it.
+
+    Args:
+        command (list): Command and arguments to run.
+        runs (int): Number of runs.
+
+    Returns:
+        list: Wall-clock durations in seconds.
+    """
+    durations = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start_time)
+    return durations
+
+
+def bench_collect(runs):
+    """Time `pytest --collect-only` over the step modules."""
+    return time_command([sys.executable, "-m", "pytest", "src/tests", "--collect-only", "-q"], runs)
+
+
+def bench_targeted_collect(runs):
+    """Time collecting each step module on its own, as a targeted run would."""
+    results = {}
+    for path in sorted(glob.glob("src/tests/*.py")):
+        if os.path.basename(path) in ("__init__.py", "conftest.py"):
+            continue
+        results[path] = time_command(
+            [sys.executable, "-m", "pytest", path, "--collect-only", "-q"], runs
+        )
+    return results
+
+
+def bench_config_load(iterations):
+    """Time repeated configuration loads in one process."""
+    from src.utils.config_util import load_config
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        load_config()
+    return [(time.perf_counter() - start_time) / iterations]
+
+
+def report(name, durations):
+    """Print min/median/max for a benchmark in milliseconds."""
+    print(f"{name:<70} min={min(durations) * 1000:8.1f}ms "
+          f"median={statistics.median(durations) * 1000:8.1f}ms "
+          f"max={max(durations) * 1000:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark test harness startup time.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    report("pytest --collect-only", bench_collect(args.runs))
+    for path, durations in bench_targeted_collect(args.runs).items():
+        report(f"pytest {path} --collect-only", durations)
+    report("load_config (per call, 1000 calls)", bench_config_load(1000))
+
+
+if __name__ == "__main__":
+    main()
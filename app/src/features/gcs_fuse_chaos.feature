@@ -0,0 +1,30 @@
+Feature: GCS FUSE Chaos
+
+  Scenario: Reads recover after the gcsfuse sidecar is killed
+    Given a GKE cluster is running
+    And the perf reader is deployed with 3 replicas reading every 0.05 seconds
+    And the perf reader has a steady read rate
+    When the gcsfuse sidecar of a reader pod is killed
+    And the perf reader is observed for 180 seconds after the fault
+    Then full read throughput should be back within 120 seconds
+    And the read I/O stall should last less than 60 seconds
+    And at most 500 reads should fail
+
+  Scenario: Reads recover after the GCS FUSE CSI driver pod of a node is deleted
+    Given a GKE cluster is running
+    And the perf reader is deployed with 3 replicas reading every 0.05 seconds
+    And the perf reader has a steady read rate
+    When the GCS FUSE CSI driver pod on a reader's node is deleted
+    And the perf reader is observed for 180 seconds after the fault
+    Then full read throughput should be back within 60 seconds
+    And the read I/O stall should last less than 30 seconds
+    And at most 100 reads should fail
+
+  Scenario: Reads recover after a reader pod is evicted
+    Given a GKE cluster is running
+    And the perf reader is deployed with 3 replicas reading every 0.05 seconds
+    And the perf reader has a steady read rate
+    When a reader pod is evicted
+    And the perf reader is observed for 300 seconds after the fault
+    Then full read throughput should be back within 240 seconds
+    And at most 100 reads should fail
@@ -3,4 +3,9 @@ Feature: GCS FUSE Driver Verification
   Scenario: Verifying GCS FUSE CSI driver is enabled on GKE cluster
     Given a GKE cluster is running
     Then the GCS FUSE CSI driver should be installed on the cluster
-    And all GCS FUSE CSI node pods should be running with all containers ready 
\ No newline at end of file
+    And all GCS FUSE CSI node pods should be running with all containers ready 
+
+  Scenario: Verifying every GCS FUSE node is served by a ready CSI driver pod
+    Given a GKE cluster is running
+    Then every node running GCS FUSE workloads should have a ready CSI driver pod
+    And CSI driver pods should be ready within 120 seconds of their node's creation
@@ -4,4 +4,10 @@ Feature: GCS FUSE Mount GKE Integration
     Given a GKE cluster is running
     And a deployment named "gcs-fuse" exists in the "default" namespace
     When the deployment starts
-    Then the GCS FUSE mount should be accessible 
\ No newline at end of file
+    Then the GCS FUSE mount should be accessible 
+
+  Scenario: Executing a command in a GKE pod under the scenario deadline
+    Given a GKE cluster is running
+    And a deployment named "gcs-fuse" exists in the "default" namespace
+    When the deployment starts
+    Then a command can be executed in a pod while the scenario deadline is active
@@ -5,3 +5,4 @@ Feature: GCS FUSE Multi Pod Mount GKE
     And a deployment named "gcs-fuse" exists in the "default" namespace
     When the deployment starts
     Then the GCS FUSE mount should be accessible by all pods in the deployment
+    And every pod should compute the same checksum of a large generated file
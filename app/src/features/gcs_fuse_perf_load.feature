@@ -0,0 +1,10 @@
+Feature: GCS FUSE Read Load
+
+  Scenario: Perf reader pods meet the read SLOs under sustained load
+    Given a GKE cluster is running
+    And the perf reader is deployed with 3 replicas reading every 0.01 seconds
+    When the perf reader runs for 120 seconds
+    Then the read rate should be at least 50 ops/s
+    And the p99 read latency should be below 200ms at 50 ops/s
+    And the p50 read latency should be below 50ms
+    And the read error ratio should be below 1%
@@ -8,5 +8,6 @@ Feature: GCS FUSE Scale Up Tests GKE
     When I scale the "gcs-fuse" deployment to configured target replicas
     Then the system should start scaling up the deployment
     And within configured timeout all pods should be running
+    And I should see new nodes being provisioned by the cluster autoscaler
     And all pods should have access to the GCS FUSE mount point
     And the cluster should have sufficient nodes to handle the load
\ No newline at end of file
@@ -0,0 +1,25 @@
+Feature: GCS FUSE Read Scaling
+
+  Scenario: Aggregate read throughput scales with the number of clients
+    Given a GKE cluster is running
+    And the perf reader is deployed in coordinated mode
+    When coordinated read phases of 60 seconds run with 1, 2, 4 and 8 clients reading every 0.01 seconds
+    Then every phase should start within 1 second on all clients
+    And the read error ratio of every phase should be below 1%
+    And aggregate read throughput with 8 clients should be at least 4 times that with 1 client
+
+  Scenario: Read throughput of reader pods packed onto one node
+    Given a GKE cluster is running
+    And the perf reader is deployed in coordinated mode
+    When coordinated read phases of 60 seconds run with 1, 2, 4 and 8 clients on one node reading every 0.01 seconds
+    Then every phase should start within 1 second on all clients
+    And the read error ratio of every phase should be below 1%
+    And at least 4 reader pods should fit on one node at 70% per-pod throughput
+
+  Scenario: Read throughput of reader pods spread across nodes
+    Given a GKE cluster is running
+    And the perf reader is deployed in coordinated mode
+    When coordinated read phases of 60 seconds run with 1, 2, 4 and 8 clients spread across nodes reading every 0.01 seconds
+    Then every phase should start within 1 second on all clients
+    And the read error ratio of every phase should be below 1%
+    And per-pod read throughput with 8 clients should be at least 0.7 times that with 1 client
@@ -0,0 +1,9 @@
+Feature: GCS FUSE Soak
+
+  Scenario: The perf reader runs for hours without degrading
+    Given a GKE cluster is running
+    And the perf reader is deployed with 3 replicas reading every 0.05 seconds
+    When the perf reader soaks for the configured duration
+    Then sidecar memory should show no significant upward trend
+    And the p99 read latency should show no significant upward trend
+    And cache usage should show no significant upward trend
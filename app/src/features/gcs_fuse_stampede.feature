@@ -0,0 +1,17 @@
+Feature: GCS FUSE Same-Object Read Contention
+
+  Scenario: Pods on one node read the same cold object at once
+    Given a GKE cluster is running
+    And 4 reader pods are deployed on one node
+    When they all read the same cold 1024 MiB object at once
+    Then every reader should read the whole object
+    And the object should be downloaded from GCS at most 4 times
+    And the slowest reader should take at most 2 times as long as the fastest
+
+  Scenario: Processes in one pod read the same cold object at once
+    Given a GKE cluster is running
+    And 1 reader pod is deployed on one node
+    When 8 processes in each pod read the same cold 1024 MiB object at once
+    Then every reader should read the whole object
+    And the object should be downloaded from GCS at most 1.5 times
+    And the slowest reader should take at most 2 times as long as the fastest
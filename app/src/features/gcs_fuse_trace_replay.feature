@@ -0,0 +1,10 @@
+Feature: GCS FUSE Trace Replay
+
+  Scenario: A recorded training data loader access pattern replays within its latency budget
+    Given a GKE cluster is running
+    And the perf reader is deployed in coordinated mode with 2 replicas
+    When the access trace "traces/sample_training.csv" is replayed on every reader pod at 1x speed
+    Then the p99 "read" latency should be below 500ms
+    And the p99 "open" latency should be below 200ms
+    And the replayed operation error ratio should be below 1%
+    And the replay should lag the trace by less than 1 second
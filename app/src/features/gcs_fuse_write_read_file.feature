@@ -4,4 +4,5 @@ Feature: GCS FUSE Write and Read File
     Given a GKE cluster is running
     And a deployment named "gcs-fuse" exists in the "default" namespace
     When the deployment starts
-    Then a file can be written to and read from the GCS FUSE mount
\ No newline at end of file
+    Then a file can be written to and read from the GCS FUSE mount
+    And a large generated file can be written to and read back intact from the GCS FUSE mount
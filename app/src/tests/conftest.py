@@ -1,12 +1,258 @@
 import pytest
+import os
 import time
 import logging
 from src.utils.k8s_client import KubernetesClient
+from src.utils.async_k8s_client import AsyncKubernetesClient
+from src.utils.cluster_snapshot import ClusterSnapshot
+from src.utils.pod_selection import PodSelector
+from src.utils.resource_lock import LeaseLock, worker_id
+from src.utils.tracing import tracer
+from src.utils.profiling import StepProfiler
+from src.utils.metrics import metrics
+from src.utils.benchmark_store import (
+    BenchmarkRecorder, BenchmarkStore, collect_run_key, format_comparison, new_run_id
+)
+from src.utils.config_util import load_config
+from src.utils.report_charts import comparison_html, performance_section
+from src.utils.polling import Deadline
+from src.utils.scale_observer import ScaleObserver
+from src.utils.sidecar_collector import SidecarCollector
+from src.utils.perf_workload import PerfWorkload
+from src.utils.soak import SoakAggregator
+# Register the step definitions shared by all features
+from src.tests.shared_steps import *  # noqa: F401,F403
 
 # Configure global logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+# Open step spans, keyed by the pytest-bdd step object
+_step_spans = {}
+# Step profiler (set when --profile is given) and its open step profiles
+_profiler = None
+_step_profiles = {}
+# Cluster leases held by the running test, checked before each step
+_held_locks = []
+# Baseline selector and results of comparing this run's benchmarks with it
+_benchmark_comparison = {}
+
+
+def pytest_addoption(parser):
+    """
+    Register the harness command-line options.
+    """
+    parser.addoption(
+        "--trace-dir",
+        default=None,
+        help="Record per-step, API call and exec spans and write Chrome trace / OTLP JSON files to this directory."
+    )
+    parser.addoption(
+        "--profile",
+        default=None,
+        help="Comma-separated fnmatch patterns of steps (step text or function name) and API calls "
+             "(e.g. 'k8s list pods', 'k8s exec') to profile."
+    )
+    parser.addoption(
+        "--profile-mode",
+        default="cprofile",
+        choices=("cprofile", "sample"),
+        help="Profile with cProfile (deterministic, .prof files) or a low-overhead stack sampler."
+    )
+    parser.addoption(
+        "--profile-interval",
+        type=float,
+        default=0.005,
+        help="Sampling interval in seconds for --profile-mode=sample."
+    )
+    parser.addoption(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve harness metrics for Prometheus on this port (xdist worker gwN uses port + 1 + N)."
+    )
+    parser.addoption(
+        "--metrics-addr",
+        default="127.0.0.1",
+        help="Address the --metrics-port server binds (0.0.0.0 to let a remote Prometheus scrape it)."
+    )
+    parser.addoption(
+        "--benchmark-store",
+        default=None,
+        help="JSONL file benchmark results are appended to (default: [benchmark] store in settings.toml)."
+    )
+    parser.addoption(
+        "--benchmark-label",
+        action="append",
+        default=[],
+        help="Label attached to this run's benchmark results (repeatable), e.g. 'baseline'."
+    )
+    parser.addoption(
+        "--benchmark-baseline",
+        default=None,
+        help="Compare this run's benchmarks with a baseline (label, run id, driver version, git SHA "
+             "or 'latest') and fail the run on a significant regression."
+    )
+
+
+def _report_dir(config):
+    """
+    Directory for report artifacts: next to the pytest-html report when there is one.
+    """
+    html_report = config.getoption("htmlpath", None)
+    return os.path.dirname(os.path.abspath(html_report)) if html_report else "reports"
+
+
+def pytest_configure(config):
+    """
+    Register the markers used by the step modules and enable tracing, profiling and metrics if requested.
+    """
+    global _profiler
+    config.addinivalue_line(
+        "markers",
+        "cluster_lock(*names): hold a cluster-wide lease on the named shared resources for the test"
+    )
+    config.addinivalue_line(
+        "markers",
+        "xdist_group(name): run all tests of the group on the same pytest-xdist worker"
+    )
+    config.addinivalue_line(
+        "markers",
+        "deadline(seconds): time budget of the scenario, shared by all its steps and API calls"
+    )
+    if config.getoption("--trace-dir"):
+        os.makedirs(config.getoption("--trace-dir"), exist_ok=True)
+        tracer.enabled = True
+
+    if config.getoption("--profile"):
+        _profiler = StepProfiler(
+            os.path.join(_report_dir(config), "profiles", worker_id()),
+            patterns=[pattern.strip() for pattern in config.getoption("--profile").split(",") if pattern.strip()],
+            mode=config.getoption("--profile-mode"),
+            interval=config.getoption("--profile-interval")
+        )
+
+    if config.getoption("--metrics-port") is not None:
+        worker = worker_id()
+        port = config.getoption("--metrics-port")
+        if worker.startswith("gw"):
+            port += 1 + int(worker[2:])
+        metrics.start(port, addr=config.getoption("--metrics-addr"), labels={"worker": worker, "pid": os.getpid()})
+
+    # Set before pytest-xdist starts its workers, which inherit it
+    os.environ.setdefault("GCS_BDD_RUN_ID", new_run_id())
+
+
+def pytest_unconfigure(config):
+    """
+    Export the recorded spans, one pair of files per xdist worker, and the merged profile.
+    """
+    if _profiler is not None:
+        _profiler.write_merged()
+
+    trace_dir = config.getoption("--trace-dir")
+    if not trace_dir or not tracer.enabled:
+        return
+    if tracer.dropped:
+        logger.warning(f"Dropped {tracer.dropped} spans beyond the in-memory limit of {tracer.max_spans}")
+    tracer.export_chrome(os.path.join(trace_dir, f"trace-{worker_id()}.json"))
+    tracer.export_otlp(os.path.join(trace_dir, f"trace-{worker_id()}.otlp.json"))
+
+
+def _benchmark_store(config):
+    store_path = config.getoption("--benchmark-store") or load_config().get("benchmark", {}).get(
+        "store", "reports/benchmarks.jsonl"
+    )
+    return BenchmarkStore(store_path)
+
+
+def _compare_with_baseline(config, benchmarks=None):
+    """
+    Compare this run's benchmarks with --benchmark-baseline.
+
+    Args:
+        config (pytest.Config): The pytest config.
+        benchmarks (iterable): Only compare these benchmarks; all when None.
+
+    Returns:
+        tuple: The resolved baseline selector and the comparison results
+            (None and [] without a baseline).
+    """
+    baseline = config.getoption("--benchmark-baseline")
+    if not baseline:
+        return None, []
+    store = _benchmark_store(config)
+    run_id = os.environ["GCS_BDD_RUN_ID"]
+    if baseline == "latest":
+        baseline = store.latest_run_id(exclude=run_id)
+        if baseline is None:
+            logger.warning("No previous benchmark run to compare with")
+            return None, []
+
+    benchmark_config = load_config().get("benchmark", {})
+    results = store.compare(
+        run_id, baseline,
+        alpha=benchmark_config.get("alpha", 0.05),
+        min_change=benchmark_config.get("min_change", 0.05),
+        min_samples=benchmark_config.get("min_samples", 3)
+    )
+    if benchmarks is not None:
+        results = [result for result in results if result["benchmark"] in benchmarks]
+    return baseline, results
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session, exitstatus):
+    """
+    Compare the benchmarks of this run with the baseline and fail the run on a regression.
+
+    Runs before pytest-html writes the report so the summary can include the comparison.
+    """
+    if worker_id() != "main":
+        return
+    baseline, results = _compare_with_baseline(session.config)
+    if results:
+        _benchmark_comparison.update(baseline=baseline, results=results)
+    regressions = [result["benchmark"] for result in results if result["verdict"] == "regression"]
+    if regressions:
+        logger.error(f"Benchmark regressions against '{baseline}': {', '.join(regressions)}")
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix, session):
+    """
+    Add the run-wide baseline comparison to the pytest-html summary.
+    """
+    if _benchmark_comparison:
+        prefix.append(comparison_html(_benchmark_comparison["results"], _benchmark_comparison["baseline"]))
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    Print the baseline comparison table.
+    """
+    if _benchmark_comparison:
+        terminalreporter.section(f"benchmark comparison against {_benchmark_comparison['baseline']}")
+        terminalreporter.write_line(format_comparison(_benchmark_comparison["results"]))
+
+
+def _attach_performance_section(item, report):
+    """
+    Attach charts of the benchmarks a test recorded to its pytest-html row.
+    """
+    recorder = getattr(item, "funcargs", {}).get("benchmark_recorder")
+    if recorder is None or not item.config.pluginmanager.hasplugin("html"):
+        return
+    if not (recorder.histograms or recorder.series):
+        return
+    from pytest_html import extras
+
+    baseline, comparison = _compare_with_baseline(item.config, benchmarks=recorder.histograms)
+    section = performance_section(recorder.histograms, recorder.series, comparison, baseline)
+    report.extras = getattr(report, "extras", []) + [extras.html(section)]
+
+
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
 def pytest_runtest_protocol(item):
     """
@@ -14,20 +260,98 @@ def pytest_runtest_protocol(item):
     """
     logger.info(f"Starting test: {item.name}")
     start_time = time.time()
-    yield  # Execute the test
+    with tracer.span(item.nodeid, "test", worker=worker_id()):
+        yield  # Execute the test
     end_time = time.time()
     duration = end_time - start_time
     logger.info(f"Finished test: {item.name} in {duration:.3f} seconds.")
 
 
-@pytest.fixture(scope="module")
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Record the outcome of each test phase on the test span.
+    """
+    if call.when == "call" and _step_spans:
+        # pytest.fail() raises an OutcomeException, which pytest-bdd does not
+        # report through pytest_bdd_step_error: close the failed step here
+        error = call.excinfo.value if call.excinfo else None
+        for span, token in reversed(list(_step_spans.values())):
+            tracer.end_span(span, token, error=error)
+        _step_spans.clear()
+    if call.when == "call" and _step_profiles:
+        for handle in _step_profiles.values():
+            _profiler.stop(handle)
+        _step_profiles.clear()
+
+    outcome = yield
+    report = outcome.get_result()
+    if report.when == "call":
+        _attach_performance_section(item, report)
+    span = tracer.current_span()
+    if span is not None and span.category == "test" and (report.when == "call" or report.failed):
+        span.set(outcome=report.outcome)
+        if report.failed:
+            span.status = "error"
+
+
+def pytest_bdd_before_step(request, feature, scenario, step, step_func):
+    """
+    Fail the step if a cluster lock of the test was lost, and open a span for it.
+    """
+    for lock in _held_locks:
+        try:
+            lock.check()
+        except RuntimeError as e:
+            pytest.fail(str(e))
+    if tracer.active:
+        _step_spans[id(step)] = tracer.start_span(
+            f"{step.keyword} {step.name}", "step",
+            feature=feature.name, scenario=scenario.name, function=step_func.__name__
+        )
+
+
+def pytest_bdd_before_step_call(request, feature, scenario, step, step_func, step_func_args):
+    """
+    Start profiling a selected step once its fixtures are resolved.
+    """
+    if _profiler is not None and _profiler.selects(step.name, step_func.__name__):
+        _step_profiles[id(step)] = _profiler.start(f"{step.keyword} {step.name}")
+
+
+def pytest_bdd_after_step(request, feature, scenario, step, step_func, step_func_args):
+    """
+    Close the span (and profile) of a step that passed.
+    """
+    if id(step) in _step_profiles:
+        _profiler.stop(_step_profiles.pop(id(step)))
+    if id(step) in _step_spans:
+        tracer.end_span(*_step_spans.pop(id(step)))
+
+
+def pytest_bdd_step_error(request, feature, scenario, step, step_func, step_func_args, exception):
+    """
+    Close the span (and profile) of a step that failed.
+    """
+    if id(step) in _step_profiles:
+        _profiler.stop(_step_profiles.pop(id(step)))
+    if id(step) in _step_spans:
+        span, token = _step_spans.pop(id(step))
+        tracer.end_span(span, token, error=exception)
+
+
+@pytest.fixture(scope="session")
 def k8s_client():
     """
     Fixture to provide Kubernetes API clients dynamically.
+
+    The client is built once per session and shared by all test modules.
     """
     config_file = "config/settings.toml"
     logger.info(f"Initializing Kubernetes client with config file: {config_file}")
     k8s = KubernetesClient(config_file=config_file)
+    if _profiler is not None:
+        _profiler.instrument_api_client(k8s.api_client)
 
     def get_client(api_type):
         """
@@ -42,6 +366,185 @@ def k8s_client():
         logger.debug(f"Fetching client for API type: {api_type}")
         return k8s.get_client(api_type)
 
-    return get_client
+    get_client.pool_stats = k8s.pool_stats
+    yield get_client
+
+    for stats in k8s.pool_stats():
+        logger.info(f"Connection pool {stats['scheme']}://{stats['host']}:{stats['port']}: "
+                    f"{stats['requests']} requests over {stats['connections_opened']} connections")
+
+
+@pytest.fixture(scope="session")
+def async_k8s_client():
+    """
+    Fixture to provide the asyncio Kubernetes client.
+
+    Steps drive it with ``async_k8s_client.run(coro)``; the client and its
+    connection pool are shared by every step in the session.
+    """
+    config_file = "config/settings.toml"
+    logger.info(f"Initializing async Kubernetes client with config file: {config_file}")
+    k8s = AsyncKubernetesClient(config_file=config_file)
+    yield k8s
+    k8s.shutdown()
+
+
+@pytest.fixture(scope="session")
+def cluster_snapshot(k8s_client):
+    """
+    Fixture to provide cluster state (nodes, driver pods, deployment) fetched
+    once per session. Steps that change the cluster call ``refresh()``.
+    """
+    return ClusterSnapshot(k8s_client)
+
+
+@pytest.fixture(scope="session")
+def pod_selector(k8s_client, cluster_snapshot):
+    """
+    Fixture to choose the ready pods a step targets ([pod_selection] strategy).
+    """
+    return PodSelector(k8s_client, cluster_snapshot)
+
+
+@pytest.fixture(scope="session")
+def benchmark_run_key(k8s_client, cluster_snapshot):
+    """
+    Fixture to provide the setup benchmark results are keyed by
+    (cluster, mount options, driver version, git SHA).
+    """
+    return collect_run_key(k8s_client, cluster_snapshot, load_config())
+
+
+@pytest.fixture
+def benchmark_recorder(request, benchmark_run_key):
+    """
+    Fixture to record benchmark samples in the results store.
 
+    Steps call ``benchmark_recorder.record(name, samples, unit=...)``.
+    """
+    return BenchmarkRecorder(
+        _benchmark_store(request.config),
+        benchmark_run_key,
+        os.environ["GCS_BDD_RUN_ID"],
+        request.node.nodeid,
+        labels=request.config.getoption("--benchmark-label")
+    )
+
+
+@pytest.fixture
+def scale_observer(request, k8s_client, benchmark_recorder):
+    """
+    Fixture to provide a ScaleObserver for the test.
+
+    The step that scales calls ``scale_observer.start(name)`` first. At
+    teardown the observer is stopped, its samples are recorded as benchmarks
+    prefixed with that name and its timeline is written to
+    ``scale/<test>.json`` in the report directory.
+    """
+    observer = ScaleObserver(k8s_client)
+    yield observer
+    if observer.started_at is None:
+        return
+    observer.stop()
+    try:
+        observer.record(benchmark_recorder, observer.name)
+        observer.write(os.path.join(_report_dir(request.config), "scale", f"{request.node.name}.json"))
+    except Exception as e:
+        logger.warning(f"Failed to report the scale timeline: {str(e)}")
+
+
+@pytest.fixture
+def sidecar_collector(k8s_client, async_k8s_client):
+    """
+    Fixture to provide a SidecarCollector for the test.
+
+    Benchmark steps call ``sidecar_collector.start(pod_names, namespace)``
+    before the workload and ``sidecar_collector.stop()`` plus
+    ``sidecar_collector.record(benchmark_recorder, name, bytes_read)`` after
+    it. The collector is stopped at teardown if a step failed in between.
+    """
+    collector = SidecarCollector(k8s_client, async_k8s_client)
+    yield collector
+    collector.stop()
+
+
+@pytest.fixture
+def perf_workload(k8s_client):
+    """
+    Fixture to provide the perf reader of perf/ (see the shared
+    "the perf reader is deployed ..." step). It is deleted after the
+    scenario unless [perf] keep is set.
+    """
+    workload = PerfWorkload(k8s_client)
+    yield workload
+    if workload.config["keep"]:
+        logger.info(f"Keeping perf reader '{workload.name}'")
+        return
+    workload.delete()
+
+
+@pytest.fixture
+def soak_aggregator(request):
+    """
+    Fixture to provide a SoakAggregator with the [soak] window settings.
+
+    Its windows are written to ``soak/<test>.json`` in the report directory
+    at teardown, also when the soak was cut short.
+    """
+    config = load_config()["soak"]
+    aggregator = SoakAggregator(config["window"], config["max_windows"])
+    yield aggregator
+    if aggregator.start is None:
+        return
+    try:
+        aggregator.write(os.path.join(_report_dir(request.config), "soak", f"{request.node.name}.json"))
+    except Exception as e:
+        logger.warning(f"Failed to write the soak windows: {str(e)}")
+
+
+@pytest.fixture(autouse=True)
+def scenario_deadline(request):
+    """
+    Deadline shared by every step, poll and API call of a scenario.
+
+    The budget is [polling] scenario_timeout unless the test has a
+    ``deadline(seconds)`` marker. Waiting for cluster locks does not count.
+    """
+    marker = request.node.get_closest_marker("deadline")
+    seconds = marker.args[0] if marker else load_config().get("polling", {}).get("scenario_timeout", 3600)
+    request.getfixturevalue("cluster_locks")
+    with Deadline(seconds, name=request.node.name).activate() as deadline:
+        yield deadline
+
+
+@pytest.fixture(autouse=True)
+def cluster_locks(request):
+    """
+    Hold the leases named by a test's ``cluster_lock`` marker while it runs.
+
+    Leases are taken in sorted order so two tests locking the same resources
+    can't deadlock.
+    """
+    marker = request.node.get_closest_marker("cluster_lock")
+    if marker is None:
+        yield
+        return
 
+    k8s_client = request.getfixturevalue("k8s_client")
+    locks = [LeaseLock(k8s_client, name) for name in sorted(set(marker.args))]
+    logger.info(f"[{worker_id()}] Waiting for cluster locks: {', '.join(lock.name for lock in locks)}")
+    acquired = []
+    try:
+        for lock in locks:
+            lock.acquire()
+            acquired.append(lock)
+        _held_locks[:] = acquired
+        yield
+        # A lease lost during the last step is only noticed here
+        lost = [lock.lost for lock in acquired if lock.lost]
+        if lost:
+            pytest.fail(f"Cluster locks were lost while the test held them: {'; '.join(lost)}")
+    finally:
+        _held_locks.clear()
+        for lock in reversed(acquired):
+            lock.release()
@@ -0,0 +1,149 @@
+import pytest
+import time
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.chaos import ReadMonitor, delete_driver_pod, evict_pod, kill_container
+from src.utils.perf_workload import READ_ERRORS, READ_OPS
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+scenarios("../features/gcs_fuse_chaos.feature")
+
+# Faults disrupt the shared perf reader and the driver pods of its nodes, which also serve
+# the gcs-fuse deployment: hold the driver lease every module mounting through the driver takes
+pytestmark = [
+    pytest.mark.cluster_lock("perf-reader", f"daemonset-{CONFIG['gcs_fuse']['driver_daemonset']}"),
+    pytest.mark.xdist_group("perf-reader"),
+]
+
+
+@pytest.fixture
+def read_monitor(k8s_client, async_k8s_client, perf_workload):
+    """Fixture to provide a ReadMonitor of the perf reader, stopped at teardown."""
+    monitor = ReadMonitor(k8s_client, async_k8s_client, perf_workload, CONFIG["perf"]["metrics_port"],
+                          interval=CONFIG["chaos"]["scrape_interval"], method=CONFIG["perf"]["scrape_method"],
+                          reads=READ_OPS, errors=READ_ERRORS)
+    yield monitor
+    monitor.stop()
+
+
+@given("the perf reader has a steady read rate", target_fixture="baseline_rate")
+def measure_baseline(read_monitor, perf_pods):
+    """Monitor the readers for [chaos] baseline seconds before any fault."""
+    baseline = CONFIG["chaos"]["baseline"]
+    try:
+        read_monitor.start(perf_pods)
+        start_time = time.time()
+        time.sleep(baseline)
+        rate = read_monitor.rate(start_time)
+        assert rate > 0, "The perf reader did not read anything before the fault"
+        logger.info(f"Baseline read rate over {baseline}s: {rate:.1f} ops/s")
+        return rate
+    except Exception as e:
+        pytest.fail(f"Failed to measure the baseline read rate: {str(e)}")
+
+
+def _fault(name, injected_at, target, restored_after=None):
+    if restored_after is not None:
+        logger.info(f"'{target}' came back {restored_after:.1f}s after the fault")
+    return {"name": name, "time": injected_at, "target": target, "restored_after": restored_after}
+
+
+@when("the gcsfuse sidecar of a reader pod is killed", target_fixture="chaos_fault")
+def kill_sidecar(k8s_client, perf_workload, perf_pods):
+    """Kill the sidecar of the first reader pod and wait for the kubelet to restart it."""
+    container = CONFIG["sidecar"]["container"]
+    try:
+        injected_at, restarted_after = kill_container(
+            k8s_client("CoreV1Api"), perf_pods[0], perf_workload.namespace, container,
+            CONFIG["chaos"]["debug_image"], signal=CONFIG["chaos"]["sidecar_signal"],
+            timeout=CONFIG["chaos"]["restart_timeout"]
+        )
+        return _fault("chaos_sidecar_kill", injected_at, f"{perf_pods[0]}/{container}", restarted_after)
+    except Exception as e:
+        pytest.fail(f"Failed to kill the sidecar of pod '{perf_pods[0]}': {str(e)}")
+
+
+@when("the GCS FUSE CSI driver pod on a reader's node is deleted", target_fixture="chaos_fault")
+def delete_reader_driver_pod(k8s_client, cluster_snapshot, perf_workload, perf_pods):
+    """Delete the CSI node driver pod serving the first reader pod and wait for its replacement."""
+    core_api = k8s_client("CoreV1Api")
+    try:
+        node_name = core_api.read_namespaced_pod(name=perf_pods[0], namespace=perf_workload.namespace).spec.node_name
+        injected_at, replaced_after = delete_driver_pod(
+            core_api, node_name, CONFIG["gcs_fuse"]["driver_namespace"], cluster_snapshot.driver_selector,
+            timeout=CONFIG["chaos"]["restart_timeout"]
+        )
+        return _fault("chaos_driver_delete", injected_at, f"driver on {node_name}", replaced_after)
+    except Exception as e:
+        pytest.fail(f"Failed to delete the driver pod of the reader's node: {str(e)}")
+
+
+@when("a reader pod is evicted", target_fixture="chaos_fault")
+def evict_reader_pod(k8s_client, perf_workload, perf_pods):
+    """Evict the first reader pod and wait for the deployment to have all its replicas again."""
+    try:
+        injected_at = evict_pod(k8s_client("CoreV1Api"), perf_pods[0], perf_workload.namespace)
+        perf_workload.wait_ready(len(perf_pods), timeout=CONFIG["chaos"]["restart_timeout"])
+        return _fault("chaos_eviction", injected_at, perf_pods[0], time.time() - injected_at)
+    except Exception as e:
+        pytest.fail(f"Failed to evict pod '{perf_pods[0]}': {str(e)}")
+
+
+@when(parsers.parse("the perf reader is observed for {seconds:d} seconds after the fault"),
+      target_fixture="chaos_recovery")
+def observe_recovery(read_monitor, baseline_rate, chaos_fault, benchmark_recorder, seconds):
+    """Keep monitoring until `seconds` after the fault and measure its impact on reads."""
+    chaos_config = CONFIG["chaos"]
+    try:
+        time.sleep(max(chaos_fault["time"] + seconds - time.time(), 0))
+        read_monitor.stop()
+        impact = read_monitor.recovery(chaos_fault["time"], baseline_rate, recovery_ratio=chaos_config["recovery_ratio"],
+                                       stall_ratio=chaos_config["stall_ratio"], hold=chaos_config["recovery_hold"])
+    except Exception as e:
+        pytest.fail(f"Failed to observe the recovery: {str(e)}")
+
+    name = chaos_fault["name"]
+    recovery_seconds = impact["recovery_seconds"]
+    logger.info(
+        f"{name} ({chaos_fault['target']}): {impact['errors']:.0f} errors, "
+        f"{impact['stall_seconds']:.0f}s stalled, lowest rate {impact['min_rate'] or 0:.1f} ops/s "
+        f"(baseline {baseline_rate:.1f}), "
+        + (f"full throughput after {recovery_seconds:.0f}s" if recovery_seconds is not None else "not recovered")
+    )
+    benchmark_recorder.record(f"{name}_errors", [impact["errors"]], unit="count")
+    benchmark_recorder.record(f"{name}_stall", [impact["stall_seconds"]])
+    if recovery_seconds is not None:
+        benchmark_recorder.record(f"{name}_recovery", [recovery_seconds])
+    if chaos_fault["restored_after"] is not None:
+        benchmark_recorder.record(f"{name}_restored", [chaos_fault["restored_after"]])
+    return impact
+
+
+@then(parsers.parse("full read throughput should be back within {seconds:d} seconds"))
+def verify_recovery(chaos_recovery, seconds):
+    """Verify the read rate got back to [chaos] recovery_ratio of the baseline in time."""
+    recovery_seconds = chaos_recovery["recovery_seconds"]
+    assert recovery_seconds is not None, \
+        f"Reads did not get back to {CONFIG['chaos']['recovery_ratio']:.0%} of the baseline rate " \
+        f"for {CONFIG['chaos']['recovery_hold']}s"
+    assert recovery_seconds <= seconds, \
+        f"Full read throughput took {recovery_seconds:.0f}s to come back, more than {seconds}s"
+    logger.info(f"Full read throughput was back after {recovery_seconds:.0f}s")
+
+
+@then(parsers.parse("the read I/O stall should last less than {seconds:d} seconds"))
+def verify_stall(chaos_recovery, seconds):
+    """Verify how long reads were (nearly) stopped after the fault."""
+    stall_seconds = chaos_recovery["stall_seconds"]
+    assert stall_seconds < seconds, f"Reads stalled for {stall_seconds:.0f}s, not less than {seconds}s"
+    logger.info(f"Reads stalled for {stall_seconds:.0f}s")
+
+
+@then(parsers.parse("at most {count:d} reads should fail"))
+def verify_fault_errors(chaos_recovery, count):
+    """Verify the number of failed reads after the fault."""
+    errors = chaos_recovery["errors"]
+    assert errors <= count, f"{errors:.0f} reads failed after the fault, more than {count}"
+    logger.info(f"{errors:.0f} reads failed after the fault")
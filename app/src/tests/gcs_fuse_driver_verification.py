@@ -1,8 +1,8 @@
 import pytest
-from pytest_bdd import given, when, then, scenarios
+from pytest_bdd import then, scenarios, parsers
 from src.utils.logging_util import get_logger
-import time
 from src.utils.config_util import load_config
+from src.utils.driver_health import DriverHealth
 
 logger = get_logger(__name__)
 # Load configuration once at module level
@@ -10,103 +10,95 @@ CONFIG = load_config()
 # Link the Gherkin feature file
 scenarios("../features/gcs_fuse_driver_verification.feature")
 
+# The chaos module deletes driver pods under this lease
+pytestmark = pytest.mark.cluster_lock(f"daemonset-{CONFIG['gcs_fuse']['driver_daemonset']}")
 
-@given("a GKE cluster is running")
-def verify_cluster_running(k8s_client):
-    """Verify that the Kubernetes cluster is accessible."""
-    logger.info("Verifying Kubernetes cluster is running...")
-    core_api = k8s_client("CoreV1Api")
-    
-    try:
-        nodes = core_api.list_node()
-        assert nodes.items, "No nodes found in the cluster"
-        logger.info(f"Kubernetes cluster verification successful. Found {len(nodes.items)} nodes.")
-    except Exception as e:
-        pytest.fail(f"Failed to verify cluster is running: {str(e)}")
+
+@pytest.fixture
+def driver_health(k8s_client, cluster_snapshot):
+    """Fixture to provide the CSI driver health checks, on a fresh view of the driver and nodes."""
+    # The session snapshot may predate chaos and scaling scenarios that replaced driver pods or nodes
+    cluster_snapshot.refresh("nodes", "driver_daemonset", "driver_pods")
+    return DriverHealth(k8s_client, cluster_snapshot)
 
 
 @then("the GCS FUSE CSI driver should be installed on the cluster")
-def verify_gcs_fuse_csi_driver(k8s_client):
+def verify_gcs_fuse_csi_driver(driver_health):
     """Verify that the GCS FUSE CSI driver is installed on the cluster."""
     logger.info("Verifying GCS FUSE CSI driver is installed...")
     
-    # Get configuration values
-    driver_namespace = CONFIG["gcs_fuse"]["driver_namespace"]
-    
-    # Get the CoreV1Api client for pod operations
-    core_api = k8s_client("CoreV1Api")
-    
     try:
-        # List pods with name prefix 'gcsfusecsi-node'
-        pods = core_api.list_namespaced_pod(
-            namespace=driver_namespace,
-            field_selector="status.phase=Running",
-            label_selector=f"app.kubernetes.io/name=gcsfusecsi-node"
-        )
-        
-        # Verify that GCS FUSE pods exist and are running
-        assert pods.items, f"No GCS FUSE CSI driver pods found in {driver_namespace} namespace"
-        
-        # Log information about each pod
-        for pod in pods.items:
-            logger.info(f"Found GCS FUSE pod: {pod.metadata.name}")
-            logger.info(f"Pod status: {pod.status.phase}")
-            
-            # Check container status
-            container_count = len(pod.status.container_statuses)
-            ready_containers = sum(1 for c in pod.status.container_statuses if c.ready)
-            logger.info(f"Containers ready: {ready_containers}/{container_count}")
-            
-            # Verify all containers are ready
-            assert ready_containers == container_count, \
-                f"Not all containers are ready in pod {pod.metadata.name}"
+        # The DaemonSet status answers this without listing its pods
+        status = driver_health.status()
+        assert status["desired"] > 0, "The GCS FUSE CSI driver DaemonSet is not scheduled on any node"
+        assert status["available"] > 0, "No GCS FUSE CSI driver pod is available"
         
-        logger.info(f"GCS FUSE CSI driver is installed and running with {len(pods.items)} node pods")
+        logger.info(f"GCS FUSE CSI driver is installed and running with {status['available']}/"
+                    f"{status['desired']} node pods available")
         
     except Exception as e:
         pytest.fail(f"Failed to verify GCS FUSE CSI driver pods: {str(e)}")
 
 
 @then("all GCS FUSE CSI node pods should be running with all containers ready")
-def verify_csi_node_pods(k8s_client):
+def verify_csi_node_pods(driver_health):
     """Verify that all GCS FUSE CSI node pods are running and their containers are ready."""
     logger.info("Verifying GCS FUSE CSI node pods...")
     
-    core_api = k8s_client("CoreV1Api")
-    namespace = "kube-system"
-    
     try:
-        # List pods with name prefix 'gcsfusecsi-node'
-        pods = core_api.list_namespaced_pod(
-            namespace=namespace,
-            field_selector="status.phase=Running",
-            label_selector="k8s-app=gcs-fuse-csi-driver"
-        )
-        
-        assert pods.items, "No GCS FUSE CSI node pods found in kube-system namespace"
+        status = driver_health.status()
+        logger.info(f"Driver DaemonSet: {status['ready']}/{status['desired']} ready, {status['updated']} updated, "
+                    f"{status['available']} available, {status['misscheduled']} misscheduled")
         
-        # Check each pod and its containers
-        for pod in pods.items:
-            logger.info(f"Checking pod: {pod.metadata.name}")
-            
-            # Verify pod is running
-            assert pod.status.phase == "Running", \
-                f"Pod {pod.metadata.name} is not running (status: {pod.status.phase})"
-            
-            # Verify all containers are ready
-            container_statuses = pod.status.container_statuses
-            if not container_statuses:
-                pytest.fail(f"No container status information found for pod {pod.metadata.name}")
-            
-            for container in container_statuses:
-                logger.info(f"Container '{container.name}': Ready={container.ready}")
-                assert container.ready, \
-                    f"Container '{container.name}' in pod '{pod.metadata.name}' is not ready"
-            
-            logger.info(f"Pod {pod.metadata.name} is running with {len(container_statuses)}/"\
-                       f"{len(container_statuses)} containers ready")
+        if not status["ready_all"]:
+            # Only a failure is worth listing the pods for
+            not_ready = driver_health.not_ready_pods()
+            details = "; ".join(f"{pod}: {', '.join(containers) or 'not ready'}"
+                                for pod, containers in sorted(not_ready.items())[:10])
+            pytest.fail(f"{status['desired'] - status['ready']} of {status['desired']} GCS FUSE CSI node pods are "
+                        f"not ready" + (f" ({details})" if details else "")
+                        + ("" if status["current"] else "; the DaemonSet controller has not seen the latest spec"))
         
-        logger.info(f"All {len(pods.items)} GCS FUSE CSI node pods are running with all containers ready")
+        logger.info(f"All {status['desired']} GCS FUSE CSI node pods are running with all containers ready")
     
     except Exception as e:
-        pytest.fail(f"Failed to verify CSI node pods: {str(e)}")
\ No newline at end of file
+        pytest.fail(f"Failed to verify CSI node pods: {str(e)}")
+
+
+@then("every node running GCS FUSE workloads should have a ready CSI driver pod")
+def verify_driver_coverage(driver_health):
+    """Verify that no node runs GCS FUSE pods without a ready driver pod to mount their volumes."""
+    try:
+        coverage = driver_health.coverage()
+    except Exception as e:
+        pytest.fail(f"Failed to check CSI driver coverage: {str(e)}")
+
+    logger.info(f"{coverage['driver_nodes']} of {coverage['nodes']} nodes have a ready driver pod; "
+                f"{len(coverage['workload_nodes'])} nodes run GCS FUSE workloads")
+    if coverage["missing"]:
+        logger.warning(f"Schedulable nodes without a ready driver pod: {', '.join(coverage['missing'][:20])}")
+    uncovered = coverage["uncovered"]
+    assert not uncovered, f"{len(uncovered)} nodes run GCS FUSE pods without a ready CSI driver pod: " + "; ".join(
+        f"{node} ({', '.join(coverage['workload_nodes'][node][:3])})" for node in uncovered[:10]
+    )
+
+
+@then(parsers.re(r"CSI driver pods should be ready within (?P<seconds>\d+) seconds of their node's creation"),
+      converters={"seconds": int})
+def verify_driver_ready_latency(driver_health, benchmark_recorder, seconds):
+    """Verify how long new nodes wait for their driver pod, which bounds how fast autoscaled nodes can mount."""
+    try:
+        latencies = driver_health.ready_latencies()
+    except Exception as e:
+        pytest.fail(f"Failed to measure driver readiness after node creation: {str(e)}")
+
+    if not latencies:
+        logger.info("No node's driver pod started with the node; nothing to measure")
+        return
+    benchmark_recorder.record("driver_node_ready", list(latencies.values()), nodes=len(latencies))
+    slowest = max(latencies, key=latencies.get)
+    logger.info(f"Driver pods became ready {min(latencies.values()):.0f}-{latencies[slowest]:.0f}s after "
+                f"{len(latencies)} nodes were created")
+    assert latencies[slowest] <= seconds, \
+        f"The driver pod on node '{slowest}' became ready {latencies[slowest]:.0f}s after the node was created, " \
+        f"more than {seconds}s"
@@ -0,0 +1,108 @@
+import pytest
+import time
+from pytest_bdd import when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.polling import current_deadline
+from src.utils.prometheus_scrape import snapshot
+from src.utils.perf_workload import READ_BYTES, READ_ERRORS, READ_LATENCY, READ_OPS
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+scenarios("../features/gcs_fuse_perf_load.feature")
+
+# The perf reader is one shared deployment: one load test at a time
+pytestmark = [
+    pytest.mark.cluster_lock("perf-reader"),
+    pytest.mark.xdist_group("perf-reader"),
+]
+
+
+def _read_rate(window):
+    return window.value(READ_OPS) / window.duration if window.duration > 0 else 0.0
+
+
+@when(parsers.parse("the perf reader runs for {duration:d} seconds"), target_fixture="perf_window")
+def run_perf_reader(k8s_client, async_k8s_client, perf_workload, perf_pods, benchmark_recorder, sidecar_collector,
+                    duration):
+    """Scrape every reader pod over the run and keep what happened between the first and last scrape."""
+    scrape_interval = CONFIG["perf"]["scrape_interval"]
+    method = CONFIG["perf"]["scrape_method"]
+    port = CONFIG["perf"]["metrics_port"]
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() < duration:
+        pytest.fail(f"Scenario deadline '{deadline.name}' leaves {deadline.remaining():.0f}s, "
+                    f"less than the {duration}s run")
+
+    try:
+        def scrape(previous=None):
+            return snapshot(k8s_client, async_k8s_client, perf_pods, perf_workload.namespace, port, method=method,
+                            previous=previous)
+
+        sidecar_collector.start(perf_pods, perf_workload.namespace)
+        first = previous = scrape()
+        assert first.pods, "No perf reader pod could be scraped"
+        throughput = benchmark_recorder.throughput("perf_read_throughput")
+        while time.time() - first.timestamp < duration:
+            time.sleep(min(scrape_interval, max(duration - (time.time() - first.timestamp), 0)))
+            current = scrape(previous)
+            step = current.delta(previous)
+            throughput.add(current.timestamp, step.value(READ_BYTES))
+            logger.info(f"Read rate over the last {step.duration:.0f}s: {_read_rate(step):.1f} ops/s")
+            previous = current
+
+        window = previous.delta(first)
+        sidecar_collector.stop()
+        sidecar_collector.record(benchmark_recorder, "perf", bytes_read=window.value(READ_BYTES))
+        rate = _read_rate(window)
+        p50 = window.quantile(READ_LATENCY, 0.5)
+        p99 = window.quantile(READ_LATENCY, 0.99)
+        logger.info(f"Perf reader over {window.duration:.0f}s on {len(window.pods)} pods: {rate:.1f} ops/s, "
+                    f"{window.value(READ_BYTES) / window.duration / 1024 / 1024:.2f} MiB/s, "
+                    f"p50 {p50 if p50 is not None else float('nan'):.4f}s, "
+                    f"p99 {p99 if p99 is not None else float('nan'):.4f}s, "
+                    f"{window.value(READ_ERRORS):.0f} errors")
+        benchmark_recorder.record("perf_read_rate", [rate], unit="ops/s", lower_is_better=False)
+        if p99 is not None:
+            benchmark_recorder.record("perf_read_latency_p50", [p50])
+            benchmark_recorder.record("perf_read_latency_p99", [p99])
+        return window
+    except Exception as e:
+        pytest.fail(f"Failed to run the perf reader: {str(e)}")
+
+
+@then(parsers.re(r"the read rate should be at least (?P<ops>[\d.]+) ops/s"), converters={"ops": float})
+def verify_read_rate(perf_window, ops):
+    """Verify the read rate summed over all reader pods."""
+    rate = _read_rate(perf_window)
+    assert rate >= ops, f"Read rate {rate:.1f} ops/s is below {ops:g} ops/s"
+    logger.info(f"Read rate {rate:.1f} ops/s meets {ops:g} ops/s")
+
+
+@then(parsers.re(r"the p(?P<percentile>[\d.]+) read latency should be below (?P<limit>[\d.]+)(?P<unit>ms|s)"
+                 r"(?: at (?P<ops>[\d.]+) ops/s)?"),
+      converters={"percentile": float, "limit": float})
+def verify_read_latency(perf_window, percentile, limit, unit, ops):
+    """Verify a read latency percentile, optionally at a minimum read rate."""
+    limit_seconds = limit / 1000 if unit == "ms" else limit
+    latency = perf_window.quantile(READ_LATENCY, percentile / 100)
+    assert latency is not None, "No reads were observed"
+    assert latency < limit_seconds, \
+        f"p{percentile:g} read latency {latency * 1000:.1f}ms is not below {limit_seconds * 1000:g}ms"
+    if ops:
+        # A latency SLO only holds at the load it was measured under
+        rate = _read_rate(perf_window)
+        assert rate >= float(ops), \
+            f"p{percentile:g} latency met, but at {rate:.1f} ops/s instead of {float(ops):g} ops/s"
+    logger.info(f"p{percentile:g} read latency {latency * 1000:.1f}ms is below {limit_seconds * 1000:g}ms")
+
+
+@then(parsers.re(r"the read error ratio should be below (?P<percent>[\d.]+)%"), converters={"percent": float})
+def verify_read_errors(perf_window, percent):
+    """Verify the share of failed reads."""
+    errors = perf_window.value(READ_ERRORS)
+    attempts = perf_window.value(READ_OPS) + errors
+    assert attempts > 0, "No reads were attempted"
+    ratio = errors / attempts * 100
+    assert ratio < percent, f"Read error ratio {ratio:.2f}% ({errors:.0f}/{attempts:.0f}) is not below {percent:g}%"
+    logger.info(f"Read error ratio {ratio:.2f}% is below {percent:g}%")
@@ -0,0 +1,119 @@
+import re
+import pytest
+from pytest_bdd import when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.load_coordinator import LoadCoordinator, packing_limit
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+scenarios("../features/gcs_fuse_scaling.feature")
+
+# Scales the shared perf reader deployment up and down
+pytestmark = [
+    pytest.mark.cluster_lock("perf-reader"),
+    pytest.mark.xdist_group("perf-reader"),
+]
+
+
+@when(parsers.re(r"coordinated read phases of (?P<duration>\d+) seconds run with (?P<counts>[\d, and]+) clients"
+                 r"(?: (?P<placement>on one node|spread across nodes))? reading every (?P<interval>[\d.]+) seconds"),
+      converters={"duration": int, "interval": float}, target_fixture="scaling_curve")
+def run_scaling_curve(k8s_client, async_k8s_client, perf_workload, perf_pods, benchmark_recorder,
+                      duration, counts, placement, interval):
+    """Run one synchronized phase per client count and record the curve."""
+    client_counts = [int(count) for count in re.findall(r"\d+", counts)]
+    coordinator = LoadCoordinator(k8s_client, async_k8s_client, perf_workload)
+    try:
+        node_name = None
+        if placement == "on one node":
+            # Pack onto the node the perf reader was first scheduled to
+            node_name = k8s_client("CoreV1Api").read_namespaced_pod(
+                name=perf_pods[0], namespace=perf_workload.namespace
+            ).spec.node_name
+        curve = coordinator.scaling_curve(client_counts, duration, interval, node_name=node_name,
+                                          spread=placement == "spread across nodes")
+    except Exception as e:
+        pytest.fail(f"Failed to run the coordinated read phases: {str(e)}")
+
+    prefix = {None: "scaling", "on one node": "packing", "spread across nodes": "spread"}[placement]
+    for point in curve:
+        name = f"{prefix}_{point['clients']}_clients"
+        benchmark_recorder.record(f"{name}_throughput", [point["throughput"]], unit="bytes/s",
+                                  lower_is_better=False, clients=point["clients"], nodes=point["nodes"])
+        benchmark_recorder.record(f"{name}_pod_throughput", [pod["throughput"] for pod in point["pods"].values()],
+                                  unit="bytes/s", lower_is_better=False, clients=point["clients"],
+                                  nodes=point["nodes"])
+        if point["p99"] is not None:
+            benchmark_recorder.record(f"{name}_latency_p99", [point["p99"]], clients=point["clients"])
+        if point["max_pod_p99"] is not None:
+            benchmark_recorder.record(f"{name}_pod_latency_p99", [point["max_pod_p99"]], clients=point["clients"])
+    single = curve[0]["throughput"]
+    logger.info("Scaling curve: " + ", ".join(
+        f"{point['clients']} clients {point['throughput'] / 1024 / 1024:.2f} MiB/s "
+        f"(x{point['throughput'] / single if single else float('nan'):.2f}, "
+        f"{point['pod_throughput'] / 1024 / 1024:.2f} MiB/s per pod)" for point in curve
+    ))
+    return {point["clients"]: point for point in curve}
+
+
+@then(parsers.re(r"every phase should start within (?P<limit>[\d.]+) seconds? on all clients"),
+      converters={"limit": float})
+def verify_start_skew(scaling_curve, limit):
+    """Verify the barrier: the first and last pod of each phase started close together."""
+    for clients, point in scaling_curve.items():
+        assert point["start_skew"] <= limit, \
+            f"The {clients}-client phase started {point['start_skew']:.2f}s apart, more than {limit:g}s"
+    logger.info(f"All phases started within {max(p['start_skew'] for p in scaling_curve.values()):.3f}s")
+
+
+@then(parsers.re(r"the read error ratio of every phase should be below (?P<percent>[\d.]+)%"),
+      converters={"percent": float})
+def verify_phase_errors(scaling_curve, percent):
+    """Verify the share of failed reads in each phase."""
+    for clients, point in scaling_curve.items():
+        attempts = point["ops"] + point["errors"]
+        assert attempts > 0, f"No reads were attempted with {clients} clients"
+        ratio = point["errors"] / attempts * 100
+        assert ratio < percent, f"Read error ratio {ratio:.2f}% with {clients} clients is not below {percent:g}%"
+
+
+@then(parsers.re(r"aggregate read throughput with (?P<clients>\d+) clients should be at least (?P<factor>[\d.]+) "
+                 r"times that with (?P<baseline>\d+) clients?"),
+      converters={"clients": int, "factor": float, "baseline": int})
+def verify_scaling(scaling_curve, clients, factor, baseline):
+    """Verify how aggregate throughput grows between two client counts."""
+    for count in (clients, baseline):
+        assert count in scaling_curve, f"No phase ran with {count} clients"
+    ratio = scaling_curve[clients]["throughput"] / scaling_curve[baseline]["throughput"] \
+        if scaling_curve[baseline]["throughput"] else 0.0
+    assert ratio >= factor, \
+        f"Throughput with {clients} clients is {ratio:.2f} times that with {baseline}, less than {factor:g}"
+    logger.info(f"Throughput with {clients} clients is {ratio:.2f} times that with {baseline}")
+
+
+@then(parsers.re(r"per-pod read throughput with (?P<clients>\d+) clients should be at least (?P<factor>[\d.]+) "
+                 r"times that with (?P<baseline>\d+) clients?"),
+      converters={"clients": int, "factor": float, "baseline": int})
+def verify_pod_throughput(scaling_curve, clients, factor, baseline):
+    """Verify how much each pod's throughput drops as more pods read alongside it."""
+    for count in (clients, baseline):
+        assert count in scaling_curve, f"No phase ran with {count} clients"
+    ratio = scaling_curve[clients]["pod_throughput"] / scaling_curve[baseline]["pod_throughput"] \
+        if scaling_curve[baseline]["pod_throughput"] else 0.0
+    assert ratio >= factor, \
+        f"Per-pod throughput with {clients} clients is {ratio:.2f} times that with {baseline}, less than {factor:g}"
+    logger.info(f"Per-pod throughput with {clients} clients is {ratio:.2f} times that with {baseline}")
+
+
+@then(parsers.re(r"at least (?P<pods>\d+) reader pods should fit on one node at (?P<percent>[\d.]+)% per-pod "
+                 r"throughput"),
+      converters={"pods": int, "percent": float})
+def verify_packing_limit(scaling_curve, benchmark_recorder, pods, percent):
+    """Verify how many pods share a node before each one's throughput falls below a share of a lone pod's."""
+    curve = [scaling_curve[clients] for clients in sorted(scaling_curve)]
+    limit = packing_limit(curve, percent / 100)
+    benchmark_recorder.record("packing_limit", [limit], unit="pods", lower_is_better=False, efficiency=percent)
+    logger.info(f"{limit} reader pods fit on one node at {percent:g}% per-pod throughput")
+    assert limit >= pods, \
+        f"Only {limit} reader pods fit on one node at {percent:g}% per-pod throughput, fewer than {pods}"
@@ -0,0 +1,127 @@
+import pytest
+import time
+from pytest_bdd import when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.polling import current_deadline
+from src.utils.prometheus_scrape import snapshot
+from src.utils.perf_workload import READ_ERRORS, READ_LATENCY, READ_OPS
+from src.utils.soak import kubelet_stats, pod_usage
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+scenarios("../features/gcs_fuse_soak.feature")
+
+# Gherkin name -> (aggregator series, statistic, benchmark name)
+TRENDS = {
+    "sidecar memory": ("sidecar_memory_bytes", "max", "soak_sidecar_memory"),
+    "cache usage": ("cache_used_bytes", "max", "soak_cache_usage"),
+}
+
+# Shares the perf reader deployment with the load test; the deadline covers
+# the soak itself plus the rollout and teardown
+pytestmark = [
+    pytest.mark.cluster_lock("perf-reader"),
+    pytest.mark.xdist_group("perf-reader"),
+    pytest.mark.deadline(CONFIG["soak"]["duration"] + CONFIG["perf"]["rollout_timeout"] + 600),
+]
+
+
+def _sample_usage(core_api, perf_workload, soak_aggregator, timestamp):
+    """Add the largest sidecar working set and cache volume usage among the reader pods."""
+    pods = core_api.list_namespaced_pod(namespace=perf_workload.namespace,
+                                        label_selector=perf_workload.label_selector)
+    nodes = {}
+    for pod in pods.items:
+        if pod.spec.node_name and pod.metadata.deletion_timestamp is None:
+            nodes.setdefault(pod.spec.node_name, []).append(pod.metadata.name)
+    memory, cache = [], []
+    for node_name, pod_names in nodes.items():
+        usage = pod_usage(kubelet_stats(core_api, node_name), perf_workload.namespace, pod_names,
+                          CONFIG["sidecar"]["container"], CONFIG["soak"]["cache_volume"])
+        memory += [pod["memory"] for pod in usage.values() if pod["memory"] is not None]
+        cache += [pod["volume"] for pod in usage.values() if pod["volume"] is not None]
+    if memory:
+        soak_aggregator.add_gauge(timestamp, "sidecar_memory_bytes", max(memory))
+    if cache:
+        soak_aggregator.add_gauge(timestamp, "cache_used_bytes", max(cache))
+
+
+@when("the perf reader soaks for the configured duration", target_fixture="soak_window")
+def run_soak(k8s_client, async_k8s_client, perf_workload, perf_pods, benchmark_recorder, soak_aggregator):
+    """
+    Sample the reader pods for [soak] duration seconds into rolling windows.
+
+    Pods replaced during the run are picked up at the next sample.
+    """
+    duration = CONFIG["soak"]["duration"]
+    sample_interval = CONFIG["soak"]["sample_interval"]
+    method = CONFIG["perf"]["scrape_method"]
+    port = CONFIG["perf"]["metrics_port"]
+    deadline = current_deadline()
+    if deadline is not None and deadline.remaining() < duration:
+        pytest.fail(f"Scenario deadline '{deadline.name}' leaves {deadline.remaining():.0f}s, "
+                    f"less than the {duration}s soak")
+
+    core_api = k8s_client("CoreV1Api")
+    logger.info(f"Soaking the perf reader for {duration}s, sampling every {sample_interval}s")
+    try:
+        pod_names = perf_pods
+        first = previous = snapshot(k8s_client, async_k8s_client, pod_names, perf_workload.namespace, port,
+                                    method=method)
+        assert first.pods, "No perf reader pod could be scraped"
+        ops = errors = 0.0
+        while time.time() - first.timestamp < duration:
+            time.sleep(min(sample_interval, max(duration - (time.time() - first.timestamp), 0)))
+            pod_names = perf_workload.pod_names() or pod_names
+            current = snapshot(k8s_client, async_k8s_client, pod_names, perf_workload.namespace, port,
+                               method=method, previous=previous)
+            step = current.delta(previous)
+            soak_aggregator.add_latency(current.timestamp, "read_latency", step.buckets(READ_LATENCY))
+            ops += step.value(READ_OPS)
+            errors += step.value(READ_ERRORS)
+            previous = current
+            # Missing kubelet stats leave a gap in the windows rather than ending the soak
+            try:
+                _sample_usage(core_api, perf_workload, soak_aggregator, current.timestamp)
+            except Exception as e:
+                logger.warning(f"Failed to sample kubelet stats: {str(e)}")
+
+        elapsed = previous.timestamp - first.timestamp
+        logger.info(f"Soaked for {elapsed:.0f}s in {len(soak_aggregator.windows)} windows of "
+                    f"{soak_aggregator.window:g}s: {ops / elapsed if elapsed else 0:.1f} ops/s, {errors:.0f} errors")
+        benchmark_recorder.record("soak_read_rate", [ops / elapsed if elapsed else 0.0], unit="ops/s",
+                                  lower_is_better=False)
+        benchmark_recorder.record("soak_read_errors", [errors], unit="count")
+        return soak_aggregator
+    except Exception as e:
+        pytest.fail(f"Failed to soak the perf reader: {str(e)}")
+
+
+def _verify_trend(soak_window, benchmark_recorder, label, series, statistic, benchmark):
+    soak_config = CONFIG["soak"]
+    trend = soak_window.trend(series, statistic, alpha=soak_config["alpha"], min_change=soak_config["min_change"],
+                              min_windows=soak_config["min_windows"])
+    assert trend["p_value"] is not None, \
+        f"Only {trend['windows']} windows have {label} data, {soak_config['min_windows']} are needed for a trend test"
+    logger.info(f"{label.capitalize()} trend over {trend['windows']} windows: slope {trend['slope']:.4g}/h, "
+                f"{trend['change'] * 100:+.1f}% over the run, p={trend['p_value']:.4g}")
+    benchmark_recorder.record(f"{benchmark}_change", [trend["change"]], unit="ratio")
+    assert not trend["significant"], \
+        f"{label.capitalize()} increased by {trend['change'] * 100:.1f}% over the run " \
+        f"(Mann-Kendall p={trend['p_value']:.4g} < {soak_config['alpha']:g})"
+
+
+@then(parsers.re(r"(?P<name>sidecar memory|cache usage) should show no significant upward trend"))
+def verify_usage_trend(soak_window, benchmark_recorder, name):
+    """Verify that a per-window resource usage series does not grow over the soak."""
+    series, statistic, benchmark = TRENDS[name]
+    _verify_trend(soak_window, benchmark_recorder, name, series, statistic, benchmark)
+
+
+@then(parsers.re(r"the p(?P<percentile>[\d.]+) read latency should show no significant upward trend"),
+      converters={"percentile": float})
+def verify_latency_trend(soak_window, benchmark_recorder, percentile):
+    """Verify that a per-window read latency percentile does not grow over the soak."""
+    _verify_trend(soak_window, benchmark_recorder, f"p{percentile:g} read latency", "read_latency",
+                  f"p{percentile:g}", f"soak_read_latency_p{percentile:g}")
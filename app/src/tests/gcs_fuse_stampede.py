@@ -0,0 +1,132 @@
+import pytest
+import time
+import uuid
+from pytest_bdd import given, when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.data_provisioning import DataProvisioner
+from src.utils.pod_exec import exec_command
+from src.utils.prometheus_scrape import snapshot
+from src.utils.stampede import read_at_once, summarize
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+scenarios("../features/gcs_fuse_stampede.feature")
+
+# Pins the shared perf reader deployment to one node
+pytestmark = [
+    pytest.mark.cluster_lock("perf-reader"),
+    pytest.mark.xdist_group("perf-reader"),
+]
+
+
+@given(parsers.re(r"(?P<replicas>\d+) reader pods? (?:is|are) deployed on one node"), converters={"replicas": int},
+       target_fixture="stampede_target")
+def deploy_on_one_node(k8s_client, perf_workload, replicas):
+    """Deploy idle reader pods, all on the node the first one was scheduled to."""
+    env = {"MODE": "coordinated"}
+    try:
+        perf_workload.deploy(1, env=env)
+        first = perf_workload.wait_ready(1)[0]
+        node_name = k8s_client("CoreV1Api").read_namespaced_pod(name=first, namespace=perf_workload.namespace) \
+            .spec.node_name
+        perf_workload.deploy(replicas, env=env, node_name=node_name)
+        pod_names = perf_workload.wait_ready(replicas)
+        logger.info(f"{replicas} reader pods on node '{node_name}': {', '.join(pod_names)}")
+        return {"node": node_name, "pods": pod_names, "env": env}
+    except Exception as e:
+        pytest.fail(f"Failed to deploy reader pods on one node: {str(e)}")
+
+
+def _fetched_bytes(k8s_client, async_k8s_client, pod_names, namespace, previous=None):
+    port = CONFIG["sidecar"]["gcsfuse_metrics_port"]
+    if not port:
+        return None
+    return snapshot(k8s_client, async_k8s_client, pod_names, namespace, port, method=CONFIG["perf"]["scrape_method"],
+                    previous=previous)
+
+
+@when(parsers.re(r"(?:(?P<processes>\d+) processes in each pod|they all) read the same cold (?P<size>\d+) MiB object "
+                 r"at once"),
+      converters={"size": int}, target_fixture="stampede_result")
+def read_same_object(k8s_client, async_k8s_client, perf_workload, stampede_target, benchmark_recorder, processes,
+                     size):
+    """Write a new object, restart the readers so no cache holds it, and read it everywhere at once."""
+    readers_per_pod = int(processes) if processes else 1
+    size_bytes = size * 1024 * 1024
+    namespace = perf_workload.namespace
+    path = f"{CONFIG['perf']['mount_path']}/stampede-{uuid.uuid4().hex[:12]}.bin"
+    core_api = k8s_client("CoreV1Api")
+    pod_names = stampede_target["pods"]
+    try:
+        provisioner = DataProvisioner(k8s_client, namespace, container=perf_workload.container)
+        provisioner.generate(pod_names[0], path, size_bytes, seed=CONFIG["provisioning"]["seed"])
+        # New pods have new mounts and empty file caches: the object is cold for every reader
+        env = dict(stampede_target["env"], STAMPEDE_OBJECT=path)
+        perf_workload.deploy(len(pod_names), env=env, node_name=stampede_target["node"])
+        pod_names = perf_workload.wait_ready(len(pod_names))
+
+        before = _fetched_bytes(k8s_client, async_k8s_client, pod_names, namespace)
+        start_at = time.time() + CONFIG["stampede"]["barrier_lead"]
+        logger.info(f"{readers_per_pod} readers in each of {len(pod_names)} pods read {path} ({size} MiB) at once")
+        readers = async_k8s_client.run(read_at_once(
+            async_k8s_client, pod_names, namespace, path, readers_per_pod=readers_per_pod, start_at=start_at,
+            block_size=CONFIG["stampede"]["block_size"], container=perf_workload.container
+        ))
+        after = _fetched_bytes(k8s_client, async_k8s_client, pod_names, namespace, previous=before)
+        fetched = after.delta(before).value(CONFIG["stampede"]["gcs_bytes_metric"]) if before is not None else None
+        result = summarize(readers, size_bytes, fetched)
+    except Exception as e:
+        pytest.fail(f"Failed to read the same object at once: {str(e)}")
+    finally:
+        try:
+            exec_command(core_api, pod_names[0], namespace, ["rm", "-f", path], container=perf_workload.container)
+        except Exception as e:
+            logger.warning(f"Failed to delete {path}: {str(e)}")
+
+    name = f"stampede_{'processes' if processes else 'pods'}"
+    logger.info(
+        f"{result['readers']} readers: fastest {result['fastest']:.2f}s, median {result['median']:.2f}s, "
+        f"slowest {result['slowest']:.2f}s, started within {result['start_spread'] * 1000:.0f}ms, "
+        f"{result['aggregate_throughput'] / 1024 / 1024:.1f} MiB/s in total, "
+        + (f"{result['download_amplification']:.2f} downloads of the object" if fetched is not None
+           else "GCS bytes unknown ([sidecar] gcsfuse_metrics_port is not set)")
+    )
+    benchmark_recorder.record(f"{name}_read", [reader["seconds"] for reader in readers],
+                              readers=result["readers"], size=size_bytes)
+    benchmark_recorder.record(f"{name}_throughput", [result["aggregate_throughput"]], unit="bytes/s",
+                              lower_is_better=False)
+    if fetched is not None:
+        benchmark_recorder.record(f"{name}_download_amplification", [result["download_amplification"]],
+                                  unit="ratio")
+    return result
+
+
+@then("every reader should read the whole object")
+def verify_whole_object(stampede_result):
+    """Verify no reader failed or got a short read."""
+    failed = stampede_result["failed"]
+    assert not failed, f"{len(failed)} of {stampede_result['readers']} readers did not read the whole object: " \
+        + "; ".join(f"{r['pod']}#{r['reader']}: {r['error'] or str(r['bytes']) + ' bytes'}" for r in failed[:5])
+
+
+@then(parsers.re(r"the object should be downloaded from GCS at most (?P<times>[\d.]+) times"),
+      converters={"times": float})
+def verify_download_amplification(stampede_result, times):
+    """Verify how many times the object's bytes were fetched from GCS."""
+    amplification = stampede_result["download_amplification"]
+    assert amplification is not None, \
+        "Bytes fetched from GCS are unknown: enable gcsfuse metrics and set [sidecar] gcsfuse_metrics_port"
+    assert amplification <= times, \
+        f"The object was downloaded {amplification:.2f} times, more than {times:g}"
+    logger.info(f"The object was downloaded {amplification:.2f} times")
+
+
+@then(parsers.re(r"the slowest reader should take at most (?P<factor>[\d.]+) times as long as the fastest"),
+      converters={"factor": float})
+def verify_reader_fairness(stampede_result, factor):
+    """Verify readers of the same object finish close together."""
+    ratio = stampede_result["slowest"] / stampede_result["fastest"] if stampede_result["fastest"] > 0 else 0.0
+    assert ratio <= factor, \
+        f"The slowest reader took {ratio:.2f} times as long as the fastest " \
+        f"({stampede_result['slowest']:.2f}s vs {stampede_result['fastest']:.2f}s)"
@@ -0,0 +1,79 @@
+import pytest
+from pytest_bdd import when, then, scenarios, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.trace_replay import TraceReplayer, load_trace
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+scenarios("../features/gcs_fuse_trace_replay.feature")
+
+# Replays run in the shared perf reader pods
+pytestmark = [
+    pytest.mark.cluster_lock("perf-reader"),
+    pytest.mark.xdist_group("perf-reader"),
+]
+
+
+@when(parsers.re(r'the access trace "(?P<trace>[^"]+)" is replayed (?P<target>on every reader pod|split across '
+                 r'the reader pods) (?:at (?P<speed>[\d.]+)x speed|(?P<unpaced>as fast as possible))'),
+      target_fixture="replay_result")
+def replay_trace(k8s_client, async_k8s_client, perf_workload, perf_pods, benchmark_recorder, trace, target, speed,
+                 unpaced):
+    """Replay a trace file on the reader pods and record per-operation latencies."""
+    mode = "replicate" if target == "on every reader pod" else "split"
+    speed = 0.0 if unpaced else float(speed)
+    try:
+        records = load_trace(trace, CONFIG["replay"]["mount_path"])
+        assert records, f"Trace '{trace}' has no operations"
+        replayer = TraceReplayer(k8s_client, async_k8s_client, perf_workload.namespace,
+                                 container=perf_workload.container)
+        result = replayer.replay(perf_pods, records, speed=speed, mode=mode)
+    except Exception as e:
+        pytest.fail(f"Failed to replay trace '{trace}': {str(e)}")
+
+    for op, histogram in sorted(result["latency"].items()):
+        logger.info(f"Replayed {histogram.count} '{op}' operations: p50 {histogram.quantile(0.5) * 1000:.2f}ms, "
+                    f"p99 {histogram.quantile(0.99) * 1000:.2f}ms, {result['errors'].get(op, 0)} errors")
+        benchmark_recorder.record(f"replay_{op}_latency_p50", [histogram.quantile(0.5)])
+        benchmark_recorder.record(f"replay_{op}_latency_p99", [histogram.quantile(0.99)])
+    logger.info(f"Replay on {result['pods']} pods took {result['elapsed']:.1f}s, lagging up to {result['lag']:.3f}s; "
+                f"{result['skipped']} unsupported operations skipped")
+    if speed:
+        benchmark_recorder.record("replay_lag", [result["lag"]])
+    else:
+        benchmark_recorder.record("replay_elapsed", [result["elapsed"]])
+    return result
+
+
+@then(parsers.re(r'the p(?P<percentile>[\d.]+) "(?P<op>\w+)" latency should be below (?P<limit>[\d.]+)(?P<unit>ms|s)'),
+      converters={"percentile": float, "limit": float})
+def verify_replay_latency(replay_result, percentile, op, limit, unit):
+    """Verify a latency percentile of one operation type."""
+    limit_seconds = limit / 1000 if unit == "ms" else limit
+    histogram = replay_result["latency"].get(op)
+    assert histogram is not None and histogram.count, f"No '{op}' operations were replayed"
+    latency = histogram.quantile(percentile / 100)
+    assert latency < limit_seconds, \
+        f"p{percentile:g} '{op}' latency {latency * 1000:.1f}ms is not below {limit_seconds * 1000:g}ms"
+    logger.info(f"p{percentile:g} '{op}' latency {latency * 1000:.1f}ms is below {limit_seconds * 1000:g}ms")
+
+
+@then(parsers.re(r"the replayed operation error ratio should be below (?P<percent>[\d.]+)%"),
+      converters={"percent": float})
+def verify_replay_errors(replay_result, percent):
+    """Verify the share of replayed operations that failed."""
+    errors = sum(replay_result["errors"].values())
+    total = sum(histogram.count for histogram in replay_result["latency"].values())
+    assert total > 0, "No operations were replayed"
+    failed = {op: count for op, count in replay_result["errors"].items() if count}
+    ratio = errors / total * 100
+    assert ratio < percent, f"{ratio:.2f}% of replayed operations failed ({failed}), not below {percent:g}%"
+
+
+@then(parsers.re(r"the replay should lag the trace by less than (?P<seconds>[\d.]+) seconds?"),
+      converters={"seconds": float})
+def verify_replay_lag(replay_result, seconds):
+    """Verify the replay kept to the trace's timing, so its latencies reflect the original load."""
+    assert replay_result["lag"] < seconds, \
+        f"Operations started up to {replay_result['lag']:.2f}s late, not less than {seconds:g}s"
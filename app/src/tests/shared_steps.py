@@ -0,0 +1,109 @@
+"""
+Step definitions shared by every feature.
+
+conftest.py imports this module, which makes the steps available to all test
+modules. A test module can still override a step by defining the same text
+locally.
+"""
+import pytest
+from pytest_bdd import given, when, parsers
+from src.utils.logging_util import get_logger
+from src.utils.config_util import load_config
+from src.utils.polling import poll_until
+
+logger = get_logger(__name__)
+CONFIG = load_config()
+
+
+@given("a GKE cluster is running")
+def verify_cluster_running(cluster_snapshot):
+    """Verify that the Kubernetes cluster is accessible."""
+    logger.info("Verifying Kubernetes cluster is running...")
+
+    try:
+        nodes = cluster_snapshot.nodes
+        assert nodes, "No nodes found in the cluster"
+        logger.info(f"Kubernetes cluster verification successful. Found {len(nodes)} nodes.")
+    except Exception as e:
+        pytest.fail(f"Failed to verify cluster is running: {str(e)}")
+
+
+@given('a deployment named "gcs-fuse" exists in the "default" namespace')
+def verify_deployment_exists(cluster_snapshot):
+    """Ensure the deployment exists in the specified namespace."""
+    namespace = CONFIG["gcs_fuse"]["namespace"]
+    deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
+
+    logger.info(f"Checking if deployment '{deployment_name}' exists in namespace '{namespace}'...")
+    response = cluster_snapshot.deployment
+    assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
+    logger.info(f"Deployment '{deployment_name}' exists.")
+
+
+@given("the cluster autoscaler is configured properly")
+def verify_autoscaler_config(k8s_client):
+    """Verify cluster autoscaler configuration."""
+    logger.info("Verifying cluster autoscaler configuration...")
+    core_api = k8s_client("CoreV1Api")
+
+    try:
+        configmap = core_api.read_namespaced_config_map(
+            name="cluster-autoscaler-status",
+            namespace="kube-system"
+        )
+        assert configmap.data is not None, "Autoscaler configuration not found"
+        logger.info("Cluster autoscaler is properly configured")
+    except Exception as e:
+        pytest.fail(f"Failed to verify autoscaler configuration: {str(e)}")
+
+
+@when('the deployment starts')
+def verify_pod_running(k8s_client):
+    """Ensure the pod for the deployment is running."""
+    namespace = CONFIG["gcs_fuse"]["namespace"]
+    deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
+    app_label = CONFIG["gcs_fuse"]["app_label"]
+    retry_count = CONFIG["gcs_fuse"]["retry_count"]
+    retry_interval = CONFIG["gcs_fuse"]["retry_interval"]
+
+    core_api = k8s_client("CoreV1Api")
+
+    def running_pod():
+        logger.info(f"Checking if pod for deployment '{deployment_name}' is running...")
+        pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
+        return next((pod.metadata.name for pod in pods.items if pod.status.phase == "Running"), None)
+
+    try:
+        pod_name = poll_until(running_pod, "deployment_start",
+                              timeout=retry_count * retry_interval, max_interval=retry_interval).value
+    except TimeoutError as e:
+        pytest.fail(f"Pod for deployment '{deployment_name}' did not start running: {str(e)}")
+    logger.info(f"Pod '{pod_name}' is running.")
+    return pod_name
+
+
+@given(parsers.parse("the perf reader is deployed with {replicas:d} replicas reading every {interval:g} seconds"),
+       target_fixture="perf_pods")
+def deploy_perf_reader(perf_workload, replicas, interval):
+    """Deploy the perf reader and wait for all its pods to be ready."""
+    logger.info(f"Deploying perf reader with {replicas} replicas, {interval}s between reads...")
+
+    try:
+        perf_workload.deploy(replicas, env={"SLEEP_INTERVAL": interval})
+        pod_names = perf_workload.wait_ready(replicas)
+        logger.info(f"Perf reader pods ready: {', '.join(pod_names)}")
+        return pod_names
+    except Exception as e:
+        pytest.fail(f"Failed to deploy the perf reader: {str(e)}")
+
+
+@given(parsers.re(r"the perf reader is deployed in coordinated mode(?: with (?P<replicas>\d+) replicas)?"),
+       target_fixture="perf_pods")
+def deploy_coordinated_reader(perf_workload, replicas):
+    """Deploy reader pods (one by default) that wait for the runner instead of reading."""
+    replicas = int(replicas) if replicas else 1
+    try:
+        perf_workload.deploy(replicas, env={"MODE": "coordinated"})
+        return perf_workload.wait_ready(replicas)
+    except Exception as e:
+        pytest.fail(f"Failed to deploy the perf reader in coordinated mode: {str(e)}")
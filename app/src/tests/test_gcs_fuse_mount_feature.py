@@ -1,82 +1,67 @@
 import pytest
-from pytest_bdd import given, when, then, scenarios
+from pytest_bdd import then, scenarios
 from src.utils.logging_util import get_logger
-import time
 from src.utils.config_util import load_config
-from kubernetes.stream import stream
+from src.utils.pod_exec import exec_command
+from src.utils.polling import current_deadline
 
 logger = get_logger(__name__)
 CONFIG = load_config()
 scenarios("../features/gcs_fuse_mount.feature")
 
-@given("a GKE cluster is running")
-def verify_cluster_running(k8s_client):
-    """Verify that the Kubernetes cluster is accessible."""
-    logger.info("Verifying Kubernetes cluster is running...")
-    assert k8s_client is not None, "Kubernetes client could not be initialized."
-    logger.info("Kubernetes cluster verification successful.")
+# Execs into the shared gcs-fuse deployment, whose pods the scaling modules delete:
+# hold the same lease and stay on their xdist worker
+pytestmark = [
+    pytest.mark.cluster_lock(f"deployment-{CONFIG['gcs_fuse']['deployment_name']}",
+                             f"daemonset-{CONFIG['gcs_fuse']['driver_daemonset']}"),
+    pytest.mark.xdist_group("gcs-fuse-deployment"),
+]
 
-@given('a deployment named "gcs-fuse" exists in the "default" namespace')
-def verify_deployment_exists(k8s_client):
-    """Ensure the deployment exists in the specified namespace."""
-    namespace = CONFIG["gcs_fuse"]["namespace"]
-    deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
-
-    apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Checking if deployment '{deployment_name}' exists in namespace '{namespace}'...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-    assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
-    logger.info(f"Deployment '{deployment_name}' exists.")
-
-@when('the deployment starts')
-def verify_pod_running(k8s_client):
-    """Ensure the pod for the deployment is running."""
+@then("the GCS FUSE mount should be accessible")
+def verify_gcs_fuse_mount(k8s_client, pod_selector):
+    """Ensure the GCS FUSE mount is accessible inside the selected pods."""
     namespace = CONFIG["gcs_fuse"]["namespace"]
     deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
+    mount_path = CONFIG["gcs_fuse"]["mount_path"]
     app_label = CONFIG["gcs_fuse"]["app_label"]
-    retry_count = CONFIG["gcs_fuse"]["retry_count"]
-    retry_interval = CONFIG["gcs_fuse"]["retry_interval"]
 
     core_api = k8s_client("CoreV1Api")
 
-    for _ in range(retry_count):
-        logger.info(f"Checking if pod for deployment '{deployment_name}' is running...")
-        pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
-        for pod in pods.items:
-            if pod.status.phase == "Running":
-                logger.info(f"Pod '{pod.metadata.name}' is running.")
-                return pod.metadata.name
-        time.sleep(retry_interval)
-    
-    pytest.fail(f"Pod for deployment '{deployment_name}' did not start running.")
+    try:
+        pods = pod_selector.select(namespace, f"app={app_label}")
+    except Exception as e:
+        pytest.fail(f"No pod found for deployment '{deployment_name}': {str(e)}")
 
-@then("the GCS FUSE mount should be accessible")
-def verify_gcs_fuse_mount(k8s_client):
-    """Ensure the GCS FUSE mount is accessible inside the pod."""
-    namespace = CONFIG["gcs_fuse"]["namespace"]
-    deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
-    mount_path = CONFIG["gcs_fuse"]["mount_path"]
-    app_label = CONFIG["gcs_fuse"]["app_label"]
+    # The listing stays in the pod: only the exit status says whether the mount is readable
+    command = ["/bin/sh", "-c", 'ls "$1" > /dev/null', "sh", mount_path]
 
-    core_api = k8s_client("CoreV1Api")
+    for pod in pods:
+        pod_name = pod.metadata.name
+        logger.info(f"Checking if GCS FUSE mount is accessible on pod '{pod_name}' (node '{pod.spec.node_name}') "
+                    f"at path '{mount_path}'...")
+        try:
+            exec_command(core_api, pod_name, namespace, command, check=True)
+            logger.info(f"GCS FUSE mount at '{mount_path}' is accessible on node '{pod.spec.node_name}'.")
+        except Exception as e:
+            pytest.fail(f"Failed to access GCS FUSE mount in pod '{pod_name}' on node '{pod.spec.node_name}': "
+                        f"{str(e)}")
 
-    pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
-    assert pods.items, f"No pod found for deployment '{deployment_name}'."
-    pod_name = pods.items[0].metadata.name
 
-    logger.info(f"Checking if GCS FUSE mount is accessible on pod '{pod_name}' at path '{mount_path}'...")
+@then("a command can be executed in a pod while the scenario deadline is active")
+def verify_exec_under_deadline(k8s_client, pod_selector):
+    """Ensure an exec still works when the deadline bounds every API call."""
+    namespace = CONFIG["gcs_fuse"]["namespace"]
+    app_label = CONFIG["gcs_fuse"]["app_label"]
 
-    exec_command = ["/bin/sh", "-c", f"ls {mount_path}"]
+    # The autouse scenario_deadline fixture sets the timeout of every call, execs included
+    deadline = current_deadline()
+    assert deadline is not None, "No scenario deadline is active"
 
+    core_api = k8s_client("CoreV1Api")
     try:
-        exec_response = stream(
-            core_api.connect_get_namespaced_pod_exec,
-            name=pod_name,
-            namespace=namespace,
-            command=exec_command,
-            stderr=True, stdin=False, stdout=True, tty=False
-        )
-        assert isinstance(exec_response, str), f"GCS FUSE mount at '{mount_path}' is inaccessible."
-        logger.info(f"GCS FUSE mount at '{mount_path}' is accessible.")
+        pod = pod_selector.select(namespace, f"app={app_label}", strategy="random", count=1)[0]
+        result = exec_command(core_api, pod.metadata.name, namespace, ["/bin/sh", "-c", "echo exec-ok"], check=True)
     except Exception as e:
-        pytest.fail(f"Failed to access GCS FUSE mount: {str(e)}") 
\ No newline at end of file
+        pytest.fail(f"Exec failed while the scenario deadline was active: {str(e)}")
+    assert result.stdout_text.strip() == "exec-ok", f"Unexpected exec output: '{result.stdout_text.strip()}'"
+    logger.info(f"Exec in pod '{pod.metadata.name}' succeeded under the scenario deadline")
@@ -1,9 +1,11 @@
 import pytest
 from pytest_bdd import given, when, then, scenarios
 from src.utils.logging_util import get_logger
-import time
 from src.utils.config_util import load_config
-from kubernetes.stream import stream
+from src.utils.polling import Deadline, poll_until
+from src.utils.data_provisioning import DataProvisioner, generated_digest
+from src.utils.integrity import checksum_failures, checksum_pods, digest_bytes
+from src.utils.pod_exec import exec_command
 
 logger = get_logger(__name__)
 # Load configuration once at module level
@@ -11,21 +13,22 @@ CONFIG = load_config()
 # Link the Gherkin feature file
 scenarios("../features/gcs_fuse_multi_pod_mount.feature")
 
-# Store original replica count
-original_replicas = None
-
-@given("a GKE cluster is running")
-def verify_cluster_running(k8s_client):
-    """Verify that the Kubernetes cluster is accessible."""
-    logger.info("Verifying Kubernetes cluster is running...")
-    assert k8s_client is not None, "Kubernetes client could not be initialized."
-    logger.info("Kubernetes cluster verification successful.")
+# The scenario changes the shared deployment's replica count: keep it on one
+# xdist worker with the other scaling modules and hold the cluster lease meanwhile
+pytestmark = [
+    pytest.mark.cluster_lock(f"deployment-{CONFIG['gcs_fuse']['deployment_name']}",
+                             f"daemonset-{CONFIG['gcs_fuse']['driver_daemonset']}"),
+    pytest.mark.xdist_group("gcs-fuse-deployment"),
+]
 
+@pytest.fixture
+def replica_state():
+    """Replica count to restore once the scenario finishes."""
+    return {}
 
 @given('a deployment named "gcs-fuse" exists in the "default" namespace')
-def verify_deployment_exists(k8s_client):
+def verify_deployment_exists(k8s_client, cluster_snapshot, replica_state):
     """Ensure the deployment exists in the specified namespace."""
-    global original_replicas
     namespace = CONFIG["gcs_fuse"]["namespace"]
     deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
     replicas = CONFIG["gcs_fuse"]["replicas"]
@@ -38,8 +41,8 @@ def verify_deployment_exists(k8s_client):
     try:
         deployment = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
         # Store original replica count
-        original_replicas = deployment.spec.replicas
-        logger.info(f"Original deployment had {original_replicas} replicas")
+        replica_state["original_replicas"] = deployment.spec.replicas
+        logger.info(f"Original deployment had {deployment.spec.replicas} replicas")
 
         if deployment.spec.replicas < replicas:
             logger.info(f"Updating deployment '{deployment_name}' to have {replicas} replicas...")
@@ -50,7 +53,7 @@ def verify_deployment_exists(k8s_client):
                 body=deployment
             )
             logger.info(f"Deployment updated to have {replicas} replicas.")
-            time.sleep(10)  # Give time for new pods to start
+            cluster_snapshot.refresh("deployment")
     except Exception as e:
         pytest.fail(f"Failed to read or update deployment: {str(e)}")
     
@@ -59,13 +62,14 @@ def verify_deployment_exists(k8s_client):
     logger.info(f"Deployment '{deployment_name}' exists with {response.spec.replicas} replicas.")
 
 @pytest.fixture(autouse=True)
-def cleanup_deployment(k8s_client):
+def cleanup_deployment(k8s_client, cluster_snapshot, replica_state):
     """Cleanup fixture to restore original replica count after test."""
     logger.info("Starting test - cleanup fixture will run after test completion")
     yield  # Test runs here
     logger.info("Test completed - running cleanup to restore original replica count")
     
     # After test completion, restore original replica count
+    original_replicas = replica_state.get("original_replicas")
     if original_replicas is not None:
         namespace = CONFIG["gcs_fuse"]["namespace"]
         deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
@@ -81,9 +85,16 @@ def cleanup_deployment(k8s_client):
                 body=deployment
             )
             logger.info(f"Deployment restored to {original_replicas} replicas.")
-            
-            # Wait for pods to scale down
-            time.sleep(10)
+            cluster_snapshot.refresh("deployment")
+
+            # Wait for pods to scale down; cleanup gets its own budget even
+            # if the scenario ran out of time
+            def scaled_down():
+                status = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace).status
+                return (status.replicas or 0) <= original_replicas
+
+            with Deadline(CONFIG["scaling"]["timeout"], name="restore replicas", inherit=False).activate():
+                poll_until(scaled_down, "deployment_restore", max_interval=CONFIG["gcs_fuse"]["retry_interval"])
         except Exception as e:
             logger.error(f"Failed to restore deployment replicas: {str(e)}")
 
@@ -100,67 +111,96 @@ def verify_pod_running(k8s_client):
     # Retrieve CoreV1Api client for Pod checks
     core_api = k8s_client("CoreV1Api")
 
-    for _ in range(retry_count):
+    def enough_pods_running():
         logger.info(f"Checking if pods for deployment '{deployment_name}' are running...")
         pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
         running_pods = [pod for pod in pods.items if pod.status.phase == "Running"]
-        
-        if len(running_pods) >= replicas:
-            logger.info(f"Found {len(running_pods)} running pods for deployment '{deployment_name}'.")
-            return True
-        
-        time.sleep(retry_interval)
-    
-    pytest.fail(f"Not enough pods for deployment '{deployment_name}' are running.")
+        return running_pods if len(running_pods) >= replicas else None
+
+    try:
+        running_pods = poll_until(enough_pods_running, "deployment_start",
+                                  timeout=retry_count * retry_interval, max_interval=retry_interval).value
+    except TimeoutError as e:
+        pytest.fail(f"Not enough pods for deployment '{deployment_name}' are running: {str(e)}")
+    logger.info(f"Found {len(running_pods)} running pods for deployment '{deployment_name}'.")
+    return True
 
 @then("the GCS FUSE mount should be accessible by all pods in the deployment")
-def verify_gcs_fuse_mount_multi_pod(k8s_client):
-    """Ensure the GCS FUSE mount is accessible inside all pods."""
+def verify_gcs_fuse_mount_multi_pod(k8s_client, async_k8s_client, pod_selector):
+    """Ensure a file written in one pod reads back intact in all the others, hashing it inside the pods."""
     namespace = CONFIG["gcs_fuse"]["namespace"]
     mount_path = CONFIG["gcs_fuse"]["mount_path"]
     app_label = CONFIG["gcs_fuse"]["app_label"]
     test_filename = CONFIG["test"]["multi_pod_test_filename"]
     test_content = CONFIG["test"]["multi_pod_test_content"]
+    algorithm = CONFIG["test"]["checksum_algorithm"]
+    # Written with echo, which appends a newline
+    expected_content = f"{test_content}\n"
 
-    # Create a test file in the first pod
     core_api = k8s_client("CoreV1Api")
-    pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
+    # Every ready pod: the file must be visible to all of them
+    try:
+        pods = pod_selector.select(namespace, f"app={app_label}", strategy="all", count=0)
+    except Exception as e:
+        pytest.fail(f"Not enough pods found for the multi-pod test: {str(e)}")
     
-    assert len(pods.items) >= 2, "Not enough pods found for the multi-pod test."
+    assert len(pods) >= 2, "Not enough pods found for the multi-pod test."
     
     # Write a test file in the first pod
     test_filepath = f"{mount_path}/{test_filename}"
-    first_pod = pods.items[0]
+    first_pod = pods[0]
     logger.info(f"Writing test file from pod '{first_pod.metadata.name}'...")
     
-    write_command = ["/bin/sh", "-c", f"echo '{test_content}' > {test_filepath}"]
-    stream(
-        core_api.connect_get_namespaced_pod_exec,
-        name=first_pod.metadata.name,
-        namespace=namespace,
-        command=write_command,
-        stderr=True, stdin=False, stdout=True, tty=False
-    )
+    try:
+        exec_command(core_api, first_pod.metadata.name, namespace,
+                     ["/bin/sh", "-c", 'echo "$1" > "$2"', "sh", test_content, test_filepath], check=True)
+        # Verify the file is readable from all other pods; only digests come back
+        results = async_k8s_client.run(
+            checksum_pods(async_k8s_client, [pod.metadata.name for pod in pods[1:]], namespace, test_filepath,
+                          algorithm)
+        )
+    except Exception as e:
+        pytest.fail(f"Failed to access the test file from the other pods: {str(e)}")
     
-    # Verify the file is accessible from all other pods
-    for pod in pods.items[1:]:
-        pod_name = pod.metadata.name
-        logger.info(f"Reading test file from pod '{pod_name}'...")
-        
-        read_command = ["/bin/sh", "-c", f"cat {test_filepath}"]
+    failures = checksum_failures(results, digest_bytes(expected_content, algorithm), len(expected_content.encode()),
+                                 algorithm)
+    assert not failures, "Test file mismatch:\n" + "\n".join(failures)
+    logger.info(f"All {len(pods)} pods can access the GCS FUSE mount successfully.")
+
+@then("every pod should compute the same checksum of a large generated file")
+def verify_checksums_multi_pod(k8s_client, async_k8s_client, pod_selector):
+    """Ensure every pod reads a large generated file with its expected digest, hashing it inside the pods."""
+    namespace = CONFIG["gcs_fuse"]["namespace"]
+    app_label = CONFIG["gcs_fuse"]["app_label"]
+    algorithm = CONFIG["test"]["checksum_algorithm"]
+    size = CONFIG["test"]["integrity_file_size"]
+    seed = CONFIG["provisioning"]["seed"]
+    test_filepath = f"{CONFIG['gcs_fuse']['mount_path']}/{CONFIG['test']['integrity_filename']}"
+
+    try:
+        pod_names = [pod.metadata.name
+                     for pod in pod_selector.select(namespace, f"app={app_label}", strategy="all", count=0)]
+    except Exception as e:
+        pytest.fail(f"Not enough running pods found for the multi-pod checksum test: {str(e)}")
+    assert len(pod_names) >= 2, "Not enough running pods found for the multi-pod checksum test."
+
+    core_api = k8s_client("CoreV1Api")
+    provisioner = DataProvisioner(k8s_client, namespace)
+    try:
+        # Generated in the pod from a small seed block, so the file never passes through the runner
+        provisioner.generate(pod_names[0], test_filepath, size, seed=seed)
+        results = async_k8s_client.run(
+            checksum_pods(async_k8s_client, pod_names, namespace, test_filepath, algorithm)
+        )
+    except Exception as e:
+        pytest.fail(f"Failed to compute checksums: {str(e)}")
+    finally:
         try:
-            read_response = stream(
-                core_api.connect_get_namespaced_pod_exec,
-                name=pod_name,
-                namespace=namespace,
-                command=read_command,
-                stderr=True, stdin=False, stdout=True, tty=False
-            )
-            
-            assert read_response.strip() == test_content, \
-                f"Content mismatch in pod '{pod_name}'. Expected: '{test_content}', Got: '{read_response.strip()}'"
-            logger.info(f"File successfully read from pod '{pod_name}'.")
+            exec_command(core_api, pod_names[0], namespace, ["rm", "-f", test_filepath])
         except Exception as e:
-            pytest.fail(f"Failed to access test file in pod '{pod_name}': {str(e)}")
-    
-    logger.info("All pods can access the GCS FUSE mount successfully.") 
\ No newline at end of file
+            logger.warning(f"Failed to delete {test_filepath}: {str(e)}")
+
+    expected_digest = generated_digest(seed, size, provisioner.block_size, algorithm)
+    failures = checksum_failures(results, expected_digest, size, algorithm)
+    assert not failures, "Checksum mismatch:\n" + "\n".join(failures)
+    logger.info(f"All {len(pod_names)} pods read the {size} byte file with {algorithm} {expected_digest}.")
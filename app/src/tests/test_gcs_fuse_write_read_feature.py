@@ -1,94 +1,102 @@
 import pytest
-from pytest_bdd import given, when, then, scenarios
+from pytest_bdd import then, scenarios
 from src.utils.logging_util import get_logger
 import time
 from src.utils.config_util import load_config
-from kubernetes.stream import stream
+from src.utils.data_provisioning import DataProvisioner, generated_digest
+from src.utils.integrity import checksum_failures, checksum_pods, digest_bytes
+from src.utils.pod_exec import exec_command
 
 logger = get_logger(__name__)
 CONFIG = load_config()
 scenarios("../features/gcs_fuse_write_read_file.feature")
 
+# Execs into the shared gcs-fuse deployment, whose pods the scaling modules delete:
+# hold the same lease and stay on their xdist worker
+pytestmark = [
+    pytest.mark.cluster_lock(f"deployment-{CONFIG['gcs_fuse']['deployment_name']}",
+                             f"daemonset-{CONFIG['gcs_fuse']['driver_daemonset']}"),
+    pytest.mark.xdist_group("gcs-fuse-deployment"),
+]
 
-@given("a GKE cluster is running")
-def verify_cluster_running(k8s_client):
-    """Verify that the Kubernetes cluster is accessible."""
-    logger.info("Verifying Kubernetes cluster is running...")
-    assert k8s_client is not None, "Kubernetes client could not be initialized."
-    logger.info("Kubernetes cluster verification successful.")
 
-
-@given('a deployment named "gcs-fuse" exists in the "default" namespace')
-def verify_deployment_exists(k8s_client):
-    """Ensure the deployment exists in the specified namespace."""
-    namespace = CONFIG["gcs_fuse"]["namespace"]
-    deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
-
-    apps_api = k8s_client("AppsV1Api")
-    logger.info(f"Checking if deployment '{deployment_name}' exists in namespace '{namespace}'...")
-    response = apps_api.read_namespaced_deployment(name=deployment_name, namespace=namespace)
-    assert response is not None, f"Deployment '{deployment_name}' does not exist in namespace '{namespace}'."
-    logger.info(f"Deployment '{deployment_name}' exists.")
-
-@when('the deployment starts')
-def verify_pod_running(k8s_client):
-    """Ensure the pod for the deployment is running."""
+@pytest.fixture
+def write_read_pod(pod_selector):
+    """Fixture to provide a random ready pod, so runs cover different nodes."""
     namespace = CONFIG["gcs_fuse"]["namespace"]
-    deployment_name = CONFIG["gcs_fuse"]["deployment_name"]
     app_label = CONFIG["gcs_fuse"]["app_label"]
-    retry_count = CONFIG["gcs_fuse"]["retry_count"]
-    retry_interval = CONFIG["gcs_fuse"]["retry_interval"]
+    try:
+        pod = pod_selector.select(namespace, f"app={app_label}", strategy="random", count=1)[0]
+    except Exception as e:
+        pytest.fail(f"No pods found for app '{app_label}' in namespace '{namespace}': {str(e)}")
+    logger.info(f"Using pod '{pod.metadata.name}' on node '{pod.spec.node_name}'")
+    return pod.metadata.name
 
-    core_api = k8s_client("CoreV1Api")
-
-    for _ in range(retry_count):
-        logger.info(f"Checking if pod for deployment '{deployment_name}' is running...")
-        pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
-        for pod in pods.items:
-            if pod.status.phase == "Running":
-                logger.info(f"Pod '{pod.metadata.name}' is running.")
-                return pod.metadata.name
-        time.sleep(retry_interval)
-    
-    pytest.fail(f"Pod for deployment '{deployment_name}' did not start running.")
 
 @then("a file can be written to and read from the GCS FUSE mount")
-def test_gcs_fuse_read_write(k8s_client):
+def test_gcs_fuse_read_write(k8s_client, async_k8s_client, write_read_pod):
     """Test read and write operations on the GCS FUSE mount."""
     namespace = CONFIG["gcs_fuse"]["namespace"]
     mount_path = CONFIG["gcs_fuse"]["mount_path"]
-    app_label = CONFIG["gcs_fuse"]["app_label"]
     test_filename = CONFIG["test"]["test_filename"]
     test_content = CONFIG["test"]["test_content"]
+    algorithm = CONFIG["test"]["checksum_algorithm"]
 
     core_api = k8s_client("CoreV1Api")
-
-    pods = core_api.list_namespaced_pod(namespace=namespace, label_selector=f"app={app_label}")
-    assert pods.items, f"No pods found for app '{app_label}' in namespace '{namespace}'."
-    pod_name = pods.items[0].metadata.name
-
+    pod_name = write_read_pod
     test_filepath = f"{mount_path}/{test_filename}"
+    # Written with echo, which appends a newline
+    expected_content = f"{test_content}\n"
+
+    try:
+        logger.info(f"Writing test file '{test_filename}' to GCS FUSE...")
+        exec_command(core_api, pod_name, namespace, ["/bin/sh", "-c", 'echo "$1" > "$2"', "sh", test_content,
+                                                     test_filepath], check=True)
+
+        # The file is read back and hashed in the pod; only the digest comes back
+        logger.info(f"Reading test file '{test_filename}' from GCS FUSE...")
+        results = async_k8s_client.run(
+            checksum_pods(async_k8s_client, [pod_name], namespace, test_filepath, algorithm)
+        )
+    except Exception as e:
+        pytest.fail(f"Failed to write and read '{test_filepath}': {str(e)}")
+
+    failures = checksum_failures(results, digest_bytes(expected_content, algorithm), len(expected_content.encode()),
+                                 algorithm)
+    assert not failures, f"Content mismatch: {failures[0]}"
+    logger.info("Read/write test passed.")
+
+
+@then("a large generated file can be written to and read back intact from the GCS FUSE mount")
+def verify_large_file_read_write(k8s_client, async_k8s_client, benchmark_recorder, write_read_pod):
+    """Write a large reproducible file and compare its in-pod digest with the expected one."""
+    namespace = CONFIG["gcs_fuse"]["namespace"]
+    algorithm = CONFIG["test"]["checksum_algorithm"]
+    size = CONFIG["test"]["integrity_file_size"]
+    seed = CONFIG["provisioning"]["seed"]
+    test_filepath = f"{CONFIG['gcs_fuse']['mount_path']}/{CONFIG['test']['integrity_filename']}"
 
-    logger.info(f"Writing test file '{test_filename}' to GCS FUSE...")
-    write_command = ["/bin/sh", "-c", f"echo '{test_content}' > {test_filepath}"]
-    stream(
-        core_api.connect_get_namespaced_pod_exec,
-        name=pod_name,
-        namespace=namespace,
-        command=write_command,
-        stderr=True, stdin=False, stdout=True, tty=False
-    )
-
-    logger.info(f"Reading test file '{test_filename}' from GCS FUSE...")
-    read_command = ["/bin/sh", "-c", f"cat {test_filepath}"]
-    read_response = stream(
-        core_api.connect_get_namespaced_pod_exec,
-        name=pod_name,
-        namespace=namespace,
-        command=read_command,
-        stderr=True, stdin=False, stdout=True, tty=False
-    )
-
-    assert read_response.strip() == test_content, \
-        f"Content mismatch. Expected: '{test_content}', Got: '{read_response.strip()}'"
-    logger.info("Read/write test passed.") 
\ No newline at end of file
+    core_api = k8s_client("CoreV1Api")
+    provisioner = DataProvisioner(k8s_client, namespace)
+    try:
+        _, written, write_time = provisioner.generate(write_read_pod, test_filepath, size, seed=seed)
+        start_time = time.time()
+        results = async_k8s_client.run(
+            checksum_pods(async_k8s_client, [write_read_pod], namespace, test_filepath, algorithm)
+        )
+        read_time = time.time() - start_time
+    except Exception as e:
+        pytest.fail(f"Failed to write and read a {size} byte file: {str(e)}")
+    finally:
+        try:
+            exec_command(core_api, write_read_pod, namespace, ["rm", "-f", test_filepath])
+        except Exception as e:
+            logger.warning(f"Failed to delete {test_filepath}: {str(e)}")
+
+    expected_digest = generated_digest(seed, size, provisioner.block_size, algorithm)
+    failures = checksum_failures(results, expected_digest, size, algorithm)
+    assert not failures, f"Generated file read back corrupted: {failures[0]}"
+    benchmark_recorder.record("write_read_large_write", [write_time], size=size)
+    benchmark_recorder.record("write_read_large_read_checksum", [read_time], size=size)
+    logger.info(f"{written} bytes written in {write_time:.2f}s and read back with {algorithm} {expected_digest} "
+                f"in {read_time:.2f}s")
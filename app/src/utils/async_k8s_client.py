@@ -0,0 +1,312 @@
+import asyncio
+import importlib.util
+import ssl
+import threading
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+from src.utils.k8s_client import api_call_attributes
+from src.utils.polling import current_deadline, request_timeout
+from src.utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+
+class AsyncKubernetesClient:
+    """
+    Asyncio counterpart of KubernetesClient.
+
+    All API clients share one aiohttp session, so concurrent calls reuse pooled
+    connections instead of opening a connection (and a thread) per request.
+    Exec calls go through a dedicated websocket client that shares the same
+    configuration.
+
+    The client owns a background event loop so that synchronous pytest-bdd steps
+    can drive it with ``run()``; async code can await its methods directly on
+    that loop.
+    """
+
+    def __init__(self, config_file="config/settings.toml"):
+        """
+        Prepares the async Kubernetes client based on configuration.
+
+        Args:
+            config_file (str): Path to the configuration file.
+        """
+        # kubernetes_asyncio and aiohttp are imported where they are used so that
+        # modules which never touch the async client don't pay for them
+        if importlib.util.find_spec("kubernetes_asyncio") is None:
+            raise ImportError(
+                "kubernetes_asyncio is required for AsyncKubernetesClient. "
+                "Install it with 'pip install kubernetes_asyncio'."
+            )
+        self.config = load_config(config_file)
+        self.concurrency = self.config.get("k8s", {}).get("async_concurrency", 20)
+        self.k8s_config = None
+        self.api_client = None
+        self.ws_client = None
+        self.api_clients = {}  # Cache for API clients
+        self._loop = None
+        self._loop_thread = None
+        self._semaphore = None
+
+    async def initialize(self):
+        """
+        Loads the Kubernetes configuration and creates the pooled API clients.
+        """
+        if self.api_client is not None:
+            return
+
+        from kubernetes_asyncio import config
+        from kubernetes_asyncio.client.api_client import ApiClient
+        from kubernetes_asyncio.client.configuration import Configuration
+        from kubernetes_asyncio.stream import WsApiClient
+
+        try:
+            logger.info("Initializing async Kubernetes client...")
+            self.k8s_config = Configuration()
+
+            config_mode = self.config.get("k8s", {}).get("config_mode", "local")
+            if config_mode == "local":
+                logger.debug("Loading kubeconfig for local setup.")
+                await config.load_kube_config(client_configuration=self.k8s_config)
+            elif config_mode == "in-cluster":
+                logger.debug("Loading in-cluster Kubernetes configuration.")
+                config.load_incluster_config(client_configuration=self.k8s_config)
+            else:
+                logger.error(f"Invalid config_mode: {config_mode}")
+                raise ValueError(f"Invalid config_mode: {config_mode}. Use 'local' or 'in-cluster'.")
+
+            proxy = self.config.get("proxy", {})
+            proxy_url = proxy.get("https_proxy") or proxy.get("http_proxy")
+            if proxy_url:
+                logger.info(f"Configuring proxy: {proxy_url}")
+                self.k8s_config.proxy = proxy_url
+
+            self.api_client = ApiClient(configuration=self.k8s_config)
+            self.ws_client = WsApiClient(configuration=self.k8s_config)
+            for api in (self.api_client, self.ws_client):
+                await self._tune_session(api)
+                self._instrument_api_client(api)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            logger.info(f"Async Kubernetes client initialized (concurrency={self.concurrency})")
+
+        except Exception as e:
+            logger.exception(f"Failed to initialize async Kubernetes client: {e}")
+            raise
+
+    async def _tune_session(self, api):
+        """
+        Replace the client's aiohttp session with one sized from the settings.
+
+        Args:
+            api (ApiClient): The API client whose session is replaced.
+        """
+        import aiohttp
+
+        pool_config = self.config.get("connection_pool", {})
+        ssl_context = ssl.create_default_context(cafile=self.k8s_config.ssl_ca_cert)
+        if self.k8s_config.cert_file:
+            ssl_context.load_cert_chain(self.k8s_config.cert_file, keyfile=self.k8s_config.key_file)
+        if not self.k8s_config.verify_ssl:
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+        # Idle connections are dropped after keep_alive_timeout; with keep-alive
+        # disabled every request gets a fresh connection.
+        keep_alive = pool_config.get("keep_alive", True)
+        connector = aiohttp.TCPConnector(
+            limit=max(self.concurrency, pool_config.get("maxsize_per_host", 10)),
+            limit_per_host=pool_config.get("maxsize_per_host", 10),
+            keepalive_timeout=pool_config.get("keep_alive_timeout", 30) if keep_alive else None,
+            force_close=not keep_alive,
+            ssl=ssl_context,
+        )
+        old_session = api.rest_client.pool_manager
+        api.rest_client.pool_manager = aiohttp.ClientSession(
+            connector=connector,
+            trust_env=True,
+            read_bufsize=2**21,
+        )
+        await old_session.close()
+
+    @staticmethod
+    def _instrument_api_client(api):
+        """
+        Trace every API call made through an async ApiClient and bound it by
+        the current polling Deadline.
+
+        Args:
+            api (ApiClient): The API client to instrument.
+        """
+        call_api = api.call_api
+
+        async def traced_call_api(resource_path, method, path_params=None, query_params=None, *args, **kwargs):
+            if kwargs.get("_request_timeout") is None:
+                kwargs["_request_timeout"] = request_timeout()
+            if not tracer.active:
+                return await call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+            name, category, attributes = api_call_attributes(resource_path, method, path_params, query_params)
+            with tracer.span(name, category, **attributes) as span:
+                try:
+                    result = await call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+                except Exception as e:
+                    span.set(http_status=getattr(e, "status", None))
+                    raise
+                if isinstance(result, str):
+                    span.set(bytes=len(result))
+                return result
+
+        api.call_api = traced_call_api
+
+    async def close(self):
+        """
+        Closes the pooled HTTP and websocket sessions.
+        """
+        for api in (self.api_client, self.ws_client):
+            if api is not None:
+                await api.close()
+        self.api_client = None
+        self.ws_client = None
+        self.api_clients = {}
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def get_client(self, api_type):
+        """
+        Retrieve the specified async Kubernetes API client.
+
+        Args:
+            api_type (str): Type of Kubernetes API client (e.g., "AppsV1Api", "CoreV1Api").
+
+        Returns:
+            object: The requested Kubernetes API client instance.
+        """
+        if self.api_client is None:
+            raise RuntimeError("AsyncKubernetesClient is not initialized. Await initialize() first.")
+        if api_type not in self.api_clients:
+            from kubernetes_asyncio import client
+
+            logger.info(f"Initializing async API client for: {api_type}")
+            if api_type == "AppsV1Api":
+                self.api_clients[api_type] = client.AppsV1Api(self.api_client)
+            elif api_type == "CoreV1Api":
+                self.api_clients[api_type] = client.CoreV1Api(self.api_client)
+            else:
+                logger.error(f"Unsupported API client type: {api_type}")
+                raise ValueError(f"Unsupported API client type: {api_type}")
+        return self.api_clients[api_type]
+
+    async def exec_command(self, pod_name, namespace, command, container=None):
+        """
+        Run a command in a pod and return its combined stdout/stderr.
+
+        Args:
+            pod_name (str): Name of the pod.
+            namespace (str): Namespace of the pod.
+            command (list): Command and arguments to execute.
+            container (str): Optional container name.
+
+        Returns:
+            str: Output of the command.
+        """
+        from kubernetes_asyncio import client
+
+        core_ws = client.CoreV1Api(api_client=self.ws_client)
+        kwargs = {"container": container} if container else {}
+        logger.debug(f"Executing {command} in pod '{pod_name}'")
+        return await core_ws.connect_get_namespaced_pod_exec(
+            name=pod_name,
+            namespace=namespace,
+            command=command,
+            stderr=True, stdin=False, stdout=True, tty=False,
+            **kwargs
+        )
+
+    async def watch(self, api_type, method, timeout_seconds=60, **kwargs):
+        """
+        Watch a list endpoint and yield events as they arrive.
+
+        Args:
+            api_type (str): Type of Kubernetes API client (e.g., "CoreV1Api").
+            method (str): Name of the list method (e.g., "list_namespaced_pod").
+            timeout_seconds (int): Server-side timeout for the watch.
+            **kwargs: Arguments passed to the list method.
+
+        Yields:
+            dict: Watch events with "type", "object" and "raw_object" keys.
+        """
+        from kubernetes_asyncio import watch
+
+        api = self.get_client(api_type)
+        async with watch.Watch() as w:
+            async for event in w.stream(getattr(api, method), timeout_seconds=timeout_seconds, **kwargs):
+                yield event
+
+    async def gather(self, coros):
+        """
+        Await coroutines concurrently, bounded by the configured concurrency.
+
+        Args:
+            coros (iterable): Coroutines to await.
+
+        Returns:
+            list: Results (or exceptions) in the order of the input.
+        """
+        async def bounded(coro):
+            async with self._semaphore:
+                return await coro
+
+        return await asyncio.gather(*(bounded(c) for c in coros), return_exceptions=True)
+
+    def run(self, coro):
+        """
+        Run a coroutine on the client's event loop from synchronous code.
+
+        The loop lives in a background thread for the lifetime of the client, so
+        pooled connections survive across pytest-bdd steps.
+
+        Args:
+            coro (coroutine): Coroutine to run.
+
+        Returns:
+            object: The coroutine's result.
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="async-k8s-client", daemon=True
+            )
+            self._loop_thread.start()
+            asyncio.run_coroutine_threadsafe(self.initialize(), self._loop).result()
+
+        # Spans opened on the loop thread belong to the caller's current span,
+        # and API calls are bound by the caller's deadline
+        parent = tracer.current_span()
+        deadline = current_deadline()
+
+        async def with_parent():
+            with tracer.attach(parent):
+                if deadline is None:
+                    return await coro
+                with deadline.activate():
+                    return await coro
+
+        return asyncio.run_coroutine_threadsafe(with_parent(), self._loop).result()
+
+    def shutdown(self):
+        """
+        Close the client and stop its background event loop.
+        """
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
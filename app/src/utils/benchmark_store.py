@@ -0,0 +1,416 @@
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from src.utils.histogram import LogHistogram, TimeSeries
+from src.utils.logging_util import get_logger
+from src.utils.metrics import metrics
+from src.utils.resource_lock import worker_id
+
+logger = get_logger(__name__)
+
+# Fields identifying the setup a benchmark ran against
+KEY_FIELDS = ("cluster", "mount_options", "driver_version", "git_sha")
+
+
+def mann_whitney_u(baseline, current):
+    """
+    One-sided Mann-Whitney U test with the normal approximation.
+
+    Ties get average ranks and the variance is corrected for them; a continuity
+    correction of 0.5 is applied.
+
+    Args:
+        baseline (list): Baseline samples.
+        current (list): Current samples.
+
+    Returns:
+        tuple: U statistic of `current`, z score and the p-value of the
+            alternative "current tends to be larger than baseline".
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    n = n1 + n2
+
+    ranks = [0.0] * n
+    tie_term = 0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 0.0, 0.5
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, z, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_samples(baseline, current, lower_is_better=True, alpha=0.05, min_change=0.05, min_samples=3):
+    """
+    Decide whether current samples regressed against baseline samples.
+
+    A change counts only if it is statistically significant (one-sided
+    Mann-Whitney U at `alpha`) and the medians differ by at least `min_change`.
+
+    Args:
+        baseline (list): Baseline samples.
+        current (list): Current samples.
+        lower_is_better (bool): True for latencies, False for throughput-like values.
+        alpha (float): Significance level.
+        min_change (float): Minimum relative change of the median.
+        min_samples (int): Minimum samples on each side.
+
+    Returns:
+        dict: Medians, relative change, p-values and a verdict of "regression",
+            "improvement", "unchanged" or "insufficient data".
+    """
+    result = {
+        "baseline_n": len(baseline),
+        "current_n": len(current),
+        "baseline_median": statistics.median(baseline) if baseline else None,
+        "current_median": statistics.median(current) if current else None,
+        "change": None,
+        "p_value": None,
+        "verdict": "insufficient data",
+    }
+    if len(baseline) < min_samples or len(current) < min_samples:
+        return result
+
+    base, cur = result["baseline_median"], result["current_median"]
+    change = (cur - base) / abs(base) if base else 0.0
+    _, _, p_larger = mann_whitney_u(baseline, current)
+    _, _, p_smaller = mann_whitney_u(current, baseline)
+    p_worse, p_better = (p_larger, p_smaller) if lower_is_better else (p_smaller, p_larger)
+    worse_change = change if lower_is_better else -change
+
+    result["change"] = change
+    if p_worse < alpha and worse_change >= min_change:
+        result.update(verdict="regression", p_value=p_worse)
+    elif p_better < alpha and -worse_change >= min_change:
+        result.update(verdict="improvement", p_value=p_better)
+    else:
+        result.update(verdict="unchanged", p_value=min(p_worse, p_better))
+    return result
+
+
+def git_sha():
+    """
+    Commit of the harness checkout (GIT_SHA overrides it, e.g. in CI).
+
+    Returns:
+        str: Short commit SHA, or "unknown".
+    """
+    if os.environ.get("GIT_SHA"):
+        return os.environ["GIT_SHA"]
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def collect_run_key(k8s_client, cluster_snapshot, config):
+    """
+    Identify the setup benchmarks run against.
+
+    Args:
+        k8s_client (callable): Returns a Kubernetes API client for an API type.
+        cluster_snapshot (ClusterSnapshot): Session cluster snapshot.
+        config (dict): Loaded settings.
+
+    Returns:
+        dict: Values for KEY_FIELDS.
+    """
+    benchmark_config = config.get("benchmark", {})
+    key = {"cluster": benchmark_config.get("cluster") or "", "mount_options": "", "driver_version": "",
+           "git_sha": git_sha()}
+
+    if not key["cluster"]:
+        try:
+            from kubernetes import config as kube_config
+            _, active_context = kube_config.list_kube_config_contexts()
+            key["cluster"] = active_context["context"]["cluster"]
+        except Exception:
+            key["cluster"] = "in-cluster"
+
+    # Driver version: image tag of the CSI node driver container
+    try:
+        images = [container.image for pod in cluster_snapshot.driver_pods for container in pod.spec.containers]
+        driver_images = [image for image in images if "gcs-fuse-csi-driver" in image]
+        if driver_images:
+            key["driver_version"] = driver_images[0].rsplit(":", 1)[-1]
+    except Exception as e:
+        logger.warning(f"Could not determine GCS FUSE CSI driver version: {str(e)}")
+
+    # Mount options: inline CSI volume attributes or the bound PV of a claim
+    try:
+        csi_driver_name = config["gcs_fuse"]["csi_driver_name"]
+        namespace = config["gcs_fuse"]["namespace"]
+        core_api = k8s_client("CoreV1Api")
+        options = []
+        for volume in cluster_snapshot.deployment.spec.template.spec.volumes or []:
+            if volume.csi is not None and volume.csi.driver == csi_driver_name:
+                options.append((volume.csi.volume_attributes or {}).get("mountOptions", ""))
+            elif volume.persistent_volume_claim is not None:
+                claim = core_api.read_namespaced_persistent_volume_claim(
+                    name=volume.persistent_volume_claim.claim_name, namespace=namespace
+                )
+                if not claim.spec.volume_name:
+                    continue
+                volume_spec = core_api.read_persistent_volume(name=claim.spec.volume_name).spec
+                if volume_spec.csi is not None and volume_spec.csi.driver == csi_driver_name:
+                    options.extend(volume_spec.mount_options or [])
+                    options.append((volume_spec.csi.volume_attributes or {}).get("mountOptions", ""))
+        key["mount_options"] = ",".join(sorted({option for option in options if option}))
+    except Exception as e:
+        logger.warning(f"Could not determine GCS FUSE mount options: {str(e)}")
+
+    logger.info(f"Benchmark run key: {key}")
+    return key
+
+
+class BenchmarkStore:
+    """
+    Append-only JSONL store of benchmark results.
+
+    Each line is one benchmark measurement of one run: its samples, the run
+    key (cluster, mount options, driver version, git SHA), run id and labels.
+    Several pytest-xdist workers can append to the same file.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the store.
+
+        Args:
+            path (str): Path of the JSONL file (created on first append).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        """
+        Append a result record.
+
+        Args:
+            record (dict): JSON-serializable record.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        line = json.dumps(record, sort_keys=True) + "\n"
+        with self._lock:
+            # A single O_APPEND write keeps concurrent workers' lines intact
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode())
+            finally:
+                os.close(fd)
+
+    def records(self):
+        """
+        Read all records.
+
+        Returns:
+            list: Records in file order; malformed lines are skipped.
+        """
+        if not os.path.exists(self.path):
+            return []
+        records = []
+        with open(self.path) as file:
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed line {number} in {self.path}")
+        return records
+
+    @staticmethod
+    def matches(record, selector):
+        """
+        Check whether a record belongs to the runs named by a selector.
+
+        The selector is matched against the run id, the labels, the driver
+        version and (as a prefix) the git SHA.
+
+        Returns:
+            bool: True if the record matches.
+        """
+        return (
+            record.get("run_id") == selector
+            or selector in record.get("labels", [])
+            or record.get("driver_version") == selector
+            or (len(selector) >= 7 and record.get("git_sha", "").startswith(selector))
+        )
+
+    def latest_run_id(self, exclude=None):
+        """
+        Return the id of the most recent run, optionally skipping one run id.
+        """
+        for record in reversed(self.records()):
+            if record.get("run_id") != exclude:
+                return record.get("run_id")
+        return None
+
+    def compare(self, current, baseline, alpha=0.05, min_change=0.05, min_samples=3):
+        """
+        Compare the benchmarks of the current run(s) against the baseline run(s).
+
+        Samples of all matching runs are pooled per benchmark. Only baseline
+        records from the same cluster are used, so a selector like a git SHA
+        never compares against another cluster.
+
+        Args:
+            current (str): Selector of the current run(s).
+            baseline (str): Selector of the baseline run(s).
+            alpha (float): Significance level.
+            min_change (float): Minimum relative change of the median.
+            min_samples (int): Minimum samples on each side.
+
+        Returns:
+            list: One dict per benchmark with its name, unit and compare_samples() result.
+        """
+        current_samples, baseline_samples, info = {}, {}, {}
+        records = self.records()
+        for record in records:
+            if self.matches(record, current):
+                current_samples.setdefault(record["benchmark"], []).extend(record["samples"])
+                info[record["benchmark"]] = record
+
+        for record in records:
+            name = record["benchmark"]
+            if name in info and record.get("cluster") == info[name].get("cluster") \
+                    and not self.matches(record, current) and self.matches(record, baseline):
+                baseline_samples.setdefault(name, []).extend(record["samples"])
+
+        results = []
+        for name, samples in sorted(current_samples.items()):
+            result = compare_samples(
+                baseline_samples.get(name, []), samples,
+                lower_is_better=info[name].get("lower_is_better", True),
+                alpha=alpha, min_change=min_change, min_samples=min_samples
+            )
+            result.update(benchmark=name, unit=info[name].get("unit", ""))
+            results.append(result)
+        return results
+
+
+class BenchmarkRecorder:
+    """
+    Records benchmark samples of one test into the store (and the metrics exporter).
+    """
+
+    def __init__(self, store, run_key, run_id, test, labels=()):
+        """
+        Initializes the recorder.
+
+        Args:
+            store (BenchmarkStore): Destination store.
+            run_key (dict): Values for KEY_FIELDS.
+            run_id (str): Id shared by all workers of the pytest run.
+            test (str): Node id of the test recording the results.
+            labels (iterable): Labels attached to every record (e.g. "baseline").
+        """
+        self.store = store
+        self.run_key = run_key
+        self.run_id = run_id
+        self.test = test
+        self.labels = list(labels)
+        self.results = []
+        # Aggregates drawn in the HTML report: name -> (LogHistogram or TimeSeries, unit)
+        self.histograms = {}
+        self.series = {}
+
+    def record(self, benchmark, samples, unit="seconds", lower_is_better=True, **extra):
+        """
+        Store the samples of a benchmark.
+
+        Args:
+            benchmark (str): Benchmark name (e.g. "cache_cached_read").
+            samples (list): Measured values (at least one).
+            unit (str): Unit of the values.
+            lower_is_better (bool): False for throughput-like values.
+            **extra: Additional JSON-serializable fields (e.g. file size).
+        """
+        samples = [float(sample) for sample in samples]
+        if not samples:
+            raise ValueError(f"Benchmark '{benchmark}' has no samples")
+        record = dict(
+            self.run_key,
+            benchmark=benchmark,
+            samples=samples,
+            unit=unit,
+            lower_is_better=lower_is_better,
+            run_id=self.run_id,
+            labels=self.labels,
+            test=self.test,
+            worker=worker_id(),
+            host=socket.gethostname(),
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            **extra
+        )
+        self.store.append(record)
+        self.results.append(record)
+        histogram = self.histograms.setdefault(benchmark, (LogHistogram(), unit))[0]
+        histogram.extend(samples)
+        metrics.record_benchmark(benchmark, statistics.median(samples), unit=unit)
+        logger.info(f"Recorded benchmark '{benchmark}': {len(samples)} samples, "
+                    f"median {statistics.median(samples):.4f} {unit}")
+
+    def throughput(self, name, unit="bytes"):
+        """
+        Series to add (timestamp, amount) points to, drawn as a rate over time in the report.
+
+        Args:
+            name (str): Series name (e.g. "cache_read_throughput").
+            unit (str): Unit of the amounts.
+
+        Returns:
+            TimeSeries: The (possibly already started) series.
+        """
+        return self.series.setdefault(name, (TimeSeries(), unit))[0]
+
+
+def new_run_id():
+    """
+    Generate a run id (UTC timestamp plus pid) that sorts chronologically.
+    """
+    return f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{os.getpid()}"
+
+
+def format_comparison(results):
+    """
+    Format compare() results as a text table.
+
+    Returns:
+        str: One line per benchmark.
+    """
+    lines = [f"{'benchmark':<28} {'baseline':>12} {'current':>12} {'change':>8} {'p':>8}  verdict"]
+    for result in results:
+        def median(value):
+            return f"{value:.4g}" if value is not None else "-"
+        change = f"{result['change'] * 100:+.1f}%" if result["change"] is not None else "-"
+        p_value = f"{result['p_value']:.3g}" if result["p_value"] is not None else "-"
+        lines.append(
+            f"{result['benchmark']:<28} {median(result['baseline_median']):>12} "
+            f"{median(result['current_median']):>12} {change:>8} {p_value:>8}  {result['verdict']}"
+            f" (n={result['baseline_n']}/{result['current_n']})"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,260 @@
+import threading
+import time
+from src.utils.logging_util import get_logger
+from src.utils.polling import poll_until
+from src.utils.prometheus_scrape import snapshot
+
+logger = get_logger(__name__)
+
+
+def _container_status(pod, container):
+    """Status of a container or native sidecar (restartable init container) of a pod."""
+    statuses = (pod.status.container_statuses or []) + (pod.status.init_container_statuses or [])
+    return next((status for status in statuses if status.name == container), None)
+
+
+def kill_container(core_api, pod_name, namespace, container, image, signal="TERM", timeout=300):
+    """
+    Kill a container's main process and wait for the kubelet to restart it.
+
+    The container may have no shell (the gcsfuse sidecar doesn't), so the
+    signal is sent from an ephemeral container sharing its process namespace
+    (targetContainerName). PID 1 of a namespace only receives signals it
+    handles, hence TERM rather than KILL by default.
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        pod_name (str): Name of the pod.
+        namespace (str): Namespace of the pod.
+        container (str): Container to kill.
+        image (str): Image with a `kill` command for the ephemeral container.
+        signal (str): Signal name.
+        timeout (float): Seconds to wait for the restart.
+
+    Returns:
+        tuple: (time the signal was requested, seconds until the container ran again).
+    """
+    pod = core_api.read_namespaced_pod(name=pod_name, namespace=namespace)
+    status = _container_status(pod, container)
+    if status is None:
+        raise ValueError(f"Pod '{pod_name}' has no container '{container}'")
+    restarts = status.restart_count
+    debug_name = f"chaos-kill-{int(time.time())}"
+    body = {"spec": {"ephemeralContainers": [{
+        "name": debug_name,
+        "image": image,
+        "command": ["kill", f"-{signal}", "1"],
+        "targetContainerName": container,
+    }]}}
+    injected_at = time.time()
+    core_api.patch_namespaced_pod_ephemeralcontainers(name=pod_name, namespace=namespace, body=body)
+    logger.info(f"Sent SIG{signal} to '{container}' of pod '{pod_name}' from ephemeral container '{debug_name}'")
+
+    def restarted():
+        status = _container_status(core_api.read_namespaced_pod(name=pod_name, namespace=namespace), container)
+        return status is not None and status.restart_count > restarts and status.ready is not False
+
+    poll_until(restarted, "container_restart", timeout=timeout, max_interval=5)
+    return injected_at, time.time() - injected_at
+
+
+def delete_driver_pod(core_api, node_name, namespace, label_selector, timeout=300):
+    """
+    Delete the CSI driver pod of a node and wait for its replacement to be ready.
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        node_name (str): Node whose driver pod is deleted.
+        namespace (str): Namespace of the driver DaemonSet.
+        label_selector (str): Label selector of the driver pods.
+        timeout (float): Seconds to wait for the replacement.
+
+    Returns:
+        tuple: (time of the deletion, seconds until a new driver pod was ready).
+    """
+    def driver_pods():
+        return core_api.list_namespaced_pod(namespace=namespace, label_selector=label_selector,
+                                            field_selector=f"spec.nodeName={node_name}").items
+
+    pods = driver_pods()
+    if not pods:
+        raise ValueError(f"No driver pod matching '{label_selector}' on node '{node_name}'")
+    deleted = pods[0].metadata.name
+    injected_at = time.time()
+    core_api.delete_namespaced_pod(name=deleted, namespace=namespace)
+    logger.info(f"Deleted driver pod '{deleted}' on node '{node_name}'")
+
+    def replaced():
+        return any(
+            pod.metadata.name != deleted and pod.metadata.deletion_timestamp is None
+            and any(c.type == "Ready" and c.status == "True" for c in pod.status.conditions or [])
+            for pod in driver_pods()
+        )
+
+    poll_until(replaced, "driver_pod_replacement", timeout=timeout, max_interval=5)
+    return injected_at, time.time() - injected_at
+
+
+def evict_pod(core_api, pod_name, namespace):
+    """
+    Evict a pod through the Eviction API (honours PodDisruptionBudgets).
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        pod_name (str): Name of the pod.
+        namespace (str): Namespace of the pod.
+
+    Returns:
+        float: Time of the eviction.
+
+    Raises:
+        ApiException: 429 if a PodDisruptionBudget forbids the eviction.
+    """
+    body = {"apiVersion": "policy/v1", "kind": "Eviction", "metadata": {"name": pod_name, "namespace": namespace}}
+    injected_at = time.time()
+    core_api.create_namespaced_pod_eviction(name=pod_name, namespace=namespace, body=body)
+    logger.info(f"Evicted pod '{pod_name}'")
+    return injected_at
+
+
+def recovery(samples, fault_time, baseline_rate, recovery_ratio=0.9, stall_ratio=0.1, hold=30):
+    """
+    Impact of a fault on a read workload, from per-interval counts.
+
+    Args:
+        samples (list): (interval end, interval duration, reads, errors) tuples in time order.
+        fault_time (float): When the fault was injected.
+        baseline_rate (float): Reads per second before the fault.
+        recovery_ratio (float): Share of the baseline rate that counts as full throughput.
+        stall_ratio (float): Share of the baseline rate below which I/O counts as stalled.
+        hold (float): Seconds full throughput must last to count as recovered.
+
+    Returns:
+        dict: errors (after the fault), stall_seconds (intervals below stall_ratio),
+            min_rate, and recovery_seconds (from the fault to the start of the
+            first interval from which full throughput held; None if it never did).
+    """
+    after = [sample for sample in samples if sample[0] > fault_time]
+    result = {"errors": sum(errors for _, _, _, errors in after), "stall_seconds": 0.0,
+              "min_rate": None, "recovery_seconds": None}
+    rates = []
+    for end, duration, reads, _ in after:
+        rate = reads / duration if duration > 0 else 0.0
+        rates.append(rate)
+        if rate < stall_ratio * baseline_rate:
+            result["stall_seconds"] += min(duration, end - fault_time)
+    result["min_rate"] = min(rates, default=None)
+
+    recovered_from = None
+    for (end, duration, _, _), rate in zip(after, rates):
+        if rate < recovery_ratio * baseline_rate:
+            recovered_from = None
+        elif recovered_from is None:
+            recovered_from = end - duration
+        if recovered_from is not None and end - recovered_from >= hold:
+            result["recovery_seconds"] = max(recovered_from - fault_time, 0.0)
+            break
+    return result
+
+
+class ReadMonitor:
+    """
+    Scrapes the perf reader's counters in the background at a fixed interval.
+
+    The reader pods are listed again before each scrape, so pods replaced by
+    a fault are followed; a pod's counters starting over count from zero.
+    """
+
+    def __init__(self, k8s_client, async_k8s_client, perf_workload, port, interval=5, method="proxy",
+                 reads="gcsfuse_read_operations_total", errors="gcsfuse_read_errors_total"):
+        """
+        Initializes a stopped monitor.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            async_k8s_client (AsyncKubernetesClient): Async client (proxy method).
+            perf_workload (PerfWorkload): The reader deployment.
+            port (int): Metrics port of the readers.
+            interval (float): Seconds between scrapes.
+            method (str): Scrape method (see prometheus_scrape.snapshot()).
+            reads (str): Counter of successful reads.
+            errors (str): Counter of failed reads.
+        """
+        self.k8s_client = k8s_client
+        self.async_k8s_client = async_k8s_client
+        self.perf_workload = perf_workload
+        self.port = port
+        self.interval = interval
+        self.method = method
+        self.reads = reads
+        self.errors = errors
+        # (interval end, interval duration, reads, errors)
+        self.samples = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._previous = None
+        self._pod_names = []
+
+    def _scrape(self):
+        self._pod_names = self.perf_workload.pod_names() or self._pod_names
+        return snapshot(self.k8s_client, self.async_k8s_client, self._pod_names, self.perf_workload.namespace,
+                        self.port, method=self.method, previous=self._previous)
+
+    def _sample(self):
+        # A failed scrape (e.g. the API server briefly unreachable) widens the next interval
+        try:
+            current = self._scrape()
+        except Exception as e:
+            logger.warning(f"Read monitor scrape failed: {str(e)}")
+            return
+        step = current.delta(self._previous)
+        with self._lock:
+            self.samples.append((current.timestamp, step.duration, step.value(self.reads), step.value(self.errors)))
+        self._previous = current
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self, pod_names):
+        """
+        Take a first scrape and keep scraping in the background.
+
+        Args:
+            pod_names (list): Reader pods at the start.
+        """
+        self._pod_names = list(pod_names)
+        self._previous = self._scrape()
+        self._thread = threading.Thread(target=self._run, name="read-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Monitoring reads of {len(self._pod_names)} pods every {self.interval}s")
+
+    def stop(self):
+        """
+        Stop scraping (idempotent).
+        """
+        if self._thread is None or self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+
+    def rate(self, since, until=None):
+        """
+        Reads per second over the samples between two times.
+
+        Returns:
+            float: The rate (0 without samples).
+        """
+        with self._lock:
+            window = [s for s in self.samples if s[0] - s[1] >= since and (until is None or s[0] <= until)]
+        duration = sum(duration for _, duration, _, _ in window)
+        return sum(reads for _, _, reads, _ in window) / duration if duration > 0 else 0.0
+
+    def recovery(self, fault_time, baseline_rate, **kwargs):
+        """
+        recovery() over the samples so far.
+        """
+        with self._lock:
+            samples = list(self.samples)
+        return recovery(samples, fault_time, baseline_rate, **kwargs)
@@ -0,0 +1,129 @@
+import threading
+import time
+from src.utils.config_util import load_config
+from src.utils.driver_health import label_selector
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClusterSnapshot:
+    """
+    Cached view of the cluster state that every test module needs.
+
+    Each part (nodes, driver DaemonSet, driver pods, deployment) is fetched on first use and then
+    reused for the rest of the session. Steps that change the cluster call
+    refresh() for the parts they touched.
+    """
+
+    PARTS = ("nodes", "driver_daemonset", "driver_pods", "deployment")
+
+    def __init__(self, k8s_client, config_file="config/settings.toml"):
+        """
+        Initializes an empty snapshot.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            config_file (str): Path to the configuration file.
+        """
+        self.k8s_client = k8s_client
+        self.config = load_config(config_file)
+        self._cache = {}
+        self._fetched_at = {}
+        self._lock = threading.Lock()
+
+    def _get(self, part, fetch):
+        with self._lock:
+            if part not in self._cache:
+                logger.info(f"Fetching cluster snapshot part: {part}")
+                self._cache[part] = fetch()
+                self._fetched_at[part] = time.time()
+            return self._cache[part]
+
+    @property
+    def nodes(self):
+        """list: Nodes in the cluster."""
+        return self._get("nodes", lambda: self.k8s_client("CoreV1Api").list_node().items)
+
+    def _read_driver_daemonset(self):
+        from kubernetes.client.rest import ApiException
+
+        gcs_fuse = self.config["gcs_fuse"]
+        if not gcs_fuse.get("driver_daemonset"):
+            return None
+        try:
+            return self.k8s_client("AppsV1Api").read_namespaced_daemon_set(
+                name=gcs_fuse["driver_daemonset"],
+                namespace=gcs_fuse["driver_namespace"]
+            )
+        except ApiException as e:
+            if e.status == 404:
+                logger.warning(f"Driver DaemonSet '{gcs_fuse['driver_daemonset']}' not found")
+                return None
+            raise
+
+    @property
+    def driver_daemonset(self):
+        """V1DaemonSet: The GCS FUSE CSI driver DaemonSet, or None if it is not found."""
+        return self._get("driver_daemonset", self._read_driver_daemonset)
+
+    @property
+    def driver_selector(self):
+        """
+        str: Label selector of the driver pods.
+
+        Taken from the driver DaemonSet's own selector, so every step selects
+        the same pods; [gcs_fuse] driver_pod_label when there is no DaemonSet.
+        """
+        daemonset = self.driver_daemonset
+        if daemonset is not None and daemonset.spec.selector.match_labels:
+            return label_selector(daemonset.spec.selector.match_labels)
+        return self.config["gcs_fuse"].get("driver_pod_label", "k8s-app=gcs-fuse-csi-driver")
+
+    @property
+    def driver_pods(self):
+        """list: GCS FUSE CSI driver pods in the driver namespace."""
+        # Resolved outside _get(): the selector may itself fetch the DaemonSet
+        selector = self.driver_selector
+        return self._get("driver_pods", lambda: self.k8s_client("CoreV1Api").list_namespaced_pod(
+            namespace=self.config["gcs_fuse"]["driver_namespace"],
+            label_selector=selector
+        ).items)
+
+    @property
+    def deployment(self):
+        """V1Deployment: The gcs-fuse deployment under test."""
+        gcs_fuse = self.config["gcs_fuse"]
+        return self._get("deployment", lambda: self.k8s_client("AppsV1Api").read_namespaced_deployment(
+            name=gcs_fuse["deployment_name"],
+            namespace=gcs_fuse["namespace"]
+        ))
+
+    def age(self, part):
+        """
+        Seconds since a part was fetched.
+
+        Args:
+            part (str): One of PARTS.
+
+        Returns:
+            float: Age in seconds, or None if the part has not been fetched.
+        """
+        fetched_at = self._fetched_at.get(part)
+        return time.time() - fetched_at if fetched_at is not None else None
+
+    def refresh(self, *parts):
+        """
+        Drop cached parts so the next access fetches them again.
+
+        Args:
+            *parts (str): Parts to refresh; all parts when none are given.
+        """
+        parts = parts or self.PARTS
+        with self._lock:
+            for part in parts:
+                if part not in self.PARTS:
+                    raise ValueError(f"Unknown snapshot part: {part}. Use one of {self.PARTS}.")
+                self._cache.pop(part, None)
+                self._fetched_at.pop(part, None)
+        logger.debug(f"Refreshed cluster snapshot parts: {', '.join(parts)}")
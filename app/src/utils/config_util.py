@@ -1,25 +1,71 @@
+import functools
+import os
 import tomli
-import logging
+from types import MappingProxyType
 from src.utils.logging_util import get_logger
 
+
+def _freeze(value):
+    """
+    Recursively convert parsed TOML data into read-only structures.
+
+    Args:
+        value (object): Parsed TOML value.
+
+    Returns:
+        object: Tables as MappingProxyType, arrays as tuples, scalars unchanged.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def _read_config(config_path):
+    with open(config_path, "rb") as file:
+        return _freeze(tomli.load(file))
+
+
+def read_config(config_file="config/settings.toml"):
+    """
+    Return the parsed configuration, reading the file only once per process.
+
+    Unlike load_config this does not log, so the logging setup can use it.
+
+    Args:
+        config_file (str): Path to the configuration file.
+
+    Returns:
+        Mapping: Read-only configuration shared by every caller.
+    """
+    return _read_config(os.path.abspath(config_file))
+
+
+# Created after read_config because get_logger reads the log level through it
 logger = get_logger(__name__)
 
+
 def load_config(config_file="config/settings.toml"):
     """
     Load configuration from a TOML file.
 
+    The file is parsed once per process; later calls return the same
+    read-only object.
+
     Args:
         config_file (str): Path to the configuration file.
 
     Returns:
-        dict: Parsed configuration data.
+        Mapping: Parsed configuration data.
     """
-    logger.info(f"Loading configuration from {config_file}...")
     try:
-        with open(config_file, "rb") as file:
-            config = tomli.load(file)
-        logger.info("Configuration loaded successfully.")
+        cached = _read_config.cache_info().currsize
+        config = read_config(config_file)
+        if _read_config.cache_info().currsize > cached:
+            logger.info(f"Configuration loaded successfully from {config_file}.")
         return config
     except Exception as e:
         logger.error(f"Failed to load configuration: {e}")
-        raise
\ No newline at end of file
+        raise
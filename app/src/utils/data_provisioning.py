@@ -0,0 +1,178 @@
+import hashlib
+import io
+import os
+import time
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+from src.utils.pod_exec import collect, open_exec
+
+logger = get_logger(__name__)
+
+
+def seed_block(seed, size):
+    """
+    Deterministic pseudo-random block: BLAKE2b of (seed, counter) in counter mode.
+
+    The same seed and size give the same bytes on every platform and Python version.
+
+    Args:
+        seed (int): Seed of the content.
+        size (int): Block size in bytes.
+
+    Returns:
+        bytes: The block.
+    """
+    block = bytearray(size)
+    view = memoryview(block)
+    for offset in range(0, size, 64):
+        digest = hashlib.blake2b(f"{seed}:{offset // 64}".encode(), digest_size=64).digest()
+        view[offset:offset + 64] = digest[:size - offset]
+    return bytes(block)
+
+
+def generated_digest(seed, size, block_size, algorithm="sha256"):
+    """
+    Digest of the content generate() writes, computed without materializing it.
+
+    Args:
+        seed (int): Seed of the content.
+        size (int): Content size in bytes.
+        block_size (int): Size of the repeated seed block.
+        algorithm (str): hashlib algorithm.
+
+    Returns:
+        str: Hex digest.
+    """
+    block = seed_block(seed, block_size)
+    digest = hashlib.new(algorithm)
+    full_blocks, remainder = divmod(size, block_size)
+    for _ in range(full_blocks):
+        digest.update(block)
+    digest.update(memoryview(block)[:remainder])
+    return digest.hexdigest()
+
+
+class DataProvisioner:
+    """
+    Writes test data into a pod's GCS FUSE mount over exec stdin.
+
+    Data is sent in fixed-size chunks read into one reusable buffer, so
+    runner memory does not depend on the file size. generate() goes further
+    and only uploads a small seed block: the pod repeats it up to the
+    requested size, so datasets of any size are created reproducibly without
+    moving them through the API server.
+    """
+
+    def __init__(self, k8s_client, namespace, container=None, config_file="config/settings.toml"):
+        """
+        Initializes the provisioner for pods in a namespace.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            namespace (str): Namespace of the pods.
+            container (str): Optional container name.
+            config_file (str): Path to the configuration file.
+        """
+        provisioning = load_config(config_file).get("provisioning", {})
+        self.core_api = k8s_client("CoreV1Api")
+        self.namespace = namespace
+        self.container = container
+        self.chunk_size = provisioning.get("chunk_size", 256 * 1024)
+        self.block_size = provisioning.get("seed_block_size", 1024 * 1024)
+
+    def _exec(self, pod_name, command):
+        return open_exec(self.core_api, pod_name, self.namespace, command, self.container, stdin=True)
+
+    @staticmethod
+    def _finish(client, pod_name, command):
+        """Wait for the command to exit and raise on failure."""
+        result = collect(client, max_output=4096)
+        if result.returncode != 0:
+            raise RuntimeError(f"Command {command[2]!r} failed in pod '{pod_name}' "
+                               f"(exit status {result.returncode}): {result.stderr_text.strip() or result.error}")
+
+    def upload(self, pod_name, path, source, size=None):
+        """
+        Stream a local file into the pod.
+
+        The pod runs `head -c <size>`, so it stops reading exactly at the end
+        of the data and the exec ends without closing stdin.
+
+        Args:
+            pod_name (str): Pod to write the file in.
+            path (str): Destination path inside the pod.
+            source (str or file): Local file path or binary file object.
+            size (int): Bytes to send; defaults to the size of the file.
+
+        Returns:
+            tuple: (sha256 hex digest of the data sent, bytes sent, seconds).
+        """
+        opened = isinstance(source, (str, os.PathLike))
+        file = open(source, "rb") if opened else source
+        try:
+            if size is None:
+                try:
+                    size = os.fstat(file.fileno()).st_size - file.tell()
+                except (AttributeError, io.UnsupportedOperation):
+                    # In-memory sources such as BytesIO have no file descriptor
+                    position = file.tell()
+                    size = file.seek(0, io.SEEK_END) - position
+                    file.seek(position)
+            command = ["/bin/sh", "-c", 'head -c "$1" > "$2"', "sh", str(size), path]
+            buffer = bytearray(self.chunk_size)
+            view = memoryview(buffer)
+            digest = hashlib.sha256()
+            sent = 0
+            start_time = time.time()
+            client = self._exec(pod_name, command)
+            while sent < size:
+                count = file.readinto(view[:min(self.chunk_size, size - sent)])
+                if not count:
+                    client.close()
+                    raise EOFError(f"Source ended after {sent} of {size} bytes")
+                chunk = view[:count]
+                digest.update(chunk)
+                client.write_stdin(chunk.tobytes())
+                sent += count
+                # Drain output between chunks so nothing piles up on the websocket
+                client.update(timeout=0)
+            self._finish(client, pod_name, command)
+            elapsed = time.time() - start_time
+        finally:
+            if opened:
+                file.close()
+        logger.info(f"Uploaded {sent} bytes to {pod_name}:{path} in {elapsed:.2f}s "
+                    f"({sent / max(elapsed, 1e-9) / 1024 / 1024:.1f} MiB/s)")
+        return digest.hexdigest(), sent, elapsed
+
+    def generate(self, pod_name, path, size, seed=0):
+        """
+        Create a file of deterministic pseudo-random content inside the pod.
+
+        A seed block of [provisioning] seed_block_size bytes is uploaded once to
+        /tmp, then repeated by the pod up to `size` bytes.
+
+        Args:
+            pod_name (str): Pod to write the file in.
+            path (str): Destination path inside the pod.
+            size (int): File size in bytes.
+            seed (int): Seed of the content.
+
+        Returns:
+            tuple: (expected sha256 hex digest, size, seconds spent in the pod).
+        """
+        block_path = f"/tmp/gcs-bdd-seed-{seed}-{self.block_size}"
+        self.upload(pod_name, block_path, io.BytesIO(seed_block(seed, self.block_size)), self.block_size)
+        # cat fails with SIGPIPE once head has enough, which ends the loop. A missing block would end it at once
+        # (and an empty one never), leaving head to write a short file and exit 0: check both ends in the pod
+        command = ["/bin/sh", "-c",
+                   '[ -r "$1" ] && [ -s "$1" ] || { echo "Seed block $1 is missing or empty" >&2; exit 1; }; '
+                   'while cat "$1"; do :; done | head -c "$2" > "$3"; status=$?; rm -f "$1"; '
+                   '[ $status -eq 0 ] || exit $status; written=$(stat -c %s "$3") || exit 1; '
+                   '[ "$written" -eq "$2" ] || { echo "Wrote $written of $2 bytes to $3" >&2; exit 1; }',
+                   "sh", block_path, str(size), path]
+        start_time = time.time()
+        self._finish(self._exec(pod_name, command), pod_name, command)
+        elapsed = time.time() - start_time
+        logger.info(f"Generated {size} bytes (seed {seed}) at {pod_name}:{path} in {elapsed:.2f}s")
+        return generated_digest(seed, size, self.block_size), size, elapsed
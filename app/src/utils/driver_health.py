@@ -0,0 +1,241 @@
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# Pods mounting GCS FUSE volumes through the sidecar carry this annotation
+SIDECAR_ANNOTATION = "gke-gcsfuse/volumes"
+
+
+def label_selector(match_labels):
+    """
+    Label selector string of a matchLabels dict.
+
+    Args:
+        match_labels (dict): Label name -> value.
+
+    Returns:
+        str: Selector such as "k8s-app=gcs-fuse-csi-driver".
+    """
+    return ",".join(f"{name}={value}" for name, value in sorted(match_labels.items()))
+
+
+def daemonset_status(daemonset):
+    """
+    Readiness of a DaemonSet from its status alone, without listing its pods.
+
+    Args:
+        daemonset (V1DaemonSet): The DaemonSet.
+
+    Returns:
+        dict: desired, scheduled, ready, available, updated, misscheduled,
+            current (the controller has seen the latest spec) and ready_all
+            (every desired pod is ready, up to date and available).
+    """
+    status = daemonset.status
+    desired = status.desired_number_scheduled or 0
+    current = (status.observed_generation or 0) >= (daemonset.metadata.generation or 0)
+    result = {
+        "desired": desired,
+        "scheduled": status.current_number_scheduled or 0,
+        "ready": status.number_ready or 0,
+        "available": status.number_available or 0,
+        "updated": status.updated_number_scheduled or 0,
+        "misscheduled": status.number_misscheduled or 0,
+        "current": current,
+    }
+    result["ready_all"] = current and desired > 0 and all(
+        result[key] == desired for key in ("ready", "available", "updated")
+    )
+    return result
+
+
+def is_ready(pod):
+    """bool: The pod is not terminating and its Ready condition is True."""
+    return pod.metadata.deletion_timestamp is None and any(
+        condition.type == "Ready" and condition.status == "True" for condition in pod.status.conditions or []
+    )
+
+
+def ready_since(pod):
+    """
+    Time the pod first became ready: when the last of its containers first started.
+
+    The Ready condition only keeps its latest transition, which a container
+    restart or a failed readiness probe moves forward. Container start times
+    are used instead: the current run of a container that never restarted,
+    the previous run of one that did (an upper bound after several restarts).
+    The pod's start time stands in when no container has started yet.
+
+    Args:
+        pod (V1Pod): The pod.
+
+    Returns:
+        float: Epoch seconds, or None if the pod is not ready.
+    """
+    if not is_ready(pod):
+        return None
+    started = []
+    for status in pod.status.container_statuses or []:
+        if status.restart_count and status.last_state and status.last_state.terminated:
+            started.append(status.last_state.terminated.started_at)
+        elif status.state and status.state.running:
+            started.append(status.state.running.started_at)
+    started = [started_at.timestamp() for started_at in started if started_at]
+    if started:
+        return max(started)
+    return pod.status.start_time.timestamp() if pod.status.start_time else None
+
+
+def index_by_node(pods):
+    """
+    Group pods by the node they are scheduled to, in one pass.
+
+    Args:
+        pods (list): Pods.
+
+    Returns:
+        dict: Node name -> list of pods (unscheduled pods are left out).
+    """
+    index = {}
+    for pod in pods:
+        if pod.spec.node_name:
+            index.setdefault(pod.spec.node_name, []).append(pod)
+    return index
+
+
+def is_gcsfuse_workload(pod, csi_driver_name):
+    """
+    Whether a pod mounts GCS FUSE volumes.
+
+    Args:
+        pod (V1Pod): The pod.
+        csi_driver_name (str): Name of the GCS FUSE CSI driver.
+
+    Returns:
+        bool: True if the pod has the sidecar annotation or an inline volume of the driver.
+    """
+    if (pod.metadata.annotations or {}).get(SIDECAR_ANNOTATION) == "true":
+        return True
+    return any(volume.csi is not None and volume.csi.driver == csi_driver_name for volume in pod.spec.volumes or [])
+
+
+def _schedulable(node):
+    return not node.spec.unschedulable and not any(
+        taint.effect in ("NoSchedule", "NoExecute") for taint in node.spec.taints or []
+    )
+
+
+class DriverHealth:
+    """
+    Health of the GCS FUSE CSI driver across the cluster.
+
+    Readiness comes from the driver DaemonSet's status. Coverage joins driver
+    pods and workload pods to nodes through a node index, so each list is
+    walked once however many nodes the cluster has.
+    """
+
+    def __init__(self, k8s_client, cluster_snapshot, config_file="config/settings.toml"):
+        """
+        Initializes the health checks.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            cluster_snapshot (ClusterSnapshot): Cached nodes, driver DaemonSet and driver pods.
+            config_file (str): Path to the configuration file.
+        """
+        self.k8s_client = k8s_client
+        self.cluster_snapshot = cluster_snapshot
+        self.config = load_config(config_file)
+
+    def status(self):
+        """
+        Readiness of the driver DaemonSet.
+
+        Returns:
+            dict: daemonset_status() of the driver DaemonSet.
+
+        Raises:
+            ValueError: If no driver DaemonSet is configured or found.
+        """
+        daemonset = self.cluster_snapshot.driver_daemonset
+        if daemonset is None:
+            raise ValueError(f"Driver DaemonSet '{self.config['gcs_fuse']['driver_daemonset']}' not found in "
+                             f"namespace '{self.config['gcs_fuse']['driver_namespace']}'")
+        return daemonset_status(daemonset)
+
+    def not_ready_pods(self):
+        """
+        Driver pods that are not ready, with the containers holding them back.
+
+        Returns:
+            dict: Pod name -> list of names of containers that are not ready.
+        """
+        return {
+            pod.metadata.name: [status.name for status in pod.status.container_statuses or [] if not status.ready]
+            for pod in self.cluster_snapshot.driver_pods if not is_ready(pod)
+        }
+
+    def _workload_pods(self):
+        core_api = self.k8s_client("CoreV1Api")
+        # Pending pods on a node without a driver are what this looks for, so only bound pods are filtered
+        field_selector = "spec.nodeName!=,status.phase!=Succeeded,status.phase!=Failed"
+        namespaces = self.config["driver_health"]["workload_namespaces"]
+        if not namespaces:
+            return core_api.list_pod_for_all_namespaces(field_selector=field_selector).items
+        return [pod for namespace in namespaces
+                for pod in core_api.list_namespaced_pod(namespace=namespace, field_selector=field_selector).items]
+
+    def coverage(self):
+        """
+        Join driver pods and GCS FUSE workloads to nodes.
+
+        Returns:
+            dict: nodes (count), driver_nodes (nodes with a ready driver pod),
+                workload_nodes (node -> names of the GCS FUSE pods on it),
+                uncovered (nodes running GCS FUSE pods without a ready driver
+                pod) and missing (schedulable nodes without a ready driver pod).
+        """
+        csi_driver_name = self.config["gcs_fuse"]["csi_driver_name"]
+        ready_drivers = {node for node, pods in index_by_node(self.cluster_snapshot.driver_pods).items()
+                         if any(is_ready(pod) for pod in pods)}
+        workload_nodes = {
+            node: [f"{pod.metadata.namespace}/{pod.metadata.name}" for pod in pods]
+            for node, pods in index_by_node(
+                pod for pod in self._workload_pods() if is_gcsfuse_workload(pod, csi_driver_name)
+            ).items()
+        }
+        nodes = self.cluster_snapshot.nodes
+        return {
+            "nodes": len(nodes),
+            "driver_nodes": len(ready_drivers),
+            "workload_nodes": workload_nodes,
+            "uncovered": sorted(node for node in workload_nodes if node not in ready_drivers),
+            "missing": sorted(node.metadata.name for node in nodes
+                              if _schedulable(node) and node.metadata.name not in ready_drivers),
+        }
+
+    def ready_latencies(self, window=None):
+        """
+        Seconds from each node's creation to its driver pod becoming ready.
+
+        Only nodes whose driver pod was created within `window` seconds of
+        the node count: older driver pods were replaced by a rollout or a
+        restart, not started with the node.
+
+        Args:
+            window (float): Seconds; [driver_health] ready_window by default.
+
+        Returns:
+            dict: Node name -> seconds.
+        """
+        window = window if window is not None else self.config["driver_health"]["ready_window"]
+        drivers = index_by_node(self.cluster_snapshot.driver_pods)
+        latencies = {}
+        for node in self.cluster_snapshot.nodes:
+            node_created = node.metadata.creation_timestamp.timestamp()
+            for pod in drivers.get(node.metadata.name, []):
+                ready_at = ready_since(pod)
+                if ready_at is not None and pod.metadata.creation_timestamp.timestamp() - node_created <= window:
+                    latencies[node.metadata.name] = ready_at - node_created
+        return latencies
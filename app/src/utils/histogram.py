@@ -0,0 +1,189 @@
+import math
+
+
+class LogHistogram:
+    """
+    Histogram with logarithmically sized buckets.
+
+    Bucket i covers [growth**i, growth**(i+1)), so every value is known to
+    within a relative error of (growth - 1) whatever its magnitude. Memory
+    depends on the spread of the values, not on how many were added, which
+    keeps millions of latency samples down to a few hundred counters.
+    Values <= 0 are counted in a separate zero bucket.
+    """
+
+    def __init__(self, growth=1.02):
+        """
+        Initializes an empty histogram.
+
+        Args:
+            growth (float): Ratio between consecutive bucket bounds (> 1).
+        """
+        if growth <= 1:
+            raise ValueError(f"Invalid histogram growth: {growth}. It must be greater than 1.")
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.counts = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value, count=1):
+        """
+        Add a value (count times).
+        """
+        if value > 0:
+            index = math.floor(math.log(value) / self._log_growth)
+            self.counts[index] = self.counts.get(index, 0) + count
+        else:
+            self.zero_count += count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def extend(self, values):
+        """
+        Add several values.
+        """
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """
+        Add the contents of another histogram with the same growth.
+        """
+        if other.growth != self.growth:
+            raise ValueError("Cannot merge histograms with different bucket growth")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def mean(self):
+        """float: Mean of the values, or None when empty."""
+        return self.total / self.count if self.count else None
+
+    def bucket_bounds(self, index):
+        """
+        Lower and upper bound of a bucket.
+        """
+        return self.growth ** index, self.growth ** (index + 1)
+
+    def buckets(self):
+        """
+        Non-empty buckets in ascending order.
+
+        Returns:
+            list: (lower bound, upper bound, count) tuples; the zero bucket is (0, 0, count).
+        """
+        buckets = [(0.0, 0.0, self.zero_count)] if self.zero_count else []
+        for index in sorted(self.counts):
+            lower, upper = self.bucket_bounds(index)
+            buckets.append((lower, upper, self.counts[index]))
+        return buckets
+
+    def quantile(self, q):
+        """
+        Estimate a quantile from the bucket midpoints (clamped to the exact min/max).
+
+        Args:
+            q (float): Quantile between 0 and 1.
+
+        Returns:
+            float: The estimated value, or None when empty.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for lower, upper, count in self.buckets():
+            seen += count
+            if seen > rank:
+                value = math.sqrt(lower * upper) if lower > 0 else 0.0
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def to_dict(self):
+        """
+        JSON-serializable form (see from_dict()).
+        """
+        return {"growth": self.growth, "counts": {str(index): count for index, count in self.counts.items()},
+                "zero_count": self.zero_count, "count": self.count, "total": self.total,
+                "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a histogram from to_dict() output.
+        """
+        histogram = cls(data["growth"])
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.zero_count = data["zero_count"]
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class TimeSeries:
+    """
+    Fixed-size time series of summed values (e.g. bytes read per interval).
+
+    Values are summed into buckets of `resolution` seconds; when there would be
+    more than `max_points` buckets, adjacent buckets are merged and the
+    resolution doubles. Memory stays bounded however long the run is.
+    """
+
+    def __init__(self, resolution=1.0, max_points=240):
+        """
+        Initializes an empty series.
+
+        Args:
+            resolution (float): Initial bucket width in seconds.
+            max_points (int): Maximum number of buckets kept.
+        """
+        self.resolution = resolution
+        self.max_points = max_points
+        self.start = None
+        self.buckets = {}
+
+    def add(self, timestamp, value):
+        """
+        Add a value at a timestamp (seconds, e.g. time.time()).
+        """
+        if self.start is None:
+            self.start = timestamp
+        index = int(max(timestamp - self.start, 0) // self.resolution)
+        while index >= self.max_points:
+            self._downsample()
+            index //= 2
+        self.buckets[index] = self.buckets.get(index, 0) + value
+
+    def _downsample(self):
+        merged = {}
+        for index, value in self.buckets.items():
+            merged[index // 2] = merged.get(index // 2, 0) + value
+        self.buckets = merged
+        self.resolution *= 2
+
+    def rates(self):
+        """
+        Per-second rates of each bucket, including empty buckets up to the last one.
+
+        Returns:
+            list: (seconds since start, value per second) tuples.
+        """
+        if not self.buckets:
+            return []
+        return [(index * self.resolution, self.buckets.get(index, 0) / self.resolution)
+                for index in range(max(self.buckets) + 1)]
@@ -0,0 +1,131 @@
+import hashlib
+import re
+import shlex
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# Digest algorithms with a coreutils/busybox "<name>sum" tool and a hashlib equivalent
+ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+
+
+def _check_algorithm(algorithm):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported checksum algorithm: {algorithm}. Supported: {', '.join(ALGORITHMS)}")
+
+
+def checksum_command(path, algorithm="sha256"):
+    """
+    Shell command printing "<digest> <size>" for a file inside a pod.
+
+    The file is hashed by streaming it through `<algorithm>sum` in the pod, so
+    only the digest travels back through the API server.
+
+    Args:
+        path (str): File path inside the pod.
+        algorithm (str): One of ALGORITHMS.
+
+    Returns:
+        list: Command and arguments for an exec call.
+    """
+    _check_algorithm(algorithm)
+    script = f'set -e; digest=$({algorithm}sum "$1"); echo "${{digest%% *}} $(stat -c %s "$1")"'
+    return ["/bin/sh", "-c", script, "sh", path]
+
+
+def parse_checksum_output(output, algorithm="sha256"):
+    """
+    Extract the digest and size from checksum_command() output.
+
+    Args:
+        output (str): Exec output.
+        algorithm (str): Algorithm the output was produced with.
+
+    Returns:
+        tuple: (hex digest, size in bytes).
+
+    Raises:
+        ValueError: If the output contains no digest line (e.g. the file is missing).
+    """
+    length = hashlib.new(algorithm).digest_size * 2
+    match = re.search(rf"^([0-9a-f]{{{length}}}) (\d+)\s*$", output or "", re.MULTILINE)
+    if match is None:
+        raise ValueError(f"No {algorithm} checksum in output: {(output or '').strip()[:200]!r}")
+    return match.group(1), int(match.group(2))
+
+
+def digest_bytes(data, algorithm="sha256"):
+    """
+    Expected digest of content written by the runner.
+
+    Args:
+        data (bytes or str): Content (str is UTF-8 encoded).
+        algorithm (str): One of ALGORITHMS.
+
+    Returns:
+        str: Hex digest.
+    """
+    _check_algorithm(algorithm)
+    if isinstance(data, str):
+        data = data.encode()
+    return hashlib.new(algorithm, data).hexdigest()
+
+
+async def checksum_pods(async_k8s_client, pod_names, namespace, path, algorithm="sha256", container=None):
+    """
+    Checksum the same file in many pods concurrently.
+
+    Runs checksum_command() in every pod over the async client's shared
+    connection pool (bounded by its concurrency setting). Memory and API server
+    traffic do not depend on the file size.
+
+    Args:
+        async_k8s_client (AsyncKubernetesClient): Async client.
+        pod_names (list): Pods to checksum the file in.
+        namespace (str): Namespace of the pods.
+        path (str): File path inside the pods.
+        algorithm (str): One of ALGORITHMS.
+        container (str): Optional container name.
+
+    Returns:
+        dict: Pod name -> (digest, size), or the exception raised for that pod.
+    """
+    command = checksum_command(path, algorithm)
+    logger.info(f"Computing {algorithm} of {shlex.quote(path)} in {len(pod_names)} pods")
+    outputs = await async_k8s_client.gather(
+        async_k8s_client.exec_command(pod_name, namespace, command, container=container)
+        for pod_name in pod_names
+    )
+    results = {}
+    for pod_name, output in zip(pod_names, outputs):
+        if isinstance(output, Exception):
+            results[pod_name] = output
+            continue
+        try:
+            results[pod_name] = parse_checksum_output(output, algorithm)
+        except ValueError as e:
+            results[pod_name] = e
+    return results
+
+
+def checksum_failures(results, expected_digest, expected_size, algorithm="sha256"):
+    """
+    Describe the pods whose checksum_pods() result does not match the expected content.
+
+    Args:
+        results (dict): checksum_pods() results.
+        expected_digest (str): Hex digest the file should have.
+        expected_size (int): Size the file should have.
+        algorithm (str): Algorithm of the digests.
+
+    Returns:
+        list: One message per mismatching or failed pod.
+    """
+    failures = []
+    for pod_name, result in sorted(results.items()):
+        if isinstance(result, Exception):
+            failures.append(f"{pod_name}: {result}")
+        elif result != (expected_digest, expected_size):
+            failures.append(f"{pod_name}: {algorithm} {result[0]} ({result[1]} bytes), "
+                            f"expected {expected_digest} ({expected_size} bytes)")
+    return failures
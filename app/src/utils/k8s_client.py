@@ -1,13 +1,68 @@
-import tomli
-from kubernetes import client, config
-from kubernetes.client.configuration import Configuration
-from kubernetes.client.api_client import ApiClient
+from src.utils.config_util import load_config
 from src.utils.logging_util import get_logger
+from src.utils.tracing import tracer
+from src.utils.polling import request_timeout
 import urllib3
 import base64
+import socket
+import ssl
+import certifi
 
 logger = get_logger(__name__)
 
+_HTTP_VERBS = {"POST": "create", "PUT": "update", "PATCH": "patch", "DELETE": "delete"}
+# Subresources kubernetes.stream serves over a websocket
+_WEBSOCKET_SUBRESOURCES = ("/exec", "/attach", "/portforward")
+
+
+def api_call_attributes(resource_path, method, path_params=None, query_params=None):
+    """
+    Describe an API call for tracing.
+
+    Args:
+        resource_path (str): Path template, e.g. "/api/v1/namespaces/{namespace}/pods/{name}".
+        method (str): HTTP method.
+        path_params (dict): Values for the path template.
+        query_params (list): Query parameters as (key, value) pairs.
+
+    Returns:
+        tuple: Span name, category ("k8s" or "exec") and attributes.
+    """
+    path_params = path_params or {}
+    query = dict(query_params or [])
+
+    # "/apis/apps/v1/namespaces/{namespace}/deployments/{name}/scale" -> "deployments/scale"
+    segments = [part for part in resource_path.strip("/").split("/") if not part.startswith("{")]
+    segments = segments[2:] if segments[0] == "api" else segments[3:]
+    if len(segments) > 1 and segments[0] == "namespaces":
+        segments = segments[1:]
+    resource = "/".join(segments)
+
+    if resource.endswith("/exec"):
+        verb = "exec"
+    elif method == "GET":
+        if "name" in path_params:
+            verb = "get"
+        else:
+            verb = "watch" if str(query.get("watch")).lower() == "true" else "list"
+    else:
+        verb = _HTTP_VERBS.get(method, method.lower())
+
+    attributes = {"verb": verb, "resource": resource}
+    if "namespace" in path_params:
+        attributes["namespace"] = path_params["namespace"]
+    if "name" in path_params:
+        attributes["pod" if resource.startswith("pods") else "name"] = path_params["name"]
+    if verb == "exec":
+        command = []
+        for key, value in query_params or []:
+            if key == "command":
+                command.extend(value if isinstance(value, (list, tuple)) else [value])
+        attributes["command"] = " ".join(str(part) for part in command)[:200]
+        return "exec", "exec", attributes
+    return f"{verb} {resource}", "k8s", attributes
+
+
 class KubernetesClient:
     """
     Utility class to set up and provide Kubernetes API clients.
@@ -34,25 +89,23 @@ class KubernetesClient:
             config_file (str): Path to the configuration file.
 
         Returns:
-            dict: Parsed configuration data.
+            Mapping: Parsed configuration data, shared process-wide.
         """
-        logger.info(f"Loading configuration from {config_file}...")
         try:
-            with open(config_file, "rb") as file:
-                config_data = tomli.load(file)
-                logger.info("Configuration loaded successfully.")
-                return config_data
+            return load_config(config_file)
         except FileNotFoundError:
             logger.error(f"Configuration file not found: {config_file}.")
             raise
-        except Exception as e:
-            logger.exception(f"Failed to load configuration: {e}")
-            raise
 
     def _initialize_client(self):
         """
         Initializes the Kubernetes client based on the configuration.
         """
+        # The kubernetes package is slow to import, only pay for it once a client is built
+        from kubernetes import config
+        from kubernetes.client.api_client import ApiClient
+        from kubernetes.client.configuration import Configuration
+
         try:
             logger.info("Initializing Kubernetes client...")
 
@@ -71,7 +124,7 @@ class KubernetesClient:
             # Get proxy configuration from the settings
             http_proxy = self.config.get("proxy", {}).get("http_proxy")
             https_proxy = self.config.get("proxy", {}).get("https_proxy")
-            verify_ssl = self.config.get("proxy", {}).get("verify_ssl", False)
+            verify_ssl = self.config.get("proxy", {}).get("verify_ssl", True)
 
             # Get the default Kubernetes configuration
             self.k8s_config = Configuration.get_default_copy()
@@ -80,25 +133,22 @@ class KubernetesClient:
             logger.info(f"Using CA certificate: { self.k8s_config.ssl_ca_cert}")
 
             # Configure SSL verification
-            self.k8s_config.verify_ssl = True
+            self.k8s_config.verify_ssl = verify_ssl
             logger.info(f"SSL verification set to: {verify_ssl}")
 
+            # The API server is always reached over HTTPS, so the HTTPS proxy
+            # wins when both are set. Exec websockets read it from the configuration.
+            proxy_url = https_proxy or http_proxy
+            if proxy_url:
+                logger.info(f"Configuring proxy: {proxy_url}")
+                self.k8s_config.proxy = proxy_url
+
             # Initialize the ApiClient with the configuration
             self.api_client = ApiClient(configuration = self.k8s_config)
 
-            # Set the proxy in the ApiClient if provided
-            if http_proxy:
-                logger.info(f"Configuring HTTPS proxy: {https_proxy}")
-                self.api_client.rest_client.pool_manager = urllib3.ProxyManager(
-                    proxy_url = https_proxy,
-                    cert_reqs = "CERT_REQUIRED" if verify_ssl else "CERT_NONE",
-                )
-            elif http_proxy:
-                logger.info(f"Configuring HTTP proxy: {http_proxy}")
-                self.api_client.rest_client.pool_manager = urllib3.ProxyManager(
-                    proxy_url = http_proxy,
-                    cert_reqs = "CERT_REQUIRED" if verify_ssl else "CERT_NONE",
-                )
+            # Replace the default pool with one sized from the settings
+            self.api_client.rest_client.pool_manager = self._build_pool_manager(proxy_url)
+            self._instrument_api_client()
 
             # Initialize the Kubernetes API client
             # self.client = client.AppsV1Api(api_client)
@@ -108,22 +158,163 @@ class KubernetesClient:
             logger.exception(f"Failed to initialize Kubernetes client: {e}")
             raise
 
+    def _instrument_api_client(self):
+        """
+        Trace every API call made through the ApiClient and bound it by the
+        current polling Deadline.
+
+        Exec calls are covered too: kubernetes.stream swaps the transport for a
+        websocket but still goes through call_api. The websocket client only
+        takes a single number as its timeout, so those calls get one.
+        """
+        call_api = self.api_client.call_api
+        rest_request = self.api_client.rest_client.request
+
+        def traced_call_api(resource_path, method, path_params=None, query_params=None, *args, **kwargs):
+            if kwargs.get("_request_timeout") is None:
+                timeout = request_timeout()
+                if timeout is None:
+                    pass
+                elif resource_path.endswith(_WEBSOCKET_SUBRESOURCES):
+                    # WSClient.run_forever() compares elapsed seconds with it
+                    kwargs["_request_timeout"] = timeout
+                else:
+                    # The REST client only honours an int or a (connect, read) tuple
+                    kwargs["_request_timeout"] = (timeout, timeout)
+            if not tracer.active:
+                return call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+            name, category, attributes = api_call_attributes(resource_path, method, path_params, query_params)
+            with tracer.span(name, category, **attributes) as span:
+                try:
+                    result = call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+                except Exception as e:
+                    span.set(http_status=getattr(e, "status", None))
+                    raise
+                if isinstance(result, str):
+                    # Preloaded exec output
+                    span.set(bytes=len(result))
+                return result
+
+        def traced_request(*args, **kwargs):
+            response = rest_request(*args, **kwargs)
+            span = tracer.current_span()
+            if span is not None and span.category == "k8s":
+                span.set(http_status=response.status)
+                if kwargs.get("_preload_content", True):
+                    span.set(bytes=len(response.data))
+            return response
+
+        self.api_client.call_api = traced_call_api
+        self.api_client.rest_client.request = traced_request
+
+    def _build_pool_manager(self, proxy_url=None):
+        """
+        Build the urllib3 pool manager used for API server connections.
+
+        Direct and proxied connections get the same pool sizing, keep-alive and
+        TLS settings from the [connection_pool] section.
+
+        Args:
+            proxy_url (str): Optional proxy URL.
+
+        Returns:
+            urllib3.PoolManager: Pool manager (a ProxyManager when a proxy is set).
+        """
+        pool_config = self.config.get("connection_pool", {})
+        pool_args = {
+            "num_pools": pool_config.get("num_pools", 4),
+            "maxsize": pool_config.get("maxsize_per_host", 10),
+            "block": pool_config.get("block", True),
+            "cert_reqs": ssl.CERT_REQUIRED if self.k8s_config.verify_ssl else ssl.CERT_NONE,
+            "ca_certs": self.k8s_config.ssl_ca_cert or certifi.where(),
+            "cert_file": self.k8s_config.cert_file,
+            "key_file": self.k8s_config.key_file,
+            "socket_options": self._socket_options(pool_config),
+        }
+        if self.k8s_config.assert_hostname is not None:
+            pool_args["assert_hostname"] = self.k8s_config.assert_hostname
+        if self.k8s_config.tls_server_name:
+            pool_args["server_hostname"] = self.k8s_config.tls_server_name
+
+        logger.info(
+            f"Connection pool: {pool_args['maxsize']} connections per host, "
+            f"{pool_args['num_pools']} hosts, block={pool_args['block']}, "
+            f"keep_alive={pool_config.get('keep_alive', True)}"
+        )
+        if proxy_url:
+            return urllib3.ProxyManager(proxy_url=proxy_url, **pool_args)
+        return urllib3.PoolManager(**pool_args)
+
+    @staticmethod
+    def _socket_options(pool_config):
+        """
+        Build socket options enabling TCP keep-alive on pooled connections.
+
+        Args:
+            pool_config (dict): The [connection_pool] settings.
+
+        Returns:
+            list: Socket options for urllib3 connections.
+        """
+        options = list(urllib3.connection.HTTPConnection.default_socket_options)
+        if not pool_config.get("keep_alive", True):
+            return options
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # The probe tuning options are Linux specific
+        for name, key, default in (
+            ("TCP_KEEPIDLE", "keep_alive_idle", 60),
+            ("TCP_KEEPINTVL", "keep_alive_interval", 10),
+            ("TCP_KEEPCNT", "keep_alive_count", 5),
+        ):
+            if hasattr(socket, name):
+                options.append((socket.IPPROTO_TCP, getattr(socket, name), pool_config.get(key, default)))
+        return options
+
+    def pool_stats(self):
+        """
+        Report usage of the pooled API server connections.
+
+        Returns:
+            list: One dict per host pool with connection and request counts.
+        """
+        stats = []
+        pool_manager = self.api_client.rest_client.pool_manager
+        for key in pool_manager.pools.keys():
+            pool = pool_manager.pools[key]
+            stats.append({
+                "host": pool.host,
+                "port": pool.port,
+                "scheme": pool.scheme,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_connections": pool.pool.qsize() if pool.pool else 0,
+                "maxsize": pool.pool.maxsize if pool.pool else 0,
+            })
+        return stats
+
     def get_client(self, api_type):
         """
         Retrieve the specified Kubernetes API client.
 
         Args:
-            api_type (str): Type of Kubernetes API client (e.g., "AppsV1Api", "CoreV1Api").
+            api_type (str): Type of Kubernetes API client (e.g., "AppsV1Api", "CoreV1Api",
+                "CoordinationV1Api", "CustomObjectsApi").
 
         Returns:
             object: The requested Kubernetes API client instance.
         """
         if api_type not in self.api_clients:
+            from kubernetes import client
+
             logger.info(f"Initializing API client for: {api_type}")
             if api_type == "AppsV1Api":
                 self.api_clients[api_type] = client.AppsV1Api(self.api_client)
             elif api_type == "CoreV1Api":
                 self.api_clients[api_type] = client.CoreV1Api(self.api_client)
+            elif api_type == "CoordinationV1Api":
+                self.api_clients[api_type] = client.CoordinationV1Api(self.api_client)
+            elif api_type == "CustomObjectsApi":
+                self.api_clients[api_type] = client.CustomObjectsApi(self.api_client)
             else:
                 logger.error(f"Unsupported API client type: {api_type}")
                 raise ValueError(f"Unsupported API client type: {api_type}")
@@ -0,0 +1,256 @@
+import json
+import time
+import uuid
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+from src.utils.polling import poll_until
+from src.utils.prometheus_scrape import histogram_quantile
+
+logger = get_logger(__name__)
+
+
+def _latency_quantiles(bounds, counts):
+    cumulative = []
+    total = 0
+    for bound, count in zip(bounds, counts):
+        total += count
+        cumulative.append((bound, total))
+    return histogram_quantile(0.5, cumulative), histogram_quantile(0.99, cumulative)
+
+
+def aggregate_phase(results, clients, nodes):
+    """
+    Combine the per-pod results of a read phase.
+
+    Args:
+        results (dict): Pod name -> result reported by read_file.py
+            (ops, errors, bytes, buckets, bounds, started_at, ended_at).
+        clients (int): Number of pods the phase ran on.
+        nodes (int): Number of nodes they ran on.
+
+    Returns:
+        dict: clients, nodes, duration (first start to last end), ops, errors,
+            bytes, throughput (bytes/s), read_rate (ops/s), p50, p99, start_skew
+            (seconds between the first and last pod starting), pod_throughput
+            (mean of the pods' throughputs), min_pod_throughput, max_pod_p99
+            and pods (per pod: ops, errors, bytes, started_at, ended_at,
+            throughput, p50 and p99).
+    """
+    started = [result["started_at"] for result in results.values()]
+    ended = [result["ended_at"] for result in results.values()]
+    duration = max(ended) - min(started)
+    bounds = next(iter(results.values()))["bounds"] + [float("inf")]
+    counts = [sum(result["buckets"][i] for result in results.values()) for i in range(len(bounds))]
+    p50, p99 = _latency_quantiles(bounds, counts)
+    pods = {}
+    for pod_name, result in results.items():
+        pod = {key: result[key] for key in ("ops", "errors", "bytes", "started_at", "ended_at")}
+        pod_duration = result["ended_at"] - result["started_at"]
+        pod["throughput"] = result["bytes"] / pod_duration if pod_duration > 0 else 0.0
+        pod["p50"], pod["p99"] = _latency_quantiles(bounds, result["buckets"])
+        pods[pod_name] = pod
+    pod_throughputs = [pod["throughput"] for pod in pods.values()]
+    pod_p99s = [pod["p99"] for pod in pods.values() if pod["p99"] is not None]
+    ops = sum(result["ops"] for result in results.values())
+    read_bytes = sum(result["bytes"] for result in results.values())
+    return {
+        "clients": clients,
+        "nodes": nodes,
+        "duration": duration,
+        "ops": ops,
+        "errors": sum(result["errors"] for result in results.values()),
+        "bytes": read_bytes,
+        "throughput": read_bytes / duration if duration > 0 else 0.0,
+        "read_rate": ops / duration if duration > 0 else 0.0,
+        "p50": p50,
+        "p99": p99,
+        "start_skew": max(started) - min(started),
+        "pod_throughput": sum(pod_throughputs) / len(pod_throughputs),
+        "min_pod_throughput": min(pod_throughputs),
+        "max_pod_p99": max(pod_p99s) if pod_p99s else None,
+        "pods": pods,
+    }
+
+
+def packing_limit(curve, efficiency):
+    """
+    Most pods that fit together before per-pod throughput drops too far.
+
+    Args:
+        curve (list): aggregate_phase() results in increasing client order.
+        efficiency (float): Lowest acceptable mean per-pod throughput, as a
+            fraction of the first (smallest) point's.
+
+    Returns:
+        int: Client count of the last point, walking up the curve, whose
+            per-pod throughput stayed at or above the threshold (0 if even
+            the first point has no throughput).
+    """
+    if not curve or curve[0]["pod_throughput"] <= 0:
+        return 0
+    limit = 0
+    for point in curve:
+        if point["pod_throughput"] < efficiency * curve[0]["pod_throughput"]:
+            break
+        limit = point["clients"]
+    return limit
+
+
+class LoadCoordinator:
+    """
+    Runs synchronized read phases on perf reader pods in coordinated mode.
+
+    read_file.py with MODE=coordinated serves a control API on [coordinator]
+    control_port instead of reading forever. Requests go through the API
+    server's pod proxy, so the runner needs no network path to the pods:
+
+    - GET /status registers a pod (it must be idle);
+    - POST /phases/<id>/<start_at>/<duration>/<sleep_interval> arms a phase.
+      Every pod gets the same start_at, a few seconds ahead, which is the
+      start barrier;
+    - GET /phases/<id> returns the pod's counts and latency buckets once done.
+    """
+
+    def __init__(self, k8s_client, async_k8s_client, perf_workload, config_file="config/settings.toml"):
+        """
+        Initializes the coordinator.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            async_k8s_client (AsyncKubernetesClient): Async client used to fan requests out.
+            perf_workload (PerfWorkload): The reader deployment.
+            config_file (str): Path to the configuration file.
+        """
+        self.config = load_config(config_file)["coordinator"]
+        self.k8s_client = k8s_client
+        self.async_k8s_client = async_k8s_client
+        self.perf_workload = perf_workload
+
+    async def _request(self, method, pod_name, path):
+        core_api = self.async_k8s_client.get_client("CoreV1Api")
+        call = (core_api.connect_post_namespaced_pod_proxy_with_path if method == "POST"
+                else core_api.connect_get_namespaced_pod_proxy_with_path)
+        # Raw response: the generated client would turn a JSON 'str' into a Python repr
+        response = await call(name=f"{pod_name}:{self.config['control_port']}",
+                              namespace=self.perf_workload.namespace, path=path, _preload_content=False)
+        try:
+            data = await response.read()
+        finally:
+            response.release()
+        # Raw responses are not checked by the client: a busy (409) or unknown (404) phase must not look accepted
+        if not 200 <= response.status < 300:
+            raise RuntimeError(f"{method} {path} returned HTTP {response.status}: "
+                               f"{data.decode(errors='replace').strip()[:500]}")
+        return response.status, json.loads(data)
+
+    def _fan_out(self, method, paths):
+        """Send one request per pod concurrently; pod name -> (2xx status, body) or exception."""
+        async def requests():
+            return await self.async_k8s_client.gather(
+                self._request(method, pod_name, path) for pod_name, path in paths.items()
+            )
+
+        return dict(zip(paths, self.async_k8s_client.run(requests())))
+
+    def register(self, pod_names):
+        """
+        Check that every pod answers in coordinated mode and is idle.
+
+        Clock offsets between the runner and the pods are logged, since the
+        barrier relies on the nodes' clocks.
+
+        Args:
+            pod_names (list): Reader pods.
+
+        Raises:
+            RuntimeError: If a pod does not answer, is not coordinated or is busy.
+        """
+        sent_at = time.time()
+        statuses = self._fan_out("GET", {pod_name: "status" for pod_name in pod_names})
+        received_at = time.time()
+        for pod_name, status in statuses.items():
+            if isinstance(status, Exception):
+                raise RuntimeError(f"Pod '{pod_name}' did not register: {status}")
+            body = status[1]
+            if body.get("mode") != "coordinated" or body.get("state") != "idle":
+                raise RuntimeError(f"Pod '{pod_name}' is not ready for a phase: {body}")
+            offset = body["time"] - (sent_at + received_at) / 2
+            if abs(offset) > self.config["clock_warning"]:
+                logger.warning(f"Clock of pod '{pod_name}' is {offset:+.2f}s off the runner's "
+                               f"(round trip {received_at - sent_at:.2f}s)")
+        logger.info(f"Registered {len(pod_names)} reader pods")
+
+    def run_phase(self, pod_names, duration, sleep_interval):
+        """
+        Run one read phase on all pods at once and collect its results.
+
+        Args:
+            pod_names (list): Registered reader pods.
+            duration (float): Seconds each pod reads.
+            sleep_interval (float): Seconds each pod sleeps between reads.
+
+        Returns:
+            dict: Pod name -> result reported by the pod.
+
+        Raises:
+            RuntimeError: If a pod does not accept the phase (e.g. HTTP 409 while another
+                phase runs), or arming the pods outlasts the barrier lead.
+        """
+        phase_id = uuid.uuid4().hex[:12]
+        start_at = time.time() + self.config["barrier_lead"]
+        path = f"phases/{phase_id}/{start_at:.3f}/{duration}/{sleep_interval}"
+        armed = self._fan_out("POST", {pod_name: path for pod_name in pod_names})
+        failed = {pod_name: str(outcome) for pod_name, outcome in armed.items() if isinstance(outcome, Exception)}
+        if failed:
+            raise RuntimeError(f"Phase {phase_id} could not be started on {len(failed)} pods: {failed}")
+        if time.time() >= start_at:
+            raise RuntimeError(f"Arming {len(pod_names)} pods took longer than the "
+                               f"{self.config['barrier_lead']}s barrier lead; raise [coordinator] barrier_lead")
+        logger.info(f"Phase {phase_id}: {len(pod_names)} pods start reading in {start_at - time.time():.1f}s "
+                    f"for {duration}s")
+        time.sleep(max(start_at + duration - time.time(), 0))
+
+        results = {}
+
+        def collected():
+            pending = [pod_name for pod_name in pod_names if pod_name not in results]
+            for pod_name, outcome in self._fan_out("GET", {p: f"phases/{phase_id}" for p in pending}).items():
+                if isinstance(outcome, Exception):
+                    logger.debug(f"Result of pod '{pod_name}' not available: {outcome}")
+                elif outcome[0] == 200:
+                    results[pod_name] = outcome[1]
+            return len(results) == len(pod_names)
+
+        poll_until(collected, "phase_results", timeout=self.config["result_timeout"], max_interval=5)
+        return results
+
+    def scaling_curve(self, client_counts, duration, sleep_interval, node_name=None, spread=False):
+        """
+        Run one phase per client count, scaling the reader deployment in between.
+
+        Args:
+            client_counts (list): Numbers of reader pods, in the order to run them.
+            duration (float): Seconds of each phase.
+            sleep_interval (float): Seconds each pod sleeps between reads.
+            node_name (str): Node to place every reader pod on (anywhere when None).
+            spread (bool): Spread the reader pods evenly across nodes.
+
+        Returns:
+            list: aggregate_phase() results, one per client count.
+        """
+        core_api = self.k8s_client("CoreV1Api")
+        curve = []
+        for clients in client_counts:
+            self.perf_workload.deploy(clients, env={"MODE": "coordinated"}, node_name=node_name, spread=spread)
+            pod_names = self.perf_workload.wait_ready(clients)
+            self.register(pod_names)
+            pods = core_api.list_namespaced_pod(namespace=self.perf_workload.namespace,
+                                                label_selector=self.perf_workload.label_selector)
+            nodes = {pod.spec.node_name for pod in pods.items if pod.metadata.name in pod_names}
+            point = aggregate_phase(self.run_phase(pod_names, duration, sleep_interval), clients, len(nodes))
+            logger.info(f"{clients} clients on {len(nodes)} nodes: {point['throughput'] / 1024 / 1024:.2f} MiB/s, "
+                        f"{point['read_rate']:.1f} ops/s, {point['errors']} errors, "
+                        f"{point['pod_throughput'] / 1024 / 1024:.2f} MiB/s per pod, "
+                        f"start skew {point['start_skew'] * 1000:.0f}ms")
+            curve.append(point)
+        return curve
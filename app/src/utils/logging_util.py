@@ -1,5 +1,4 @@
 import logging
-import tomli  # For parsing TOML configuration files
 
 
 def load_logging_config(config_file="config/settings.toml"):
@@ -12,10 +11,12 @@ def load_logging_config(config_file="config/settings.toml"):
     Returns:
         str: The log level specified in the configuration file.
     """
+    # Imported here: config_util itself creates a logger at import time
+    from src.utils.config_util import read_config
+
     try:
-        with open(config_file, "rb") as file:
-            config = tomli.load(file)
-        return config.get("logging", {}).get("level", "INFO")  # Default to INFO
+        logging_config = read_config(config_file).get("logging", {})
+        return logging_config.get("log_level", logging_config.get("level", "INFO"))  # Default to INFO
     except Exception as e:
         print(f"Failed to load logging configuration: {e}")
         return "INFO"  # Fallback to INFO if config fails
@@ -0,0 +1,120 @@
+import importlib.util
+from src.utils.logging_util import get_logger
+from src.utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+# Latency buckets (seconds) covering fast API calls up to slow scale operations
+_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class HarnessMetrics:
+    """
+    Prometheus exporter for the test harness itself.
+
+    Step, API call and exec metrics are derived from finished tracing spans, so
+    the exporter needs no extra instrumentation; retries and benchmark results
+    are recorded by the polling helpers and the benchmark recorder. Until start() is called every
+    record_* method is a no-op, and prometheus_client is only imported then.
+    """
+
+    def __init__(self, prefix="gcs_bdd"):
+        """
+        Initializes a stopped exporter.
+
+        Args:
+            prefix (str): Prefix of all metric names.
+        """
+        self.prefix = prefix
+        self.enabled = False
+        self.registry = None
+
+    def start(self, port, addr="127.0.0.1", labels=None):
+        """
+        Create the metrics and serve them on http://<addr>:<port>/metrics.
+
+        Args:
+            port (int): Port for the HTTP server.
+            addr (str): Address to bind (only the local host by default).
+            labels (dict): Constant labels added to every sample through an info metric.
+
+        Raises:
+            ImportError: If prometheus_client is not installed.
+        """
+        if importlib.util.find_spec("prometheus_client") is None:
+            raise ImportError("prometheus_client is required for the metrics exporter: pip install prometheus_client")
+        from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, Info, start_http_server
+
+        prefix = self.prefix
+        self.registry = CollectorRegistry()
+        self.run_info = Info(f"{prefix}_run", "Test run metadata", registry=self.registry)
+        self.tests = Counter(f"{prefix}_tests_total", "Finished tests by outcome",
+                             ["outcome"], registry=self.registry)
+        self.step_duration = Histogram(f"{prefix}_step_duration_seconds", "Duration of Given/When/Then steps",
+                                       ["step", "status"], buckets=_BUCKETS, registry=self.registry)
+        self.api_requests = Counter(f"{prefix}_k8s_requests_total", "Kubernetes API calls",
+                                    ["verb", "resource", "code"], registry=self.registry)
+        self.api_duration = Histogram(f"{prefix}_k8s_request_duration_seconds", "Kubernetes API call latency",
+                                      ["verb", "resource"], buckets=_BUCKETS, registry=self.registry)
+        self.exec_duration = Histogram(f"{prefix}_exec_duration_seconds", "Latency of commands exec'd in pods",
+                                       ["status"], buckets=_BUCKETS, registry=self.registry)
+        self.polls = Counter(f"{prefix}_polls_total", "Checks made by polling loops",
+                             ["operation"], registry=self.registry)
+        self.retries = Counter(f"{prefix}_retries_total", "Unsatisfied checks of polling loops",
+                               ["operation"], registry=self.registry)
+        self.poll_wasted = Histogram(f"{prefix}_poll_wasted_seconds",
+                                     "Upper bound of the time a polled condition held before it was seen",
+                                     ["operation"], buckets=_BUCKETS, registry=self.registry)
+        self.benchmark = Gauge(f"{prefix}_benchmark_result", "Latest result of each benchmark measurement",
+                               ["benchmark", "unit"], registry=self.registry)
+        self.run_info.info({key: str(value) for key, value in (labels or {}).items()})
+
+        start_http_server(port, addr=addr, registry=self.registry)
+        tracer.add_listener(self._record_span)
+        self.enabled = True
+        logger.info(f"Serving harness metrics on http://{addr}:{port}/metrics")
+
+    def _record_span(self, span):
+        if span.category == "step":
+            step = span.attributes.get("function", span.name)
+            self.step_duration.labels(step=step, status=span.status).observe(span.duration)
+        elif span.category == "k8s":
+            verb = span.attributes.get("verb", "")
+            resource = span.attributes.get("resource", "")
+            code = span.attributes.get("http_status", "error" if span.status == "error" else 200)
+            self.api_requests.labels(verb=verb, resource=resource, code=str(code)).inc()
+            self.api_duration.labels(verb=verb, resource=resource).observe(span.duration)
+        elif span.category == "exec":
+            self.exec_duration.labels(status=span.status).observe(span.duration)
+        elif span.category == "test":
+            self.tests.labels(outcome=span.attributes.get("outcome", span.status)).inc()
+
+    def record_poll(self, operation, polls, wasted):
+        """
+        Record a finished polling loop.
+
+        Args:
+            operation (str): What was waited for (e.g. "deployment_start").
+            polls (int): Number of checks made.
+            wasted (float): Seconds the condition may have held unnoticed (0 if it never held).
+        """
+        if self.enabled:
+            self.polls.labels(operation=operation).inc(polls)
+            self.retries.labels(operation=operation).inc(max(polls - 1, 0))
+            self.poll_wasted.labels(operation=operation).observe(wasted)
+
+    def record_benchmark(self, benchmark, value, unit="seconds"):
+        """
+        Publish the latest value of a benchmark measurement.
+
+        Args:
+            benchmark (str): Benchmark name (e.g. "cache_first_read").
+            value (float): Measured value.
+            unit (str): Unit of the value.
+        """
+        if self.enabled:
+            self.benchmark.labels(benchmark=benchmark, unit=unit).set(value)
+
+
+# Process-wide exporter used by the pytest hooks and the steps
+metrics = HarnessMetrics()
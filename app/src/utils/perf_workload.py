@@ -0,0 +1,170 @@
+import copy
+import os
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+from src.utils.polling import poll_until
+
+logger = get_logger(__name__)
+
+# Metric names exported by perf/configmap.yaml's read_file.py
+READ_OPS = "gcsfuse_read_operations_total"
+READ_ERRORS = "gcsfuse_read_errors_total"
+READ_BYTES = "gcsfuse_read_bytes_total"
+READ_LATENCY = "gcsfuse_read_latency_histogram_seconds"
+
+
+def _load_manifest(path):
+    import yaml
+
+    with open(path) as file:
+        return yaml.safe_load(file)
+
+
+class PerfWorkload:
+    """
+    The perf reader of perf/: a deployment running read_file.py from a ConfigMap.
+
+    deploy() applies the manifests with the requested replica count and
+    environment (SLEEP_INTERVAL, FILE_PATTERN, ...), wait_ready() waits for
+    the rollout and delete() removes what deploy() created.
+    """
+
+    def __init__(self, k8s_client, config_file="config/settings.toml"):
+        """
+        Initializes the workload from the manifests in [perf] manifests_dir.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            config_file (str): Path to the configuration file.
+        """
+        self.config = load_config(config_file)["perf"]
+        self.k8s_client = k8s_client
+        manifests_dir = self.config["manifests_dir"]
+        self.configmap = _load_manifest(os.path.join(manifests_dir, "configmap.yaml"))
+        self.deployment = _load_manifest(os.path.join(manifests_dir, "deploy.yaml"))
+        self.name = self.deployment["metadata"]["name"]
+        self.namespace = self.deployment["metadata"].get("namespace", "default")
+        self.label_selector = ",".join(
+            f"{key}={value}" for key, value in self.deployment["spec"]["selector"]["matchLabels"].items()
+        )
+        self.created = []
+
+    @property
+    def container(self):
+        """str: Name of the reader container."""
+        return self.deployment["spec"]["template"]["spec"]["containers"][0]["name"]
+
+    def _apply(self, kind, body, create, replace):
+        from kubernetes.client.rest import ApiException
+
+        name = body["metadata"]["name"]
+        try:
+            create(namespace=self.namespace, body=body)
+            self.created.append((kind, name))
+            logger.info(f"Created {kind} '{name}'")
+        except ApiException as e:
+            if e.status != 409:
+                raise
+            replace(name=name, namespace=self.namespace, body=body)
+            logger.info(f"Replaced {kind} '{name}'")
+
+    def deploy(self, replicas, env=None, node_name=None, spread=False):
+        """
+        Apply the ConfigMap and the deployment.
+
+        Args:
+            replicas (int): Number of reader pods.
+            env (dict): Environment variables set on the reader container
+                (overriding the manifest's).
+            node_name (str): Node all reader pods are placed on (nodeSelector
+                on kubernetes.io/hostname); anywhere when None.
+            spread (bool): Spread the reader pods evenly across nodes (a
+                hostname topology spread constraint with a skew of 1).
+        """
+        core_api = self.k8s_client("CoreV1Api")
+        apps_api = self.k8s_client("AppsV1Api")
+        deployment = copy.deepcopy(self.deployment)
+        deployment["spec"]["replicas"] = replicas
+        container = deployment["spec"]["template"]["spec"]["containers"][0]
+        variables = {variable["name"]: variable for variable in container.get("env", [])}
+        for name, value in (env or {}).items():
+            variables[name] = {"name": name, "value": str(value)}
+        container["env"] = list(variables.values())
+        if node_name:
+            deployment["spec"]["template"]["spec"]["nodeSelector"] = {"kubernetes.io/hostname": node_name}
+        if spread:
+            deployment["spec"]["template"]["spec"]["topologySpreadConstraints"] = [{
+                "maxSkew": 1,
+                "topologyKey": "kubernetes.io/hostname",
+                "whenUnsatisfiable": "DoNotSchedule",
+                "labelSelector": {"matchLabels": deployment["spec"]["selector"]["matchLabels"]},
+            }]
+
+        self._apply("ConfigMap", self.configmap, core_api.create_namespaced_config_map,
+                    core_api.replace_namespaced_config_map)
+        self._apply("Deployment", deployment, apps_api.create_namespaced_deployment,
+                    apps_api.replace_namespaced_deployment)
+        logger.info(f"Deployed perf reader '{self.name}' with {replicas} replicas and env {env or {}}"
+                    + (f" on node '{node_name}'" if node_name else "")
+                    + (" spread across nodes" if spread else ""))
+
+    def pod_names(self):
+        """
+        Ready reader pods that are not terminating.
+
+        Returns:
+            list: Pod names.
+        """
+        pods = self.k8s_client("CoreV1Api").list_namespaced_pod(
+            namespace=self.namespace, label_selector=self.label_selector
+        )
+        return [
+            pod.metadata.name for pod in pods.items
+            if pod.metadata.deletion_timestamp is None and pod.status.phase == "Running"
+            and any(c.type == "Ready" and c.status == "True" for c in pod.status.conditions or [])
+        ]
+
+    def wait_ready(self, replicas, timeout=None):
+        """
+        Wait until the rollout is complete and `replicas` pods are ready.
+
+        Args:
+            replicas (int): Expected number of ready pods.
+            timeout (float): Seconds to wait ([perf] rollout_timeout by default).
+
+        Returns:
+            list: Names of the ready pods.
+        """
+        apps_api = self.k8s_client("AppsV1Api")
+
+        def rolled_out():
+            deployment = apps_api.read_namespaced_deployment(name=self.name, namespace=self.namespace)
+            status = deployment.status
+            if (status.observed_generation or 0) < (deployment.metadata.generation or 0):
+                return None
+            if (status.updated_replicas or 0) < replicas or (status.ready_replicas or 0) < replicas:
+                return None
+            pod_names = self.pod_names()
+            return pod_names if len(pod_names) == replicas else None
+
+        return poll_until(rolled_out, "perf_rollout", timeout=timeout or self.config["rollout_timeout"],
+                          max_interval=self.config["poll_interval"]).value
+
+    def delete(self):
+        """
+        Delete the objects deploy() created (objects that already existed are kept).
+        """
+        from kubernetes.client.rest import ApiException
+
+        core_api = self.k8s_client("CoreV1Api")
+        apps_api = self.k8s_client("AppsV1Api")
+        delete = {"Deployment": apps_api.delete_namespaced_deployment,
+                  "ConfigMap": core_api.delete_namespaced_config_map}
+        for kind, name in reversed(self.created):
+            try:
+                delete[kind](name=name, namespace=self.namespace)
+                logger.info(f"Deleted {kind} '{name}'")
+            except ApiException as e:
+                if e.status != 404:
+                    logger.error(f"Failed to delete {kind} '{name}': {e.reason}")
+        self.created = []
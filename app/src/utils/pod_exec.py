@@ -0,0 +1,220 @@
+import json
+import time
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+STDOUT_CHANNEL = 1
+STDERR_CHANNEL = 2
+ERROR_CHANNEL = 3
+
+
+class RingBuffer:
+    """
+    Keeps the last `limit` bytes written to it and counts everything written.
+    """
+
+    def __init__(self, limit):
+        """
+        Initializes an empty buffer.
+
+        Args:
+            limit (int): Maximum number of bytes kept.
+        """
+        self.limit = limit
+        self.data = bytearray()
+        self.total = 0
+
+    def append(self, chunk):
+        """
+        Add a chunk, dropping the oldest bytes beyond the limit.
+        """
+        self.total += len(chunk)
+        if len(chunk) >= self.limit:
+            self.data[:] = memoryview(chunk)[len(chunk) - self.limit:]
+            return
+        self.data += chunk
+        overflow = len(self.data) - self.limit
+        if overflow > 0:
+            del self.data[:overflow]
+
+    @property
+    def truncated(self):
+        """bool: Whether older output was dropped."""
+        return self.total > len(self.data)
+
+    def text(self):
+        """str: The kept bytes decoded as UTF-8."""
+        return self.data.decode(errors="replace")
+
+
+class ExecResult:
+    """
+    Outcome of an exec: exit status and the tail of each output stream.
+    """
+
+    __slots__ = ("returncode", "stdout", "stderr", "error", "terminated", "elapsed")
+
+    def __init__(self, returncode, stdout, stderr, error, terminated, elapsed):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        # Status message of the error channel when the command did not succeed
+        self.error = error
+        self.terminated = terminated
+        self.elapsed = elapsed
+
+    @property
+    def stdout_text(self):
+        """str: Kept stdout, decoded."""
+        return self.stdout.text()
+
+    @property
+    def stderr_text(self):
+        """str: Kept stderr, decoded."""
+        return self.stderr.text()
+
+
+def parse_status(error):
+    """
+    Exit status from the exec error channel.
+
+    Args:
+        error (bytes or str): Content of the error channel (a metav1.Status).
+
+    Returns:
+        tuple: (return code or None if unknown, status message or None on success).
+    """
+    if not error:
+        return None, "no exit status received"
+    try:
+        status = json.loads(error)
+    except ValueError:
+        return None, error.decode(errors="replace") if isinstance(error, bytes) else error
+    if status.get("status") == "Success":
+        return 0, None
+    for cause in (status.get("details") or {}).get("causes") or []:
+        if cause.get("reason") == "ExitCode":
+            return int(cause.get("message")), status.get("message")
+    return None, status.get("message")
+
+
+def open_exec(core_api, pod_name, namespace, command, container=None, stdin=False):
+    """
+    Start a command in a pod without buffering its output.
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        pod_name (str): Name of the pod.
+        namespace (str): Namespace of the pod.
+        command (list): Command and arguments to execute.
+        container (str): Optional container name.
+        stdin (bool): Open stdin for write_stdin().
+
+    Returns:
+        WSClient: Open binary websocket client.
+    """
+    from kubernetes.stream import stream
+    from kubernetes.stream.ws_client import _IgnoredIO
+
+    kwargs = {"container": container} if container else {}
+    logger.debug(f"Executing {command} in pod '{pod_name}'")
+    client = stream(
+        core_api.connect_get_namespaced_pod_exec,
+        name=pod_name,
+        namespace=namespace,
+        command=command,
+        stderr=True, stdin=stdin, stdout=True, tty=False,
+        binary=True, _preload_content=False,
+        **kwargs
+    )
+    # stream() can't pass capture_all=False through the API method, and the
+    # client would otherwise keep a copy of all output for read_all()
+    client._all = _IgnoredIO()
+    return client
+
+
+def _drain(client, callbacks):
+    """Move buffered output to the ring buffers; True if a callback asked to stop."""
+    stop = False
+    for channel, buffer, callback in callbacks:
+        chunk = client.read_channel(channel)
+        if chunk:
+            buffer.append(chunk)
+            if callback is not None and callback(chunk):
+                stop = True
+    return stop
+
+
+def collect(client, on_stdout=None, on_stderr=None, max_output=65536, timeout=None):
+    """
+    Read an exec's output incrementally until it exits.
+
+    Each chunk is passed to the callbacks as it arrives and only the last
+    `max_output` bytes of each stream are kept, so memory stays flat however
+    much the command prints. A callback returning True stops reading and
+    closes the connection; so does `timeout`.
+
+    Args:
+        client (WSClient): Client returned by open_exec().
+        on_stdout (callable): Called with each stdout chunk (bytes).
+        on_stderr (callable): Called with each stderr chunk (bytes).
+        max_output (int): Bytes of each stream kept in the result.
+        timeout (float): Seconds after which the exec is abandoned.
+
+    Returns:
+        ExecResult: Return code (None if terminated early or unknown) and output tails.
+    """
+    stdout = RingBuffer(max_output)
+    stderr = RingBuffer(max_output)
+    callbacks = ((STDOUT_CHANNEL, stdout, on_stdout), (STDERR_CHANNEL, stderr, on_stderr))
+    start_time = time.monotonic()
+    terminated = False
+    try:
+        while client.is_open() and not terminated:
+            wait = 1.0
+            if timeout is not None:
+                wait = min(wait, timeout - (time.monotonic() - start_time))
+                if wait <= 0:
+                    logger.warning(f"Exec abandoned after {timeout}s")
+                    terminated = True
+                    break
+            client.update(timeout=wait)
+            terminated = _drain(client, callbacks)
+        if not terminated:
+            # Frames buffered by the update that saw the connection close
+            terminated = _drain(client, callbacks)
+        error = None if terminated else client.read_channel(ERROR_CHANNEL)
+    finally:
+        # Closing the connection also ends the remote command's streams
+        client.close()
+    returncode, message = (None, "terminated") if terminated else parse_status(error)
+    return ExecResult(returncode, stdout, stderr, message, terminated, time.monotonic() - start_time)
+
+
+def exec_command(core_api, pod_name, namespace, command, container=None, check=False, **kwargs):
+    """
+    Run a command in a pod with bounded output (see collect()).
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        pod_name (str): Name of the pod.
+        namespace (str): Namespace of the pod.
+        command (list): Command and arguments to execute.
+        container (str): Optional container name.
+        check (bool): Raise if the command does not exit with status 0.
+        **kwargs: Passed to collect() (on_stdout, on_stderr, max_output, timeout).
+
+    Returns:
+        ExecResult: Outcome of the command.
+
+    Raises:
+        RuntimeError: If check is set and the command failed or was terminated.
+    """
+    result = collect(open_exec(core_api, pod_name, namespace, command, container), **kwargs)
+    if check and result.returncode != 0:
+        raise RuntimeError(
+            f"Command {command} failed in pod '{pod_name}' (exit status {result.returncode}): "
+            f"{result.stderr_text.strip() or result.error}"
+        )
+    return result
@@ -0,0 +1,108 @@
+import random
+from src.utils.config_util import load_config
+from src.utils.driver_health import index_by_node, is_ready
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("one_per_node", "random", "all", "zone")
+ZONE_LABEL = "topology.kubernetes.io/zone"
+
+
+def select_pods(pods, strategy="one_per_node", count=0, zone=None, nodes=None, rng=None):
+    """
+    Pick target pods among the ready, non-terminating ones.
+
+    Args:
+        pods (list): Candidate pods.
+        strategy (str): "one_per_node" (the first pod by name on each node),
+            "random" (a sample of `count` pods), "all" or "zone" (pods on
+            nodes of `zone`).
+        count (int): Most pods returned (0 for no limit); the sample size of
+            "random" (1 when 0). Larger selections are sampled down.
+        zone (str): Zone of the "zone" strategy.
+        nodes (list): Nodes of the cluster, needed by "zone".
+        rng (random.Random): Source of the samples.
+
+    Returns:
+        list: Selected pods, sorted by name.
+
+    Raises:
+        ValueError: If the strategy is unknown, or "zone" lacks a zone or nodes.
+    """
+    rng = rng or random.Random()
+    candidates = sorted((pod for pod in pods if is_ready(pod)), key=lambda pod: pod.metadata.name)
+    if strategy == "all":
+        selected = candidates
+    elif strategy == "one_per_node":
+        selected = [on_node[0] for _, on_node in sorted(index_by_node(candidates).items())]
+    elif strategy == "random":
+        count = count or 1
+        selected = candidates
+    elif strategy == "zone":
+        if not zone or nodes is None:
+            raise ValueError("The 'zone' strategy needs a zone and the cluster's nodes")
+        zones = {node.metadata.name: (node.metadata.labels or {}).get(ZONE_LABEL) for node in nodes}
+        selected = [pod for pod in candidates if zones.get(pod.spec.node_name) == zone]
+    else:
+        raise ValueError(f"Unknown pod selection strategy: {strategy}. Use one of {STRATEGIES}.")
+    if count and len(selected) > count:
+        selected = sorted(rng.sample(selected, count), key=lambda pod: pod.metadata.name)
+    return selected
+
+
+class PodSelector:
+    """
+    Chooses the pods a step targets, instead of whichever pod is listed first.
+
+    Only ready, non-terminating pods are eligible. The default strategy,
+    limit, zone and seed come from the [pod_selection] section.
+    """
+
+    def __init__(self, k8s_client, cluster_snapshot, config_file="config/settings.toml"):
+        """
+        Initializes the selector.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            cluster_snapshot (ClusterSnapshot): Cached nodes, for the "zone" strategy.
+            config_file (str): Path to the configuration file.
+        """
+        self.k8s_client = k8s_client
+        self.cluster_snapshot = cluster_snapshot
+        self.config = load_config(config_file)
+        # A seed of 0 samples differently on every run
+        self.rng = random.Random(self.config["pod_selection"]["seed"] or None)
+
+    def select(self, namespace, label_selector, strategy=None, count=None, zone=None):
+        """
+        List pods and select targets among them.
+
+        Args:
+            namespace (str): Namespace of the pods.
+            label_selector (str): Label selector of the pods.
+            strategy (str): See select_pods(); [pod_selection] strategy by default.
+            count (int): See select_pods(); [pod_selection] count by default.
+            zone (str): See select_pods(); [pod_selection] zone by default.
+
+        Returns:
+            list: Selected pods (V1Pod), sorted by name.
+
+        Raises:
+            ValueError: If no pod qualifies.
+        """
+        selection = self.config["pod_selection"]
+        strategy = strategy or selection["strategy"]
+        count = selection["count"] if count is None else count
+        zone = zone or selection["zone"]
+        pods = self.k8s_client("CoreV1Api").list_namespaced_pod(namespace=namespace,
+                                                                 label_selector=label_selector).items
+        nodes = self.cluster_snapshot.nodes if strategy == "zone" else None
+        selected = select_pods(pods, strategy, count=count, zone=zone, nodes=nodes, rng=self.rng)
+        if not selected:
+            raise ValueError(f"No ready pods matching '{label_selector}' in namespace '{namespace}' for the "
+                             f"'{strategy}' strategy ({len(pods)} pods listed)")
+        logger.info(f"Selected {len(selected)} of {len(pods)} pods ({strategy}) on "
+                    f"{len({pod.spec.node_name for pod in selected})} nodes: "
+                    + ", ".join(f"{pod.metadata.name}@{pod.spec.node_name}" for pod in selected))
+        return selected
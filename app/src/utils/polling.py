@@ -0,0 +1,186 @@
+import contextlib
+import contextvars
+import random
+import time
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+from src.utils.metrics import metrics
+from src.utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+_current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+
+def current_deadline():
+    """Return the innermost active Deadline of the current context, if any."""
+    return _current_deadline.get()
+
+
+class Deadline:
+    """
+    Point in time by which an operation (typically a whole scenario) must finish.
+
+    While a deadline is active, poll_until() never waits past it and every
+    Kubernetes API call gets a request timeout no longer than the time left.
+    A new deadline never outlives the one already active unless inherit=False.
+    """
+
+    def __init__(self, seconds, name="deadline", inherit=True):
+        """
+        Initializes a deadline `seconds` from now.
+
+        Args:
+            seconds (float): Time budget in seconds.
+            name (str): Name used in messages.
+            inherit (bool): Cap the deadline at the currently active one.
+        """
+        self.name = name
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        parent = current_deadline() if inherit else None
+        if parent is not None and parent.expires_at < self.expires_at:
+            self.expires_at = parent.expires_at
+            self.name = parent.name
+
+    def remaining(self):
+        """float: Seconds left (negative once expired)."""
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self):
+        """bool: Whether the deadline has passed."""
+        return self.remaining() <= 0
+
+    def budget(self, timeout=None):
+        """
+        Time available for an operation with its own timeout.
+
+        Args:
+            timeout (float): The operation's own timeout, if any.
+
+        Returns:
+            float: min(timeout, remaining()), never below zero.
+        """
+        remaining = max(self.remaining(), 0.0)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Make this the current deadline for the enclosed block.
+        """
+        token = _current_deadline.set(self)
+        try:
+            yield self
+        finally:
+            _current_deadline.reset(token)
+
+
+def request_timeout(min_timeout=None):
+    """
+    Request timeout for an API call under the current deadline.
+
+    Args:
+        min_timeout (float): Floor for the timeout so calls made after expiry
+            (e.g. cleanup) still get a chance to finish; defaults to
+            [polling] min_request_timeout.
+
+    Returns:
+        float: Seconds, or None when no deadline is active.
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    if min_timeout is None:
+        min_timeout = load_config().get("polling", {}).get("min_request_timeout", 5)
+    return max(deadline.remaining(), min_timeout)
+
+
+class PollResult:
+    """
+    Outcome of poll_until().
+    """
+
+    __slots__ = ("value", "polls", "elapsed", "slept", "wasted")
+
+    def __init__(self, value, polls, elapsed, slept, wasted):
+        self.value = value
+        self.polls = polls
+        self.elapsed = elapsed
+        self.slept = slept
+        # Upper bound of the time the condition may already have held before it was seen
+        self.wasted = wasted
+
+
+def poll_until(check, operation, timeout=None, initial_interval=None, max_interval=None,
+               factor=None, jitter=None):
+    """
+    Call `check` until it returns a truthy value, backing off exponentially.
+
+    The interval starts at `initial_interval`, grows by `factor` up to
+    `max_interval`, and each sleep is randomized by +/- `jitter` so parallel
+    pollers don't synchronize. Waiting stops at `timeout` or at the current
+    Deadline, whichever comes first. Exceptions raised by `check` propagate.
+
+    Args:
+        check (callable): Returns a truthy value once the condition holds.
+        operation (str): Name of what is awaited (used in logs and metrics).
+        timeout (float): Own timeout in seconds; None to rely on the deadline only.
+        initial_interval (float): First sleep in seconds ([polling] initial_interval).
+        max_interval (float): Longest sleep in seconds ([polling] max_interval).
+        factor (float): Backoff multiplier ([polling] backoff_factor).
+        jitter (float): Relative randomization of each sleep ([polling] jitter).
+
+    Returns:
+        PollResult: The check's value, the number of polls and the time spent and wasted.
+
+    Raises:
+        TimeoutError: If the condition does not hold in time.
+    """
+    polling = load_config().get("polling", {})
+    initial_interval = initial_interval if initial_interval is not None else polling.get("initial_interval", 1)
+    max_interval = max_interval if max_interval is not None else polling.get("max_interval", 30)
+    factor = factor if factor is not None else polling.get("backoff_factor", 2)
+    jitter = jitter if jitter is not None else polling.get("jitter", 0.2)
+
+    deadline = current_deadline()
+    start_time = time.monotonic()
+    end_time = start_time + timeout if timeout is not None else None
+    if deadline is not None:
+        end_time = deadline.expires_at if end_time is None else min(end_time, deadline.expires_at)
+
+    interval = initial_interval
+    polls = 0
+    slept = 0.0
+    last_sleep = 0.0
+    with tracer.span(f"poll {operation}", "poll", operation=operation) as span:
+        while True:
+            polls += 1
+            value = check()
+            now = time.monotonic()
+            if value:
+                result = PollResult(value, polls, now - start_time, slept, last_sleep)
+                break
+            if end_time is not None and now >= end_time:
+                result = None
+                break
+            sleep = min(interval, max_interval) * random.uniform(1 - jitter, 1 + jitter)
+            if end_time is not None:
+                sleep = min(sleep, end_time - now)
+            time.sleep(sleep)
+            slept += sleep
+            last_sleep = sleep
+            interval *= factor
+
+        elapsed = time.monotonic() - start_time
+        if span is not None:
+            span.set(polls=polls, slept=round(slept, 3), wasted=round(last_sleep, 3))
+        metrics.record_poll(operation, polls, last_sleep if result else 0.0)
+
+    if result is None:
+        reason = f"deadline '{deadline.name}'" if deadline is not None and deadline.expired else f"{timeout}s timeout"
+        raise TimeoutError(f"{operation} not satisfied after {polls} polls in {elapsed:.1f}s ({reason})")
+    logger.info(f"{operation} satisfied after {result.polls} polls in {result.elapsed:.1f}s "
+                f"(up to {result.wasted:.1f}s late)")
+    return result
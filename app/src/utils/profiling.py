@@ -0,0 +1,269 @@
+import collections
+import cProfile
+import contextlib
+import fnmatch
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+
+def _frame_label(filename, lineno, function):
+    return f"{function} ({os.path.basename(filename)}:{lineno})"
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:150]
+
+
+def collapse_pstats(stats, root):
+    """
+    Convert cProfile statistics into collapsed stacks.
+
+    cProfile only records caller/callee pairs, not full stacks, so stacks are
+    rebuilt top-down from the call graph and a callee's time is split between
+    its callers in proportion to the time spent under each of them.
+
+    Args:
+        stats (dict): pstats.Stats(...).stats.
+        root (str): Frame placed at the bottom of every stack (e.g. the step name).
+
+    Returns:
+        collections.Counter: Collapsed stack -> self time in microseconds.
+    """
+    callees = collections.defaultdict(dict)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+
+    stacks = collections.Counter()
+
+    def walk(func, stack, budget, seen):
+        _, _, self_time, cumulative, _ = stats[func]
+        if cumulative <= 0 or budget <= 0:
+            return
+        share = min(budget / cumulative, 1.0)
+        stacks[";".join(stack)] += int(self_time * share * 1e6)
+        if len(stack) > 200:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            if callee not in seen and callee in stats:
+                walk(callee, stack + [_frame_label(*callee)], edge_time * share, seen | {callee})
+
+    for func, (_, _, _, cumulative, callers) in stats.items():
+        if not callers:
+            walk(func, [root, _frame_label(*func)], cumulative, {func})
+    return stacks
+
+
+class _StackSampler:
+    """
+    Samples the stack of the calling thread at a fixed interval.
+    """
+
+    def __init__(self, interval):
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        # Stack at the start of the block; frames shared with it are trimmed from the samples
+        self.base = self._stack(sys._getframe(1))
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    @staticmethod
+    def _stack(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(_frame_label(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stack = self._stack(sys._current_frames().get(self.thread_id))
+            if stack:
+                self.stacks[stack] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self, root):
+        """
+        Collapsed stacks without the frames below the profiled block (the test runner).
+
+        Args:
+            root (str): Frame placed at the bottom of every stack.
+
+        Returns:
+            collections.Counter: Collapsed stack -> sample count.
+        """
+        stacks = collections.Counter()
+        for stack, count in self.stacks.items():
+            common = 0
+            for sampled, base in zip(stack, self.base):
+                if sampled != base:
+                    break
+                common += 1
+            # Keep the innermost shared frame as the anchor (e.g. the step runner)
+            stacks[";".join((root,) + stack[max(common - 1, 0):])] += count
+        return stacks
+
+
+class StepProfiler:
+    """
+    Profiles selected steps and Kubernetes API calls.
+
+    In "cprofile" mode each profiled block writes a .prof file (open it with
+    snakeviz or pstats); in "sample" mode a background thread samples the
+    stack every `interval` seconds and each block writes a .collapsed file.
+    Either way every block is added to a merged collapsed-stack file that
+    flamegraph.pl, speedscope or inferno can render.
+    """
+
+    def __init__(self, output_dir, patterns=("*",), mode="cprofile", interval=0.005):
+        """
+        Initializes the profiler.
+
+        Args:
+            output_dir (str): Directory for the profile files.
+            patterns (iterable): fnmatch patterns matched against step names and function names.
+            mode (str): "cprofile" or "sample".
+            interval (float): Sampling interval in seconds for "sample" mode.
+        """
+        if mode not in ("cprofile", "sample"):
+            raise ValueError(f"Invalid profile mode: {mode}. Use 'cprofile' or 'sample'.")
+        self.output_dir = output_dir
+        self.patterns = tuple(patterns)
+        self.mode = mode
+        self.interval = interval
+        self.merged = collections.Counter()
+        self._active = threading.local()
+        self._lock = threading.Lock()
+        self._count = 0
+        os.makedirs(output_dir, exist_ok=True)
+
+    def selects(self, *names):
+        """
+        Check whether any of the names matches the configured patterns.
+
+        Returns:
+            bool: True if the block should be profiled.
+        """
+        return any(fnmatch.fnmatch(name, pattern) for name in names for pattern in self.patterns)
+
+    @property
+    def busy(self):
+        """bool: Whether a block is being profiled on the current thread."""
+        return getattr(self._active, "name", None) is not None
+
+    def start(self, name):
+        """
+        Start profiling a block on the current thread.
+
+        Args:
+            name (str): Name of the block (used as the root frame and file name).
+
+        Returns:
+            object: Handle to pass to stop().
+        """
+        self._active.name = name
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            return name, profile, time.perf_counter()
+        sampler = _StackSampler(self.interval)
+        sampler.start()
+        return name, sampler, time.perf_counter()
+
+    def stop(self, handle):
+        """
+        Stop profiling a block and write its profile.
+
+        Args:
+            handle (object): Handle returned by start().
+        """
+        name, profiler, start_time = handle
+        elapsed = time.perf_counter() - start_time
+        self._active.name = None
+        with self._lock:
+            self._count += 1
+            base = os.path.join(self.output_dir, f"{self._count:04d}_{_safe_name(name)}")
+
+        if self.mode == "cprofile":
+            profiler.disable()
+            profiler.dump_stats(f"{base}.prof")
+            stacks = collapse_pstats(pstats.Stats(profiler).stats, name)
+        else:
+            profiler.stop()
+            stacks = profiler.collapsed(name)
+            self._write_collapsed(f"{base}.collapsed", stacks)
+
+        with self._lock:
+            self.merged.update(stacks)
+        logger.info(f"Profiled '{name}' ({elapsed:.3f}s) -> {base}")
+
+    @contextlib.contextmanager
+    def profile(self, name):
+        """
+        Profile the enclosed block unless another block is already profiled on this thread.
+        """
+        if self.busy:
+            yield
+            return
+        handle = self.start(name)
+        try:
+            yield
+        finally:
+            self.stop(handle)
+
+    def instrument_api_client(self, api_client):
+        """
+        Profile each call made through a (sync) Kubernetes ApiClient.
+
+        Calls made inside a profiled step are already part of that step's profile.
+
+        Args:
+            api_client (ApiClient): The API client to instrument.
+        """
+        from src.utils.k8s_client import api_call_attributes
+
+        call_api = api_client.call_api
+
+        def profiled_call_api(resource_path, method, path_params=None, query_params=None, *args, **kwargs):
+            name, _, _ = api_call_attributes(resource_path, method, path_params, query_params)
+            if self.busy or not self.selects(f"k8s {name}"):
+                return call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+            with self.profile(f"k8s {name}"):
+                return call_api(resource_path, method, path_params, query_params, *args, **kwargs)
+
+        api_client.call_api = profiled_call_api
+
+    @staticmethod
+    def _write_collapsed(path, stacks):
+        with open(path, "w") as file:
+            for stack, value in sorted(stacks.items()):
+                if value > 0:
+                    file.write(f"{stack} {value}\n")
+
+    def write_merged(self, filename="merged.collapsed"):
+        """
+        Write all profiled blocks into one collapsed-stack file.
+
+        Returns:
+            str: Path of the merged file.
+        """
+        path = os.path.join(self.output_dir, filename)
+        self._write_collapsed(path, self.merged)
+        unit = "microseconds" if self.mode == "cprofile" else f"samples of {self.interval * 1000:g}ms"
+        logger.info(f"Wrote merged collapsed stacks ({unit}) to {path}")
+        return path
@@ -0,0 +1,282 @@
+import math
+import time
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# Samples that only grow while a process runs (counters and histogram/summary parts); all others are gauges
+CUMULATIVE_SUFFIXES = ("_total", "_bucket", "_count", "_sum")
+# Exported by the standard process collectors; tells a restarted or new process from a missed scrape
+PROCESS_START = ("process_start_time_seconds", ())
+
+
+def parse_metrics(text):
+    """
+    Parse a Prometheus text exposition into samples.
+
+    `_created` samples (counter creation timestamps) are dropped.
+
+    Args:
+        text (str): Content of a /metrics endpoint.
+
+    Returns:
+        dict: (sample name, sorted label items) -> value.
+    """
+    from prometheus_client.parser import text_string_to_metric_families
+
+    samples = {}
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name.endswith("_created"):
+                continue
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+
+def histogram_quantile(q, buckets):
+    """
+    Estimate a quantile from cumulative histogram buckets, like PromQL's histogram_quantile().
+
+    Values are interpolated linearly inside the bucket holding the rank; a
+    rank in the +Inf bucket returns the largest finite bound.
+
+    Args:
+        q (float): Quantile between 0 and 1.
+        buckets (list): (upper bound, cumulative count) pairs, including +Inf.
+
+    Returns:
+        float: The estimate, or None when there are no observations.
+    """
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] <= 0:
+        return None
+    rank = q * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0.0
+    for upper_bound, count in buckets:
+        if count >= rank:
+            if math.isinf(upper_bound):
+                return lower_bound
+            if count == lower_count:
+                return upper_bound
+            return lower_bound + (upper_bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = upper_bound, count
+    return lower_bound
+
+
+class MetricsSnapshot:
+    """
+    /metrics samples of several pods, scraped at (about) the same time.
+
+    Samples are kept per pod so that differences between two snapshots can
+    handle a pod whose counters restarted from zero; queries sum over pods.
+    """
+
+    def __init__(self, pods, timestamp=None):
+        """
+        Initializes a snapshot.
+
+        Args:
+            pods (dict): Pod name -> parse_metrics() result.
+            timestamp (float): Scrape time (time.time()); defaults to now.
+        """
+        self.pods = pods
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    def value(self, name, **labels):
+        """
+        Sum of a sample over pods and over the label values not given.
+
+        Args:
+            name (str): Sample name (e.g. "gcsfuse_read_operations_total").
+            **labels: Label values the samples must have.
+
+        Returns:
+            float: The sum (0 when no sample matches).
+        """
+        total = 0.0
+        for samples in self.pods.values():
+            for (sample_name, sample_labels), value in samples.items():
+                if sample_name == name and all(dict(sample_labels).get(k) == str(v) for k, v in labels.items()):
+                    total += value
+        return total
+
+    def buckets(self, name):
+        """
+        Cumulative buckets of a histogram, summed over pods.
+
+        Args:
+            name (str): Histogram name (without the _bucket suffix).
+
+        Returns:
+            list: (upper bound, cumulative count) pairs.
+        """
+        totals = {}
+        for samples in self.pods.values():
+            for (sample_name, sample_labels), value in samples.items():
+                if sample_name == f"{name}_bucket":
+                    upper_bound = float(dict(sample_labels)["le"])
+                    totals[upper_bound] = totals.get(upper_bound, 0.0) + value
+        return sorted(totals.items())
+
+    def quantile(self, name, q):
+        """
+        Quantile of a histogram over all pods (see histogram_quantile()).
+        """
+        return histogram_quantile(q, self.buckets(name))
+
+    def delta(self, earlier):
+        """
+        What happened between an earlier snapshot and this one.
+
+        Counters, histogram buckets, counts and sums are subtracted per pod.
+        A pod whose process_start_time_seconds changed restarted, so all its
+        samples count from zero; without that metric, a sample that decreased
+        does. A pod missing from the earlier snapshot counts from zero only if
+        its process started after that scrape; one that was running but not
+        scraped has no baseline and is left out. Gauges are not subtracted:
+        they keep this snapshot's value.
+
+        Args:
+            earlier (MetricsSnapshot): Snapshot taken before this one.
+
+        Returns:
+            MetricsSnapshot: The differences, timestamped with this snapshot's
+                time; `duration` is the time between the two scrapes.
+        """
+        pods = {}
+        for pod_name, samples in self.pods.items():
+            before = earlier.pods.get(pod_name)
+            started = samples.get(PROCESS_START)
+            if before is None:
+                if started is not None and started < earlier.timestamp:
+                    logger.warning(f"Pod '{pod_name}' was running but missing from the earlier snapshot; "
+                                   f"leaving it out of the difference")
+                    continue
+                before = {}
+            elif started is not None and before.get(PROCESS_START, started) != started:
+                before = {}
+            pods[pod_name] = {
+                key: value - before.get(key, 0.0)
+                if key[0].endswith(CUMULATIVE_SUFFIXES) and value >= before.get(key, 0.0) else value
+                for key, value in samples.items()
+            }
+        result = MetricsSnapshot(pods, self.timestamp)
+        result.duration = self.timestamp - earlier.timestamp
+        return result
+
+
+async def scrape_pods(async_k8s_client, pod_names, namespace, port, path="metrics"):
+    """
+    Fetch a metrics endpoint of many pods concurrently through the API server's pod proxy.
+
+    No Service or port-forward is needed: requests go to
+    /api/v1/namespaces/<ns>/pods/<pod>:<port>/proxy/<path>.
+
+    Args:
+        async_k8s_client (AsyncKubernetesClient): Async client.
+        pod_names (list): Pods to scrape.
+        namespace (str): Namespace of the pods.
+        port (int): Metrics port of the pods.
+        path (str): Metrics path.
+
+    Returns:
+        dict: Pod name -> exposition text, or the exception raised for that pod.
+    """
+    core_api = async_k8s_client.get_client("CoreV1Api")
+    responses = await async_k8s_client.gather(
+        core_api.connect_get_namespaced_pod_proxy_with_path(name=f"{pod_name}:{port}", namespace=namespace, path=path)
+        for pod_name in pod_names
+    )
+    return dict(zip(pod_names, responses))
+
+
+def scrape_pod_port_forward(core_api, pod_name, namespace, port, path="metrics", timeout=30):
+    """
+    Fetch a pod's metrics endpoint over a port-forward stream.
+
+    For clusters where the API server pod proxy is disabled. The HTTP
+    request is written directly to the forwarded socket; no local port is opened.
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        pod_name (str): Pod to scrape.
+        namespace (str): Namespace of the pod.
+        port (int): Metrics port of the pod.
+        path (str): Metrics path.
+        timeout (float): Socket timeout in seconds.
+
+    Returns:
+        str: Exposition text.
+    """
+    from kubernetes.stream import portforward
+
+    forward = portforward(core_api.connect_get_namespaced_pod_portforward, pod_name, namespace, ports=str(port))
+    sock = forward.socket(port)
+    sock.settimeout(timeout)
+    try:
+        sock.sendall(f"GET /{path} HTTP/1.0\r\nHost: localhost\r\nAccept: text/plain\r\n\r\n".encode())
+        response = bytearray()
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+    finally:
+        sock.close()
+        forward.close()
+    head, _, body = bytes(response).partition(b"\r\n\r\n")
+    status = head.split(b"\r\n", 1)[0].decode(errors="replace")
+    if " 200 " not in f"{status} ":
+        raise RuntimeError(f"Scraping {pod_name}:{port}/{path} failed: {status}")
+    return body.decode()
+
+
+def snapshot(k8s_client, async_k8s_client, pod_names, namespace, port, path="metrics", method="proxy",
+             previous=None):
+    """
+    Scrape pods and combine their samples.
+
+    Pods that can't be scraped are logged and left out, or keep their samples
+    from `previous`: a missed scrape must not look like a restart to delta().
+
+    Args:
+        k8s_client (callable): Returns a Kubernetes API client for an API type.
+        async_k8s_client (AsyncKubernetesClient): Async client (proxy method).
+        pod_names (list): Pods to scrape.
+        namespace (str): Namespace of the pods.
+        port (int): Metrics port of the pods.
+        path (str): Metrics path.
+        method (str): "proxy" (API server pod proxy, concurrent) or "port-forward".
+        previous (MetricsSnapshot): Earlier snapshot of the same pods, if any.
+
+    Returns:
+        MetricsSnapshot: Samples of the pods that answered (and of the others
+            found in `previous`).
+    """
+    timestamp = time.time()
+    if method == "proxy":
+        texts = async_k8s_client.run(scrape_pods(async_k8s_client, pod_names, namespace, port, path))
+    elif method == "port-forward":
+        core_api = k8s_client("CoreV1Api")
+        texts = {}
+        for pod_name in pod_names:
+            try:
+                texts[pod_name] = scrape_pod_port_forward(core_api, pod_name, namespace, port, path)
+            except Exception as e:
+                texts[pod_name] = e
+    else:
+        raise ValueError(f"Invalid scrape method: {method}. Use 'proxy' or 'port-forward'.")
+
+    pods = {}
+    scraped = 0
+    for pod_name, text in texts.items():
+        if isinstance(text, Exception):
+            logger.warning(f"Failed to scrape pod '{pod_name}': {text}")
+            # The counters went on growing: the next difference covers both intervals
+            if previous is not None and pod_name in previous.pods:
+                pods[pod_name] = previous.pods[pod_name]
+            continue
+        pods[pod_name] = parse_metrics(text)
+        scraped += 1
+    logger.info(f"Scraped {scraped}/{len(pod_names)} pods")
+    return MetricsSnapshot(pods, timestamp)
@@ -0,0 +1,184 @@
+"""
+Inline SVG/HTML charts for the pytest-html report.
+
+Everything is rendered as self-contained markup (no scripts, no external
+assets), so the charts survive --self-contained-html and e-mail attachments.
+Charts are drawn from aggregated data (LogHistogram, TimeSeries), so their
+size does not grow with the number of samples.
+"""
+import math
+from html import escape
+
+_WIDTH = 560
+_HEIGHT = 200
+_MARGIN_LEFT = 56
+_MARGIN_BOTTOM = 32
+_MARGIN_TOP = 24
+_BAR_COLOR = "#4a7ebb"
+_VERDICT_COLORS = {"regression": "#f8d7da", "improvement": "#d4edda"}
+
+
+def _format_value(value, unit):
+    if value is None:
+        return "-"
+    if unit == "seconds":
+        return f"{value * 1000:.3g} ms" if value < 1 else f"{value:.3g} s"
+    return f"{value:.4g} {unit}".strip()
+
+
+def _axis(x0, y0, x1, y1):
+    return f'<line x1="{x0}" y1="{y0}" x2="{x1}" y2="{y1}" stroke="#555" stroke-width="1"/>'
+
+
+def _text(x, y, content, anchor="middle", size=10, weight="normal"):
+    return (f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" font-size="{size}" '
+            f'font-family="sans-serif" font-weight="{weight}">{escape(str(content))}</text>')
+
+
+def histogram_svg(histogram, title, unit="seconds", bins=60):
+    """
+    Render a LogHistogram as a bar chart on a logarithmic value axis.
+
+    The histogram's buckets are regrouped into at most `bins` bars spanning
+    [min, max]; dashed lines mark p50, p90 and p99.
+
+    Args:
+        histogram (LogHistogram): Values to plot.
+        title (str): Chart title.
+        unit (str): Unit of the values.
+        bins (int): Maximum number of bars.
+
+    Returns:
+        str: SVG markup.
+    """
+    plot_width = _WIDTH - _MARGIN_LEFT - 16
+    plot_height = _HEIGHT - _MARGIN_TOP - _MARGIN_BOTTOM
+    parts = [_text(_WIDTH / 2, 14, f"{title} (n={histogram.count})", size=12, weight="bold")]
+
+    positive = [(lower, upper, count) for lower, upper, count in histogram.buckets() if upper > 0]
+    if positive:
+        low = math.log(positive[0][0])
+        high = math.log(positive[-1][1])
+        span = max(high - low, 1e-9)
+        bars = [0] * bins
+        for lower, upper, count in positive:
+            center = (math.log(lower) + math.log(upper)) / 2
+            bars[min(int((center - low) / span * bins), bins - 1)] += count
+        tallest = max(bars)
+        bar_width = plot_width / bins
+        for i, count in enumerate(bars):
+            if count:
+                bar_height = count / tallest * plot_height
+                parts.append(
+                    f'<rect x="{_MARGIN_LEFT + i * bar_width:.1f}" y="{_MARGIN_TOP + plot_height - bar_height:.1f}" '
+                    f'width="{max(bar_width - 1, 1):.1f}" height="{bar_height:.1f}" fill="{_BAR_COLOR}">'
+                    f'<title>{count}</title></rect>'
+                )
+
+        def x_position(value):
+            return _MARGIN_LEFT + (math.log(value) - low) / span * plot_width
+
+        for label, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+            value = histogram.quantile(q)
+            if value and value > 0:
+                x = min(max(x_position(value), _MARGIN_LEFT), _MARGIN_LEFT + plot_width)
+                parts.append(f'<line x1="{x:.1f}" y1="{_MARGIN_TOP}" x2="{x:.1f}" '
+                             f'y2="{_MARGIN_TOP + plot_height}" stroke="#c0392b" stroke-dasharray="3,2"/>')
+                parts.append(_text(x, _MARGIN_TOP - 2, f"{label} {_format_value(value, unit)}", size=9))
+        parts.append(_text(_MARGIN_LEFT, _HEIGHT - 8, _format_value(math.exp(low), unit), anchor="start"))
+        parts.append(_text(_MARGIN_LEFT + plot_width, _HEIGHT - 8, _format_value(math.exp(high), unit), anchor="end"))
+        parts.append(_text(_MARGIN_LEFT - 6, _MARGIN_TOP + 8, tallest, anchor="end"))
+    if histogram.zero_count:
+        parts.append(_text(_MARGIN_LEFT - 6, _HEIGHT - 8, f"<=0: {histogram.zero_count}", anchor="end", size=9))
+
+    parts.append(_axis(_MARGIN_LEFT, _MARGIN_TOP + plot_height, _MARGIN_LEFT + plot_width, _MARGIN_TOP + plot_height))
+    parts.append(_axis(_MARGIN_LEFT, _MARGIN_TOP, _MARGIN_LEFT, _MARGIN_TOP + plot_height))
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}" height="{_HEIGHT}" '
+            f'viewBox="0 0 {_WIDTH} {_HEIGHT}">{"".join(parts)}</svg>')
+
+
+def series_svg(points, title, unit="bytes/s"):
+    """
+    Render (seconds, value) points as a line chart, e.g. throughput over time.
+
+    Args:
+        points (list): (seconds since start, value) tuples, e.g. TimeSeries.rates().
+        title (str): Chart title.
+        unit (str): Unit of the values.
+
+    Returns:
+        str: SVG markup.
+    """
+    plot_width = _WIDTH - _MARGIN_LEFT - 16
+    plot_height = _HEIGHT - _MARGIN_TOP - _MARGIN_BOTTOM
+    parts = [_text(_WIDTH / 2, 14, title, size=12, weight="bold")]
+    if points:
+        last_time = max(points[-1][0], 1e-9)
+        peak = max(value for _, value in points) or 1
+        coordinates = " ".join(
+            f"{_MARGIN_LEFT + t / last_time * plot_width:.1f},{_MARGIN_TOP + plot_height - v / peak * plot_height:.1f}"
+            for t, v in points
+        )
+        parts.append(f'<polyline points="{coordinates}" fill="none" stroke="{_BAR_COLOR}" stroke-width="1.5"/>')
+        parts.append(_text(_MARGIN_LEFT - 6, _MARGIN_TOP + 8, _format_value(peak, unit), anchor="end", size=9))
+        parts.append(_text(_MARGIN_LEFT, _HEIGHT - 8, "0s", anchor="start"))
+        parts.append(_text(_MARGIN_LEFT + plot_width, _HEIGHT - 8, f"{last_time:.0f}s", anchor="end"))
+    parts.append(_axis(_MARGIN_LEFT, _MARGIN_TOP + plot_height, _MARGIN_LEFT + plot_width, _MARGIN_TOP + plot_height))
+    parts.append(_axis(_MARGIN_LEFT, _MARGIN_TOP, _MARGIN_LEFT, _MARGIN_TOP + plot_height))
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{_WIDTH}" height="{_HEIGHT}" '
+            f'viewBox="0 0 {_WIDTH} {_HEIGHT}">{"".join(parts)}</svg>')
+
+
+def comparison_html(results, baseline):
+    """
+    Render baseline comparison results (BenchmarkStore.compare()) as an HTML table.
+
+    Args:
+        results (list): Comparison results.
+        baseline (str): Baseline selector, shown in the caption.
+
+    Returns:
+        str: HTML markup.
+    """
+    rows = []
+    for result in results:
+        unit = result.get("unit", "")
+        change = f"{result['change'] * 100:+.1f}%" if result["change"] is not None else "-"
+        p_value = f"{result['p_value']:.3g}" if result["p_value"] is not None else "-"
+        color = _VERDICT_COLORS.get(result["verdict"], "transparent")
+        rows.append(
+            f'<tr style="background:{color}"><td>{escape(result["benchmark"])}</td>'
+            f'<td>{_format_value(result["baseline_median"], unit)} (n={result["baseline_n"]})</td>'
+            f'<td>{_format_value(result["current_median"], unit)} (n={result["current_n"]})</td>'
+            f'<td>{change}</td><td>{p_value}</td><td>{escape(result["verdict"])}</td></tr>'
+        )
+    return (
+        f'<table style="border-collapse:collapse;margin:8px 0" border="1" cellpadding="4">'
+        f'<caption style="text-align:left;font-weight:bold">Baseline comparison ({escape(baseline)})</caption>'
+        f'<tr><th>Benchmark</th><th>Baseline median</th><th>Current median</th><th>Change</th>'
+        f'<th>p</th><th>Verdict</th></tr>{"".join(rows)}</table>'
+    )
+
+
+def performance_section(histograms, series, comparison=None, baseline=None):
+    """
+    Build the performance section attached to a test in the HTML report.
+
+    Args:
+        histograms (dict): Benchmark name -> (LogHistogram, unit).
+        series (dict): Series name -> (TimeSeries, unit).
+        comparison (list): Baseline comparison results, if any.
+        baseline (str): Baseline selector.
+
+    Returns:
+        str: HTML markup.
+    """
+    parts = ['<div class="performance"><h4>Performance</h4>']
+    if comparison:
+        parts.append(comparison_html(comparison, baseline or ""))
+    for name, (histogram, unit) in sorted(histograms.items()):
+        parts.append(histogram_svg(histogram, name, unit))
+    for name, (time_series, unit) in sorted(series.items()):
+        parts.append(series_svg(time_series.rates(), name, f"{unit}/s"))
+    parts.append("</div>")
+    return "".join(parts)
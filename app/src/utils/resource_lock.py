@@ -0,0 +1,200 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+
+def worker_id():
+    """
+    Identify the current pytest-xdist worker.
+
+    Returns:
+        str: The xdist worker id (e.g. "gw0"), or "main" when not running under xdist.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+def _micro_time(value):
+    # Lease times are MicroTime, which the API server parses with exactly six fractional digits
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class LeaseLock:
+    """
+    Exclusive lock on a shared cluster resource backed by a coordination.k8s.io Lease.
+
+    Only one holder (pytest worker, or another test run against the same cluster)
+    can hold a lease at a time. The holder renews the lease in the background; if
+    it dies, the lease expires after lease_duration seconds and can be taken over.
+    A holder that loses its lease records why in `lost`; check() raises then.
+    """
+
+    def __init__(self, k8s_client, name, config_file="config/settings.toml"):
+        """
+        Prepares a lock for the named resource.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            name (str): Name of the shared resource; used as the Lease name.
+            config_file (str): Path to the configuration file.
+        """
+        parallel = load_config(config_file).get("parallel", {})
+        self.k8s_client = k8s_client
+        self.name = f"gcs-bdd-lock-{name}"
+        self.namespace = parallel.get("lease_namespace", "default")
+        self.lease_duration = parallel.get("lease_duration", 60)
+        self.retry_interval = parallel.get("lock_retry_interval", 5)
+        self.timeout = parallel.get("lock_timeout", 3600)
+        self.holder = f"{socket.gethostname()}-{os.getpid()}-{worker_id()}"
+        self._stop_renewal = threading.Event()
+        self._renewal_thread = None
+        self.lost = None
+
+    def _lease_body(self, acquire_time, resource_version=None):
+        now = _micro_time(datetime.now(timezone.utc))
+        metadata = {"name": self.name, "namespace": self.namespace}
+        if resource_version:
+            metadata["resourceVersion"] = resource_version
+        return {
+            "apiVersion": "coordination.k8s.io/v1",
+            "kind": "Lease",
+            "metadata": metadata,
+            "spec": {
+                "holderIdentity": self.holder,
+                "leaseDurationSeconds": self.lease_duration,
+                "acquireTime": acquire_time or now,
+                "renewTime": now,
+            },
+        }
+
+    def _is_expired(self, lease):
+        spec = lease.spec
+        if not spec.holder_identity or spec.renew_time is None:
+            return True
+        duration = spec.lease_duration_seconds or self.lease_duration
+        return (datetime.now(timezone.utc) - spec.renew_time).total_seconds() > duration
+
+    def _try_acquire(self):
+        from kubernetes.client.rest import ApiException
+
+        coordination_api = self.k8s_client("CoordinationV1Api")
+        try:
+            coordination_api.create_namespaced_lease(namespace=self.namespace, body=self._lease_body(None))
+            return True
+        except ApiException as e:
+            if e.status != 409:
+                raise
+
+        # The lease exists: take it over only if its holder stopped renewing it
+        lease = coordination_api.read_namespaced_lease(name=self.name, namespace=self.namespace)
+        if lease.spec.holder_identity != self.holder and not self._is_expired(lease):
+            logger.info(f"Lease '{self.name}' is held by {lease.spec.holder_identity}, waiting...")
+            return False
+        try:
+            coordination_api.replace_namespaced_lease(
+                name=self.name,
+                namespace=self.namespace,
+                body=self._lease_body(None, resource_version=lease.metadata.resource_version)
+            )
+            return True
+        except ApiException as e:
+            # 409: somebody else took it over between our read and replace
+            if e.status != 409:
+                raise
+            return False
+
+    def _renew(self):
+        coordination_api = self.k8s_client("CoordinationV1Api")
+        renewed_at = time.time()
+        while not self._stop_renewal.wait(self.lease_duration / 3):
+            try:
+                lease = coordination_api.read_namespaced_lease(name=self.name, namespace=self.namespace)
+                if lease.spec.holder_identity != self.holder:
+                    self.lost = f"taken over by {lease.spec.holder_identity}"
+                    logger.error(f"Lost lease '{self.name}': {self.lost}")
+                    return
+                coordination_api.replace_namespaced_lease(
+                    name=self.name,
+                    namespace=self.namespace,
+                    body=self._lease_body(
+                        # A lease written without acquireTime gets the current time
+                        _micro_time(lease.spec.acquire_time) if lease.spec.acquire_time else None,
+                        resource_version=lease.metadata.resource_version
+                    )
+                )
+                renewed_at = time.time()
+            except Exception as e:
+                # API errors, connection errors and malformed leases alike: the thread keeps
+                # retrying, and past its duration the lease may already have been taken over
+                logger.warning(f"Failed to renew lease '{self.name}': {getattr(e, 'reason', None) or str(e)}")
+                if time.time() - renewed_at > self.lease_duration:
+                    self.lost = f"not renewed for {time.time() - renewed_at:.0f}s"
+                    logger.error(f"Lost lease '{self.name}': {self.lost}")
+                    return
+
+    def check(self):
+        """
+        Fail if the lease was lost while held.
+
+        Raises:
+            RuntimeError: If the lease was taken over or could not be renewed in time.
+        """
+        if self.lost:
+            raise RuntimeError(f"Lease '{self.name}' was lost while held ({self.lost}); the shared "
+                               f"resource may have been changed by another holder")
+
+    def acquire(self):
+        """
+        Block until the lease is held by this process.
+
+        Raises:
+            TimeoutError: If the lease could not be acquired within lock_timeout seconds.
+        """
+        deadline = time.time() + self.timeout
+        start_time = time.time()
+        while not self._try_acquire():
+            if time.time() >= deadline:
+                raise TimeoutError(f"Timed out after {self.timeout}s waiting for lease '{self.name}'")
+            time.sleep(self.retry_interval)
+        logger.info(f"Acquired lease '{self.name}' as {self.holder} after {time.time() - start_time:.1f}s")
+        self.lost = None
+
+        self._stop_renewal.clear()
+        self._renewal_thread = threading.Thread(target=self._renew, name=f"lease-{self.name}", daemon=True)
+        self._renewal_thread.start()
+
+    def release(self):
+        """
+        Stop renewing the lease and delete it if this process still holds it.
+        """
+        from kubernetes.client.rest import ApiException
+
+        self._stop_renewal.set()
+        if self._renewal_thread is not None:
+            self._renewal_thread.join()
+            self._renewal_thread = None
+
+        coordination_api = self.k8s_client("CoordinationV1Api")
+        try:
+            lease = coordination_api.read_namespaced_lease(name=self.name, namespace=self.namespace)
+            if lease.spec.holder_identity == self.holder:
+                coordination_api.delete_namespaced_lease(
+                    name=self.name,
+                    namespace=self.namespace,
+                    body={"preconditions": {"resourceVersion": lease.metadata.resource_version}}
+                )
+                logger.info(f"Released lease '{self.name}'")
+        except ApiException as e:
+            logger.warning(f"Failed to release lease '{self.name}': {e.reason}")
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
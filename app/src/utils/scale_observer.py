@@ -0,0 +1,372 @@
+import json
+import os
+import re
+import threading
+import time
+from src.utils.config_util import load_config
+from src.utils.histogram import LogHistogram
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# Phases of a pod's start-up, measured from its conditions and events
+PHASES = ("scheduling_delay", "autoscaler_wait", "image_pull", "volume_setup", "container_start", "total")
+
+
+def _timestamp(value):
+    return value.timestamp() if value is not None else None
+
+
+def _condition_time(conditions, condition_type, status="True"):
+    for condition in conditions or []:
+        if condition.type == condition_type and condition.status == status:
+            return _timestamp(condition.last_transition_time)
+    return None
+
+
+class _PodRecord:
+    __slots__ = ("name", "node", "created", "unschedulable", "scheduled", "initialized", "containers_ready",
+                 "ready", "scale_up_triggered", "pulling", "pulled", "deleted")
+
+    def __init__(self, name):
+        self.name = name
+        self.node = None
+        self.created = self.unschedulable = self.scheduled = self.initialized = None
+        self.containers_ready = self.ready = self.scale_up_triggered = self.deleted = None
+        self.pulling = []
+        self.pulled = []
+
+    def phases(self):
+        """Start-up phase durations in seconds (None where unknown)."""
+        def between(start, end):
+            return end - start if start is not None and end is not None and end >= start else None
+
+        image_pull = None
+        if self.pulling and self.pulled:
+            image_pull = between(min(self.pulling), max(self.pulled))
+        volume_setup = between(self.scheduled, self.initialized)
+        if volume_setup is not None and image_pull is not None:
+            # Init container images are pulled before Initialized: don't count them twice
+            volume_setup = max(volume_setup - image_pull, 0.0)
+        return {
+            "scheduling_delay": between(self.created, self.scheduled),
+            "autoscaler_wait": between(self.scale_up_triggered, self.scheduled),
+            "image_pull": image_pull,
+            "volume_setup": volume_setup,
+            "container_start": between(self.initialized, self.containers_ready),
+            "total": between(self.created, self.ready),
+        }
+
+
+class _NodeRecord:
+    __slots__ = ("name", "created", "ready", "deleted", "scale_down_marked")
+
+    def __init__(self, name):
+        self.name = name
+        self.created = self.ready = self.deleted = self.scale_down_marked = None
+
+
+class ScaleObserver:
+    """
+    Timeline of a scale-up or scale-down, built from watches.
+
+    Background threads watch the deployment's pods, the nodes, the events of
+    the deployment namespace and the cluster-autoscaler-status ConfigMap.
+    From pod conditions and events the observer derives, per pod, how long it
+    waited for scheduling, for an autoscaler-provisioned node, for image pulls,
+    for volume setup (GCS FUSE mount and init containers) and for containers
+    to start; from node objects, how long new nodes took to become Ready.
+    """
+
+    def __init__(self, k8s_client, config_file="config/settings.toml"):
+        """
+        Initializes a stopped observer for the gcs-fuse deployment.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            config_file (str): Path to the configuration file.
+        """
+        config = load_config(config_file)
+        self.k8s_client = k8s_client
+        self.namespace = config["gcs_fuse"]["namespace"]
+        self.label_selector = f"app={config['gcs_fuse']['app_label']}"
+        self.watch_timeout = config.get("scaling", {}).get("watch_timeout", 60)
+        self.pods = {}
+        self.nodes = {}
+        self.timeline = []
+        self.autoscaler_status = []
+        self.name = None
+        self.started_at = None
+        self.stopped_at = None
+        self._initial_nodes = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watches = []
+        self._threads = []
+
+    def _add(self, when, kind, name, what):
+        self.timeline.append((when or time.time(), kind, name, what))
+
+    def _pod(self, name):
+        if name not in self.pods:
+            self.pods[name] = _PodRecord(name)
+        return self.pods[name]
+
+    def _node(self, name):
+        if name not in self.nodes:
+            self.nodes[name] = _NodeRecord(name)
+        return self.nodes[name]
+
+    def _on_pod(self, event_type, pod):
+        record = self._pod(pod.metadata.name)
+        conditions = pod.status.conditions if pod.status else None
+        if record.created is None:
+            record.created = _timestamp(pod.metadata.creation_timestamp)
+            self._add(record.created, "pod", record.name, "created")
+        if record.unschedulable is None and _condition_time(conditions, "PodScheduled", "False") is not None:
+            record.unschedulable = _condition_time(conditions, "PodScheduled", "False")
+            self._add(record.unschedulable, "pod", record.name, "pending (unschedulable)")
+        for attribute, condition_type in (("scheduled", "PodScheduled"), ("initialized", "Initialized"),
+                                          ("containers_ready", "ContainersReady"), ("ready", "Ready")):
+            if getattr(record, attribute) is None:
+                value = _condition_time(conditions, condition_type)
+                if value is not None:
+                    setattr(record, attribute, value)
+                    self._add(value, "pod", record.name, attribute.replace("_", " "))
+        if pod.spec and pod.spec.node_name:
+            record.node = pod.spec.node_name
+        if event_type == "DELETED" and record.deleted is None:
+            record.deleted = time.time()
+            self._add(record.deleted, "pod", record.name, "deleted")
+
+    def _on_node(self, event_type, node):
+        name = node.metadata.name
+        record = self._node(name)
+        if record.created is None:
+            record.created = _timestamp(node.metadata.creation_timestamp)
+            if name not in self._initial_nodes:
+                self._add(record.created, "node", name, "created")
+        if record.ready is None:
+            record.ready = _condition_time(node.status.conditions if node.status else None, "Ready")
+            if record.ready is not None and name not in self._initial_nodes:
+                self._add(record.ready, "node", name, "ready")
+        if event_type == "DELETED" and record.deleted is None:
+            record.deleted = time.time()
+            self._add(record.deleted, "node", name, "deleted")
+
+    def _on_event(self, event_type, event):
+        if event_type == "DELETED":
+            return
+        involved = event.involved_object
+        when = _timestamp(event.event_time or event.last_timestamp or event.first_timestamp
+                          or event.metadata.creation_timestamp)
+        if involved.kind == "Pod":
+            # Events can arrive before the pod watch has seen the pod: keep them
+            # all, pods outside the deployment are never marked created
+            record = self._pod(involved.name)
+            if event.reason == "TriggeredScaleUp" and record.scale_up_triggered is None:
+                record.scale_up_triggered = when
+            elif event.reason == "Pulling":
+                record.pulling.append(when)
+            elif event.reason == "Pulled":
+                record.pulled.append(when)
+        elif involved.kind == "Node" and event.reason in ("ScaleDown", "ScaleDownEmpty"):
+            node = self._node(involved.name)
+            if node.scale_down_marked is None:
+                node.scale_down_marked = when
+        else:
+            return
+        self._add(when, involved.kind.lower(), involved.name, f"{event.reason}: {(event.message or '')[:120]}")
+
+    def _on_autoscaler_status(self, event_type, configmap):
+        status = (configmap.data or {}).get("status", "")
+        # e.g. "ScaleUp:     InProgress (ready=3 registered=3)" per node group
+        scale_up = sorted(set(re.findall(r"ScaleUp:\s+(\w+)", status)))
+        scale_down = sorted(set(re.findall(r"ScaleDown:\s+(\w+)", status)))
+        summary = f"ScaleUp={','.join(scale_up) or '-'} ScaleDown={','.join(scale_down) or '-'}"
+        if not self.autoscaler_status or self.autoscaler_status[-1][1] != summary:
+            self.autoscaler_status.append((time.time(), summary))
+            self._add(time.time(), "autoscaler", "cluster-autoscaler-status", summary)
+
+    def _watch(self, handler, list_func, **kwargs):
+        from kubernetes import watch
+        from kubernetes.client.rest import ApiException
+
+        resource_version = None
+        while not self._stop.is_set():
+            w = watch.Watch()
+            self._watches.append(w)
+            try:
+                for event in w.stream(list_func, timeout_seconds=self.watch_timeout,
+                                      resource_version=resource_version, **kwargs):
+                    if self._stop.is_set():
+                        break
+                    resource_version = event["object"].metadata.resource_version
+                    with self._lock:
+                        handler(event["type"], event["object"])
+            except ApiException as e:
+                if e.status == 410:
+                    # History expired: relist
+                    resource_version = None
+                else:
+                    logger.warning(f"Watch for {handler.__name__} failed: {e.reason}")
+                    self._stop.wait(1)
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"Watch for {handler.__name__} failed: {str(e)}")
+                    self._stop.wait(1)
+
+    def start(self, name="scale"):
+        """
+        Start watching. Call before scaling so no transition is missed.
+
+        Args:
+            name (str): Name of the observed operation (e.g. "scale_up").
+        """
+        self.name = name
+        core_api = self.k8s_client("CoreV1Api")
+        self._initial_nodes = {node.metadata.name for node in core_api.list_node().items}
+        self.started_at = time.time()
+        self._add(self.started_at, "observer", "-", "started")
+        watches = (
+            (self._on_pod, core_api.list_namespaced_pod, {"namespace": self.namespace,
+                                                          "label_selector": self.label_selector}),
+            (self._on_node, core_api.list_node, {}),
+            (self._on_event, core_api.list_namespaced_event, {"namespace": self.namespace}),
+            (self._on_autoscaler_status, core_api.list_namespaced_config_map,
+             {"namespace": "kube-system", "field_selector": "metadata.name=cluster-autoscaler-status"}),
+        )
+        for handler, list_func, kwargs in watches:
+            thread = threading.Thread(target=self._watch, args=(handler, list_func), kwargs=kwargs,
+                                      name=f"scale-observer{handler.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Scale observer watching pods '{self.label_selector}', nodes, events and autoscaler status")
+
+    def stop(self):
+        """
+        Stop watching (idempotent).
+        """
+        if self.stopped_at is not None or self.started_at is None:
+            return
+        self._stop.set()
+        for w in self._watches:
+            w.stop()
+        for thread in self._threads:
+            thread.join(timeout=self.watch_timeout + 5)
+        self.stopped_at = time.time()
+
+    def new_nodes(self, ready_only=True):
+        """
+        Nodes that appeared after start().
+
+        Args:
+            ready_only (bool): Only nodes that became Ready.
+
+        Returns:
+            list: Node names.
+        """
+        with self._lock:
+            return [name for name, node in self.nodes.items()
+                    if name not in self._initial_nodes and (node.ready is not None or not ready_only)]
+
+    def removed_nodes(self):
+        """
+        Nodes deleted after start().
+
+        Returns:
+            list: Node names.
+        """
+        with self._lock:
+            return [name for name, node in self.nodes.items() if node.deleted is not None]
+
+    def scale_up_triggered(self):
+        """bool: Whether the cluster autoscaler reported a scale-up for any observed pod."""
+        with self._lock:
+            return any(pod.scale_up_triggered is not None for pod in self.pods.values())
+
+    def samples(self):
+        """
+        Samples of the pod start-up phases and node latencies, in seconds.
+
+        Only pods created after start() are counted.
+
+        Returns:
+            dict: Name -> list of values, for PHASES plus "node_provisioning"
+                (node created to Ready) and "node_removal" (scale-down event,
+                or observer start, to node deleted).
+        """
+        samples = {name: [] for name in PHASES + ("node_provisioning", "node_removal")}
+        with self._lock:
+            for pod in self.pods.values():
+                if pod.created is None or pod.created < self.started_at - 1:
+                    continue
+                for phase, value in pod.phases().items():
+                    if value is not None:
+                        samples[phase].append(value)
+            for name, node in self.nodes.items():
+                if name not in self._initial_nodes and node.created and node.ready:
+                    samples["node_provisioning"].append(node.ready - node.created)
+                if node.deleted is not None:
+                    samples["node_removal"].append(node.deleted - (node.scale_down_marked or self.started_at))
+        return samples
+
+    def report(self):
+        """
+        Log the timeline and a summary of the distributions.
+
+        Returns:
+            dict: Per-pod phases, per-phase percentiles and the timeline.
+        """
+        logger.info(f"Scale timeline of '{self.name}':")
+        summary = {}
+        for name, values in self.samples().items():
+            if values:
+                histogram = LogHistogram()
+                histogram.extend(values)
+                summary[name] = {"count": histogram.count, "p50": histogram.quantile(0.5),
+                                 "p90": histogram.quantile(0.9), "max": histogram.max}
+                logger.info(f"{name}: n={histogram.count} p50={summary[name]['p50']:.1f}s "
+                            f"p90={summary[name]['p90']:.1f}s max={histogram.max:.1f}s")
+        with self._lock:
+            timeline = sorted(entry for entry in self.timeline
+                              if entry[1] != "pod" or entry[2] not in self.pods
+                              or self.pods[entry[2]].created is not None)
+            pods = {name: pod.phases() for name, pod in self.pods.items()
+                    if pod.created is not None and pod.created >= self.started_at - 1}
+        for when, kind, name, what in timeline:
+            logger.debug(f"+{when - self.started_at:7.1f}s {kind:<10} {name:<40} {what}")
+        return {
+            "name": self.name,
+            "started_at": self.started_at,
+            "summary": summary,
+            "pods": pods,
+            "timeline": [{"t": when - self.started_at, "kind": kind, "name": name, "what": what}
+                         for when, kind, name, what in timeline],
+        }
+
+    def record(self, recorder, prefix):
+        """
+        Store the samples as benchmarks, e.g. "scale_up_image_pull".
+
+        Args:
+            recorder (BenchmarkRecorder): Benchmark recorder of the test.
+            prefix (str): Benchmark name prefix.
+        """
+        for name, values in self.samples().items():
+            if values:
+                recorder.record(f"{prefix}_{name}", values, unit="seconds")
+
+    def write(self, path):
+        """
+        Write report() as JSON.
+
+        Args:
+            path (str): Output file path.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+        logger.info(f"Wrote scale timeline to {path}")
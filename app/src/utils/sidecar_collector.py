@@ -0,0 +1,243 @@
+import threading
+import time
+from src.utils.config_util import load_config
+from src.utils.logging_util import get_logger
+from src.utils.prometheus_scrape import MetricsSnapshot, parse_metrics, snapshot
+
+logger = get_logger(__name__)
+
+# cAdvisor series kept for the sidecar container
+CADVISOR_METRICS = (
+    "container_cpu_usage_seconds_total",
+    "container_cpu_cfs_periods_total",
+    "container_cpu_cfs_throttled_periods_total",
+    "container_memory_working_set_bytes",
+)
+
+
+class SidecarCollector:
+    """
+    Samples the resource usage of the GCS FUSE sidecar of some pods.
+
+    A background thread takes, every [sidecar] interval seconds:
+
+    - CPU and memory of the sidecar container from the metrics API
+      (metrics.k8s.io), one list call per sample;
+    - CPU time, CFS throttling and working set from the kubelet's cAdvisor
+      endpoint of each node involved (only the sidecar's lines are parsed);
+    - gcsfuse's own Prometheus metrics, when [sidecar] gcsfuse_metrics_port is set.
+
+    The sidecar image has no shell, so nothing is exec'd in it.
+    """
+
+    def __init__(self, k8s_client, async_k8s_client=None, config_file="config/settings.toml"):
+        """
+        Initializes a stopped collector.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            async_k8s_client (AsyncKubernetesClient): Async client, for gcsfuse metrics.
+            config_file (str): Path to the configuration file.
+        """
+        self.config = load_config(config_file)["sidecar"]
+        self.k8s_client = k8s_client
+        self.async_k8s_client = async_k8s_client
+        self.container = self.config["container"]
+        self.pod_names = []
+        self.namespace = None
+        self.nodes = {}
+        # Pod name -> [(timestamp, cpu cores, memory bytes)] from the metrics API
+        self.usage = {}
+        self.cadvisor = []
+        self.gcsfuse = []
+        self.started_at = None
+        self.stopped_at = None
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample_metrics_api(self):
+        from kubernetes.client.rest import ApiException
+        from kubernetes.utils import parse_quantity
+
+        try:
+            pod_metrics = self.k8s_client("CustomObjectsApi").list_namespaced_custom_object(
+                "metrics.k8s.io", "v1beta1", self.namespace, "pods"
+            )
+        except ApiException as e:
+            logger.debug(f"Metrics API unavailable: {e.reason}")
+            return
+        now = time.time()
+        for item in pod_metrics.get("items", []):
+            pod_name = item["metadata"]["name"]
+            if pod_name not in self.usage:
+                continue
+            for container in item.get("containers", []):
+                if container["name"] == self.container:
+                    self.usage[pod_name].append((now, float(parse_quantity(container["usage"]["cpu"])),
+                                                 float(parse_quantity(container["usage"]["memory"]))))
+
+    def _sample_cadvisor(self):
+        core_api = self.k8s_client("CoreV1Api")
+        pods = {}
+        wanted = {f'pod="{pod_name}"' for pod_name in self.pod_names}
+        for node_name in set(self.nodes.values()):
+            try:
+                text = core_api.connect_get_node_proxy_with_path(name=node_name, path="metrics/cadvisor")
+            except Exception as e:
+                logger.debug(f"cAdvisor of node '{node_name}' unavailable: {str(e)}")
+                continue
+            # The endpoint lists every container of the node: parse only the sidecar's series
+            lines = [
+                line for line in text.splitlines()
+                if line.startswith(CADVISOR_METRICS) and f'container="{self.container}"' in line
+                and any(pod in line for pod in wanted)
+            ]
+            for key, value in parse_metrics("\n".join(lines) + "\n").items():
+                pod_name = dict(key[1]).get("pod")
+                # Drop the cAdvisor-specific labels so samples line up across scrapes
+                pods.setdefault(pod_name, {})[(key[0], ())] = \
+                    pods.get(pod_name, {}).get((key[0], ()), 0.0) + value
+        if pods:
+            self.cadvisor.append(MetricsSnapshot(pods))
+
+    def _sample_gcsfuse(self):
+        port = self.config["gcsfuse_metrics_port"]
+        if not port or self.async_k8s_client is None:
+            return
+        self.gcsfuse.append(snapshot(self.k8s_client, self.async_k8s_client, self.pod_names, self.namespace, port,
+                                     previous=self.gcsfuse[-1] if self.gcsfuse else None))
+
+    def _sample(self):
+        # A failing sample never fails the benchmark it runs alongside
+        try:
+            self._sample_metrics_api()
+            if self.config["cadvisor"]:
+                self._sample_cadvisor()
+            self._sample_gcsfuse()
+            self.samples += 1
+        except Exception as e:
+            logger.warning(f"Sidecar sample failed: {str(e)}")
+
+    def _run(self):
+        while not self._stop.wait(self.config["interval"]):
+            self._sample()
+
+    def start(self, pod_names, namespace):
+        """
+        Take a first sample and keep sampling in the background.
+
+        Args:
+            pod_names (list): Pods whose sidecar is measured.
+            namespace (str): Namespace of the pods.
+        """
+        self.pod_names = list(pod_names)
+        self.namespace = namespace
+        self.usage = {pod_name: [] for pod_name in self.pod_names}
+        core_api = self.k8s_client("CoreV1Api")
+        for pod_name in self.pod_names:
+            pod = core_api.read_namespaced_pod(name=pod_name, namespace=namespace)
+            self.nodes[pod_name] = pod.spec.node_name
+        self.started_at = time.time()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="sidecar-collector", daemon=True)
+        self._thread.start()
+        logger.info(f"Collecting '{self.container}' usage of {len(self.pod_names)} pods "
+                    f"every {self.config['interval']}s")
+
+    def stop(self):
+        """
+        Take a last sample and stop sampling (idempotent).
+        """
+        if self._thread is None or self.stopped_at is not None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.stopped_at = time.time()
+
+    def summary(self, bytes_read=None):
+        """
+        Resource usage of the sidecars between start() and stop().
+
+        Args:
+            bytes_read (float): Bytes the workload read meanwhile, for per-GB costs.
+
+        Returns:
+            dict: cpu_seconds (summed over pods), peak_cpu_cores and
+                peak_memory_bytes (of any pod), throttled_ratio (throttled/total
+                CFS periods), gcsfuse (MetricsSnapshot delta or None) and, when
+                bytes_read is given, cpu_seconds_per_gb and cost_per_gb.
+        """
+        duration = (self.stopped_at or time.time()) - self.started_at
+        samples = [sample for pod_samples in self.usage.values() for sample in pod_samples]
+        peak_cpu = max((cpu for _, cpu, _ in samples), default=None)
+        peak_memory = max((memory for _, _, memory in samples), default=None)
+        cpu_seconds = throttled_ratio = None
+        if len(self.cadvisor) >= 2:
+            window = self.cadvisor[-1].delta(self.cadvisor[0])
+            cpu_seconds = window.value("container_cpu_usage_seconds_total")
+            periods = window.value("container_cpu_cfs_periods_total")
+            throttled_ratio = window.value("container_cpu_cfs_throttled_periods_total") / periods if periods else 0.0
+            peak_working_set = max(
+                (pod_samples.get(("container_memory_working_set_bytes", ()), 0.0)
+                 for scrape in self.cadvisor for pod_samples in scrape.pods.values()),
+                default=0.0
+            )
+            peak_memory = max(peak_memory or 0.0, peak_working_set)
+        elif samples:
+            # No cAdvisor: integrate the metrics API's CPU rate over the samples of each pod
+            cpu_seconds = 0.0
+            for pod_samples in self.usage.values():
+                for (t0, cpu0, _), (t1, cpu1, _) in zip(pod_samples, pod_samples[1:]):
+                    cpu_seconds += (cpu0 + cpu1) / 2 * (t1 - t0)
+
+        result = {
+            "duration": duration,
+            "pods": len(self.pod_names),
+            "cpu_seconds": cpu_seconds,
+            "peak_cpu_cores": peak_cpu,
+            "peak_memory_bytes": peak_memory,
+            "throttled_ratio": throttled_ratio,
+            "gcsfuse": self.gcsfuse[-1].delta(self.gcsfuse[0]) if len(self.gcsfuse) >= 2 else None,
+        }
+        if bytes_read and cpu_seconds is not None:
+            gigabytes = bytes_read / 1e9
+            result["cpu_seconds_per_gb"] = cpu_seconds / gigabytes
+            # Price of the sidecar's resources: CPU time used plus the peak memory held for the duration
+            cost = (cpu_seconds / 3600 * self.config["cpu_price_per_core_hour"]
+                    + (peak_memory or 0.0) / 2 ** 30 * len(self.pod_names) * duration / 3600
+                    * self.config["memory_price_per_gib_hour"])
+            result["cost_per_gb"] = cost / gigabytes
+        return result
+
+    def record(self, recorder, prefix, bytes_read=None):
+        """
+        Log the summary and store it as benchmarks, e.g. "cache_sidecar_cpu_seconds".
+
+        Args:
+            recorder (BenchmarkRecorder): Benchmark recorder of the test.
+            prefix (str): Benchmark name prefix.
+            bytes_read (float): Bytes the workload read, for per-GB costs.
+
+        Returns:
+            dict: The summary.
+        """
+        summary = self.summary(bytes_read)
+        logger.info(
+            f"Sidecar usage over {summary['duration']:.1f}s ({self.samples} samples): "
+            + ", ".join(f"{key}={value:.4g}" for key, value in summary.items()
+                        if isinstance(value, float) and key != "duration")
+        )
+        units = {
+            "cpu_seconds": ("cpu_seconds", True),
+            "peak_memory_bytes": ("bytes", True),
+            "throttled_ratio": ("ratio", True),
+            "cpu_seconds_per_gb": ("cpu_seconds/GB", True),
+            "cost_per_gb": ("cost/GB", True),
+        }
+        for key, (unit, lower_is_better) in units.items():
+            value = summary.get(key)
+            if value is not None and not (key == "cost_per_gb" and value == 0):
+                recorder.record(f"{prefix}_sidecar_{key}", [value], unit=unit, lower_is_better=lower_is_better)
+        return summary
@@ -0,0 +1,297 @@
+import json
+import math
+import os
+from src.utils.histogram import LogHistogram
+from src.utils.logging_util import get_logger
+from src.utils.prometheus_scrape import histogram_quantile
+
+logger = get_logger(__name__)
+
+
+def mann_kendall(values):
+    """
+    One-sided Mann-Kendall trend test with the normal approximation.
+
+    The variance is corrected for ties and a continuity correction of 1 is
+    applied to S, as usual for this test.
+
+    Args:
+        values (list): Observations in time order.
+
+    Returns:
+        tuple: S statistic, z score and the p-value of the alternative
+            "the values tend to increase over time".
+    """
+    n = len(values)
+    s = sum(
+        (values[j] > values[i]) - (values[j] < values[i])
+        for i in range(n - 1) for j in range(i + 1, n)
+    )
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    tie_term = sum(t * (t - 1) * (2 * t + 5) for t in counts.values())
+    variance = (n * (n - 1) * (2 * n + 5) - tie_term) / 18
+    if variance <= 0:
+        return s, 0.0, 0.5
+    z = (s - 1 if s > 0 else s + 1 if s < 0 else 0) / math.sqrt(variance)
+    return s, z, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def sens_slope(times, values):
+    """
+    Sen's slope estimator: the median of the slopes between all pairs of points.
+
+    Args:
+        times (list): Time of each observation.
+        values (list): Observations.
+
+    Returns:
+        float: Slope in value units per time unit (0 with fewer than two points).
+    """
+    slopes = sorted(
+        (values[j] - values[i]) / (times[j] - times[i])
+        for i in range(len(values) - 1) for j in range(i + 1, len(values)) if times[j] != times[i]
+    )
+    if not slopes:
+        return 0.0
+    middle = len(slopes) // 2
+    return slopes[middle] if len(slopes) % 2 else (slopes[middle - 1] + slopes[middle]) / 2
+
+
+class SoakWindow:
+    """
+    What was observed during one window of a soak run.
+
+    Gauges (memory, cache usage, ...) are kept as LogHistograms and latencies
+    as the per-window increase of the reader's Prometheus histogram buckets,
+    so two adjacent windows merge exactly into one.
+    """
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        self.gauges = {}
+        self.latency = {}
+
+    def merge(self, other):
+        """
+        Absorb the adjacent window `other`.
+        """
+        self.start = min(self.start, other.start)
+        self.end = max(self.end, other.end)
+        for name, histogram in other.gauges.items():
+            if name in self.gauges:
+                self.gauges[name].merge(histogram)
+            else:
+                self.gauges[name] = histogram
+        for name, buckets in other.latency.items():
+            totals = self.latency.setdefault(name, {})
+            for upper_bound, count in buckets.items():
+                totals[upper_bound] = totals.get(upper_bound, 0.0) + count
+
+    def to_dict(self):
+        return {
+            "start": self.start,
+            "end": self.end,
+            "gauges": {name: histogram.to_dict() for name, histogram in self.gauges.items()},
+            "latency": {name: [[upper_bound, count] for upper_bound, count in sorted(buckets.items())]
+                        for name, buckets in self.latency.items()},
+        }
+
+
+class SoakAggregator:
+    """
+    Rolling-window statistics of a long run in bounded memory.
+
+    Samples are aggregated into windows of `window` seconds. When there would
+    be more than `max_windows` windows, adjacent windows are merged and the
+    window width doubles (like TimeSeries), so a run of any length keeps at
+    most `max_windows` windows of a few hundred counters each.
+    """
+
+    def __init__(self, window=300, max_windows=288, growth=1.02):
+        """
+        Initializes an empty aggregator.
+
+        Args:
+            window (float): Initial window width in seconds.
+            max_windows (int): Maximum number of windows kept.
+            growth (float): Bucket growth of the gauge histograms.
+        """
+        self.window = window
+        self.max_windows = max_windows
+        self.growth = growth
+        self.start = None
+        self.windows = {}
+
+    def _window(self, timestamp):
+        if self.start is None:
+            self.start = timestamp
+        index = int(max(timestamp - self.start, 0) // self.window)
+        while index >= self.max_windows:
+            self._downsample()
+            index //= 2
+        if index not in self.windows:
+            start = self.start + index * self.window
+            self.windows[index] = SoakWindow(start, start + self.window)
+        return self.windows[index]
+
+    def _downsample(self):
+        merged = {}
+        for index in sorted(self.windows):
+            window = self.windows[index]
+            if index // 2 in merged:
+                merged[index // 2].merge(window)
+            else:
+                merged[index // 2] = window
+        self.windows = merged
+        self.window *= 2
+        logger.debug(f"Soak windows merged to {self.window:g}s")
+
+    def add_gauge(self, timestamp, name, value):
+        """
+        Add a sample of a gauge (e.g. the sidecar's working set in bytes).
+        """
+        window = self._window(timestamp)
+        if name not in window.gauges:
+            window.gauges[name] = LogHistogram(self.growth)
+        window.gauges[name].add(value)
+
+    def add_latency(self, timestamp, name, buckets):
+        """
+        Add observations of a latency histogram.
+
+        Args:
+            timestamp (float): End of the scrape interval the observations belong to.
+            name (str): Series name.
+            buckets (list): (upper bound, cumulative count) pairs observed during
+                the interval (e.g. MetricsSnapshot.delta(...).buckets(name)).
+        """
+        totals = self._window(timestamp).latency.setdefault(name, {})
+        for upper_bound, count in buckets:
+            totals[upper_bound] = totals.get(upper_bound, 0.0) + count
+
+    def series(self, name, statistic="mean"):
+        """
+        One value per window for a series, skipping windows without data.
+
+        Args:
+            name (str): Gauge or latency series name.
+            statistic (str): For gauges "mean", "max" or "pNN"; for latencies "pNN".
+
+        Returns:
+            list: (window midpoint in seconds since the start, value) pairs.
+        """
+        points = []
+        for index in sorted(self.windows):
+            window = self.windows[index]
+            value = None
+            if name in window.gauges:
+                histogram = window.gauges[name]
+                if statistic == "mean":
+                    value = histogram.mean
+                elif statistic == "max":
+                    value = histogram.max
+                else:
+                    value = histogram.quantile(float(statistic[1:]) / 100)
+            elif name in window.latency:
+                value = histogram_quantile(float(statistic[1:]) / 100, list(window.latency[name].items()))
+            if value is not None:
+                points.append(((window.start + window.end) / 2 - self.start, value))
+        return points
+
+    def trend(self, name, statistic="mean", alpha=0.01, min_change=0.1, min_windows=4):
+        """
+        Test a series for an upward trend over the run.
+
+        A trend is significant when the Mann-Kendall p-value is below `alpha`
+        and the increase it implies over the run (Sen's slope times the time
+        covered) is more than `min_change` of the series' median, so that a
+        tiny but steady drift doesn't fail a run.
+
+        Args:
+            name (str): Series name.
+            statistic (str): See series().
+            alpha (float): Significance level.
+            min_change (float): Minimum relative increase over the run.
+            min_windows (int): Windows needed to test at all.
+
+        Returns:
+            dict: windows, p_value, slope (per hour), change (relative increase
+                over the run) and significant; p_value is None with too few windows.
+        """
+        points = self.series(name, statistic)
+        result = {"name": name, "statistic": statistic, "windows": len(points), "p_value": None,
+                  "slope": None, "change": None, "significant": False}
+        if len(points) < min_windows:
+            return result
+        times = [t for t, _ in points]
+        values = [value for _, value in points]
+        _, _, p_value = mann_kendall(values)
+        slope = sens_slope(times, values)
+        median = sorted(values)[len(values) // 2]
+        change = slope * (times[-1] - times[0]) / median if median else 0.0
+        result.update(p_value=p_value, slope=slope * 3600, change=change,
+                      significant=p_value < alpha and change > min_change)
+        return result
+
+    def to_dict(self):
+        """
+        JSON-serializable form of the windows.
+        """
+        return {"window": self.window, "start": self.start,
+                "windows": [self.windows[index].to_dict() for index in sorted(self.windows)]}
+
+    def write(self, path):
+        """
+        Write the windows as JSON, creating the directory if needed.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        logger.info(f"Soak windows written to {path}")
+
+
+def kubelet_stats(core_api, node_name):
+    """
+    Summary stats of a node's pods from the kubelet (/stats/summary through the node proxy).
+
+    Args:
+        core_api (CoreV1Api): Kubernetes core API client.
+        node_name (str): Name of the node.
+
+    Returns:
+        dict: The decoded summary.
+    """
+    # The generated client would turn the JSON into a Python repr for a 'str' response
+    response = core_api.connect_get_node_proxy_with_path(name=node_name, path="stats/summary",
+                                                         _preload_content=False)
+    return json.loads(response.data)
+
+
+def pod_usage(summary, namespace, pod_names, container, volume):
+    """
+    Working set of a container and usage of a volume for some pods of a kubelet summary.
+
+    Args:
+        summary (dict): kubelet_stats() result.
+        namespace (str): Namespace of the pods.
+        pod_names (iterable): Pods of interest.
+        container (str): Container name (e.g. the sidecar).
+        volume (str): Volume name (e.g. the gcsfuse file cache volume).
+
+    Returns:
+        dict: Pod name -> {"memory": bytes or None, "volume": bytes or None}.
+    """
+    wanted = set(pod_names)
+    usage = {}
+    for pod in summary.get("pods", []):
+        ref = pod.get("podRef", {})
+        if ref.get("namespace") != namespace or ref.get("name") not in wanted:
+            continue
+        memory = next((c.get("memory", {}).get("workingSetBytes") for c in pod.get("containers", [])
+                       if c.get("name") == container), None)
+        used = next((v.get("usedBytes") for v in pod.get("volume", []) if v.get("name") == volume), None)
+        usage[ref["name"]] = {"memory": memory, "volume": used}
+    return usage
@@ -0,0 +1,109 @@
+import json
+import statistics
+import time
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# Runs in each pod: `readers` processes wait for start_at, then each reads the
+# whole file sequentially and reports when it started, how long it took and
+# how many bytes it got.
+READ_SCRIPT = r'''
+import json, multiprocessing, sys, time
+path, readers, start_at, block_size = sys.argv[1], int(sys.argv[2]), float(sys.argv[3]), int(sys.argv[4])
+
+def read(index):
+    delay = start_at - time.time()
+    if delay > 0:
+        time.sleep(delay)
+    started_at = time.time()
+    total, error = 0, None
+    buffer = bytearray(block_size)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                total += count
+    except OSError as e:
+        error = str(e)
+    return {"reader": index, "started_at": started_at, "seconds": time.time() - started_at, "bytes": total,
+            "error": error}
+
+with multiprocessing.Pool(readers) as pool:
+    print("STAMPEDE " + json.dumps(pool.map(read, range(readers))))
+'''
+
+
+async def read_at_once(async_k8s_client, pod_names, namespace, path, readers_per_pod=1, start_at=None,
+                       block_size=1048576, container=None):
+    """
+    Have every reader of every pod read the same file from the same instant.
+
+    Args:
+        async_k8s_client (AsyncKubernetesClient): Async client.
+        pod_names (list): Pods to read in.
+        namespace (str): Namespace of the pods.
+        path (str): File path inside the pods.
+        readers_per_pod (int): Reading processes in each pod.
+        start_at (float): Common start time (time.time()); should leave time
+            for the execs to reach every pod.
+        block_size (int): Bytes per read() call.
+        container (str): Optional container name.
+
+    Returns:
+        list: One dict per reader: pod, reader, started_at, seconds, bytes and error.
+    """
+    start_at = start_at if start_at is not None else time.time() + 10
+    command = ["python3", "-c", READ_SCRIPT, path, str(readers_per_pod), f"{start_at:.3f}", str(block_size)]
+    outputs = await async_k8s_client.gather(
+        async_k8s_client.exec_command(pod_name, namespace, command, container=container)
+        for pod_name in pod_names
+    )
+    readers = []
+    for pod_name, output in zip(pod_names, outputs):
+        if isinstance(output, Exception):
+            raise RuntimeError(f"Readers failed in pod '{pod_name}': {output}")
+        # The prefix also keeps the client from decoding a JSON-only output into a repr
+        lines = [line for line in output.strip().splitlines() if line.startswith("STAMPEDE ")]
+        if not lines:
+            raise RuntimeError(f"Readers in pod '{pod_name}' reported nothing: {output.strip()[-500:]}")
+        for reader in json.loads(lines[-1][len("STAMPEDE "):]):
+            readers.append(dict(reader, pod=pod_name))
+    return readers
+
+
+def summarize(readers, size, fetched_bytes=None):
+    """
+    Summarize a same-object read.
+
+    Args:
+        readers (list): read_at_once() results.
+        size (int): Size of the object.
+        fetched_bytes (float): Bytes downloaded from GCS meanwhile (None if unknown).
+
+    Returns:
+        dict: readers, failed (readers with an error or a short read), fastest,
+            median and slowest read time, start_spread (seconds between the
+            first and last reader starting), aggregate_throughput (bytes/s
+            over the whole read) and, when fetched_bytes is known, fetched_bytes
+            and download_amplification (downloads of the object: 1.0 means
+            the readers shared a single download).
+    """
+    seconds = sorted(reader["seconds"] for reader in readers)
+    started = [reader["started_at"] for reader in readers]
+    ended = [reader["started_at"] + reader["seconds"] for reader in readers]
+    span = max(ended) - min(started)
+    summary = {
+        "readers": len(readers),
+        "failed": [reader for reader in readers if reader["error"] or reader["bytes"] != size],
+        "fastest": seconds[0],
+        "median": statistics.median(seconds),
+        "slowest": seconds[-1],
+        "start_spread": max(started) - min(started),
+        "aggregate_throughput": sum(reader["bytes"] for reader in readers) / span if span > 0 else 0.0,
+        "fetched_bytes": fetched_bytes,
+        "download_amplification": fetched_bytes / size if fetched_bytes is not None and size else None,
+    }
+    return summary
@@ -0,0 +1,385 @@
+import csv
+import io
+import json
+import os
+import re
+import time
+import uuid
+import zlib
+from src.utils.config_util import load_config
+from src.utils.data_provisioning import DataProvisioner
+from src.utils.histogram import LogHistogram
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+# Columns of a compact trace; "stream" (thread or process id) is optional
+TRACE_FIELDS = ("timestamp", "op", "path", "offset", "length", "stream")
+# Operations the replayer performs; others are counted as skipped
+OPS = ("open", "read", "stat", "list", "close")
+
+# Runs in the pod with the trace uploaded next to it. Each stream replays in
+# its own thread so concurrent accesses stay concurrent; latencies go into
+# log buckets that LogHistogram.from_dict() reads back.
+REPLAY_SCRIPT = r'''
+import csv, json, math, os, sys, threading, time
+trace, mount, speed, start_at, growth = sys.argv[1], sys.argv[2], float(sys.argv[3]), float(sys.argv[4]), float(sys.argv[5])
+with open(trace) as f:
+    rows = list(csv.DictReader(f))
+os.remove(trace)
+streams = {}
+for row in rows:
+    streams.setdefault(row.get("stream") or "0", []).append(row)
+t0 = min((float(row["timestamp"]) for row in rows), default=0.0)
+log_growth = math.log(growth)
+lock = threading.Lock()
+out = {"latency": {}, "errors": {}, "bytes": {}, "skipped": 0, "lag": 0.0}
+
+def record(op, latency, nbytes, error):
+    with lock:
+        h = out["latency"].setdefault(op, {"growth": growth, "counts": {}, "zero_count": 0, "count": 0,
+                                           "total": 0.0, "min": None, "max": None})
+        if latency > 0:
+            i = str(math.floor(math.log(latency) / log_growth))
+            h["counts"][i] = h["counts"].get(i, 0) + 1
+        else:
+            h["zero_count"] += 1
+        h["count"] += 1
+        h["total"] += latency
+        h["min"] = latency if h["min"] is None else min(h["min"], latency)
+        h["max"] = latency if h["max"] is None else max(h["max"], latency)
+        out["bytes"][op] = out["bytes"].get(op, 0) + nbytes
+        out["errors"][op] = out["errors"].get(op, 0) + error
+
+def run(rows):
+    fds = {}
+    for row in rows:
+        due = start_at + ((float(row["timestamp"]) - t0) / speed if speed > 0 else 0.0)
+        delay = due - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        elif speed > 0:
+            with lock:
+                out["lag"] = max(out["lag"], -delay)
+        op, path = row["op"], os.path.join(mount, row["path"].lstrip("/"))
+        nbytes, error = 0, 0
+        begin = time.perf_counter()
+        try:
+            if op == "read":
+                if path not in fds:
+                    fds[path] = os.open(path, os.O_RDONLY)
+                nbytes = len(os.pread(fds[path], int(row["length"] or 0), int(row["offset"] or 0)))
+            elif op == "open":
+                if path not in fds:
+                    fds[path] = os.open(path, os.O_RDONLY)
+            elif op == "close":
+                if path in fds:
+                    os.close(fds.pop(path))
+            elif op == "stat":
+                os.stat(path)
+            elif op == "list":
+                os.listdir(path)
+            else:
+                with lock:
+                    out["skipped"] += 1
+                continue
+        except OSError:
+            error = 1
+        record(op, time.perf_counter() - begin, nbytes, error)
+    for fd in fds.values():
+        os.close(fd)
+
+threads = [threading.Thread(target=run, args=(rows,)) for rows in streams.values()]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+out["elapsed"] = time.time() - start_at
+print("REPLAY " + json.dumps(out))
+'''
+
+
+def read_csv_trace(path):
+    """
+    Read a CSV trace with a header of TRACE_FIELDS (stream optional).
+
+    Returns:
+        list: Records (dicts), sorted by timestamp.
+    """
+    with open(path, newline="") as file:
+        records = [_record(row) for row in csv.DictReader(file)]
+    return sorted(records, key=lambda record: record["timestamp"])
+
+
+def read_parquet_trace(path):
+    """
+    Read a Parquet trace with TRACE_FIELDS columns (needs pyarrow).
+
+    Returns:
+        list: Records (dicts), sorted by timestamp.
+    """
+    try:
+        import pyarrow.parquet as parquet
+    except ImportError:
+        raise ImportError("pyarrow is required to read Parquet traces. Install it with 'pip install pyarrow'.")
+    records = [_record(row) for row in parquet.read_table(path).to_pylist()]
+    return sorted(records, key=lambda record: record["timestamp"])
+
+
+def _record(row):
+    return {
+        "timestamp": float(row["timestamp"]),
+        "op": row["op"],
+        "path": row["path"],
+        "offset": int(row.get("offset") or 0),
+        "length": int(row.get("length") or 0),
+        "stream": str(row.get("stream") or "0"),
+    }
+
+
+_STRACE_LINE = re.compile(
+    r"^(?:\[pid\s+)?(?P<pid>\d+)?\]?\s*(?P<time>\d+:\d+:\d+\.\d+|\d+\.\d+)\s+"
+    r"(?:(?P<call>\w+)\((?P<args>.*?)(?:\)\s+=\s+(?P<ret>-?\d+|\?).*| <unfinished \.\.\.>)"
+    r"|<\.\.\. (?P<resumed>\w+) resumed>(?P<rest>.*?)\)\s+=\s+(?P<resumed_ret>-?\d+|\?).*)$"
+)
+_QUOTED = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_STAT_CALLS = ("stat", "lstat", "newfstatat", "fstatat64", "statx")
+
+
+def _strace_seconds(value, previous):
+    """Seconds of an -tt (wall clock) or -ttt (epoch) timestamp, continuing past midnight."""
+    if ":" not in value:
+        return float(value)
+    hours, minutes, seconds = value.split(":")
+    result = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    while previous is not None and result < previous - 43200:
+        result += 86400
+    return result
+
+
+def parse_strace(lines, mount_path):
+    """
+    Convert `strace -f -tt -e trace=%file,read,pread64,lseek,close,getdents64` output to trace records.
+
+    open/openat of files under the mount become "open" operations, read and
+    pread64 on their descriptors "read" operations (read offsets follow the
+    file position, including lseek), stat calls "stat", the first getdents64
+    of an opened directory "list", and close "close". Other files and calls
+    are ignored. Descriptors are tracked for the whole trace, as in one process.
+
+    Args:
+        lines (iterable): strace output lines.
+        mount_path (str): Mount point; recorded paths are relative to it.
+
+    Returns:
+        list: Records (dicts) in time order, with the process id as stream.
+    """
+    prefix = mount_path.rstrip("/") + "/"
+    records = []
+    files = {}      # fd -> [relative path, position, listed]
+    pending = {}    # pid -> (time, call, args) of an unfinished call
+    previous = None
+    for line in lines:
+        match = _STRACE_LINE.match(line.strip())
+        if not match:
+            continue
+        pid = match.group("pid") or "0"
+        timestamp = _strace_seconds(match.group("time"), previous)
+        previous = timestamp
+        if match.group("resumed"):
+            if pid not in pending:
+                continue
+            timestamp, call, args = pending.pop(pid)
+            args += match.group("rest")
+            ret = match.group("resumed_ret")
+        elif match.group("ret") is None:
+            pending[pid] = (timestamp, match.group("call"), match.group("args"))
+            continue
+        else:
+            call, args, ret = match.group("call"), match.group("args"), match.group("ret")
+        ret = int(ret) if ret not in (None, "?") else -1
+
+        def add(op, path, offset=0, length=0):
+            records.append({"timestamp": timestamp, "op": op, "path": path, "offset": offset,
+                            "length": length, "stream": pid})
+
+        if call in ("open", "openat") or call in _STAT_CALLS:
+            quoted = _QUOTED.search(args)
+            if not quoted or not quoted.group(1).startswith(prefix):
+                continue
+            path = quoted.group(1)[len(prefix):]
+            if call in _STAT_CALLS:
+                if ret >= 0:
+                    add("stat", path)
+            elif ret >= 0:
+                files[ret] = [path, 0, False]
+                add("open", path)
+            continue
+
+        fd = args.split(",", 1)[0].strip()
+        if not fd.isdigit() or int(fd) not in files:
+            continue
+        state = files[int(fd)]
+        if call == "read":
+            length = int(args.rsplit(",", 1)[1])
+            add("read", state[0], state[1], length)
+            state[1] += max(ret, 0)
+        elif call in ("pread64", "pread"):
+            length, offset = (int(value) for value in args.rsplit(",", 2)[1:])
+            add("read", state[0], offset, length)
+        elif call in ("lseek", "_llseek") and ret >= 0:
+            state[1] = ret
+        elif call == "getdents64" and ret > 0 and not state[2]:
+            state[2] = True
+            add("list", state[0])
+        elif call == "close":
+            add("close", state[0])
+            del files[int(fd)]
+    # Resumed calls keep the time they started at
+    return sorted(records, key=lambda record: record["timestamp"])
+
+
+def load_trace(path, mount_path="/data"):
+    """
+    Load a trace by file type: .csv, .parquet, or anything else as strace output.
+
+    Args:
+        path (str): Trace file.
+        mount_path (str): Mount point the strace output refers to.
+
+    Returns:
+        list: Records (dicts) in time order.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return read_csv_trace(path)
+    if extension in (".parquet", ".pq"):
+        return read_parquet_trace(path)
+    with open(path) as file:
+        return parse_strace(file, mount_path)
+
+
+def write_csv_trace(records, file):
+    """
+    Write records as a compact CSV trace.
+
+    Args:
+        records (list): Trace records.
+        file (file): Text file object.
+    """
+    writer = csv.DictWriter(file, fieldnames=TRACE_FIELDS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(records)
+
+
+def partition(records, count, mode="replicate"):
+    """
+    Distribute a trace over pods.
+
+    Args:
+        records (list): Trace records.
+        count (int): Number of pods.
+        mode (str): "replicate" (every pod replays the whole trace) or "split"
+            (each path goes to one pod, so the pods together replay it once).
+
+    Returns:
+        list: One list of records per pod.
+    """
+    if mode == "replicate":
+        return [records] * count
+    if mode == "split":
+        parts = [[] for _ in range(count)]
+        for record in records:
+            parts[zlib.crc32(record["path"].encode()) % count].append(record)
+        return parts
+    raise ValueError(f"Invalid replay mode: {mode}. Use 'replicate' or 'split'.")
+
+
+class TraceReplayer:
+    """
+    Replays an access trace against the GCS FUSE mount of pods.
+
+    Each pod's part of the trace is uploaded over exec stdin and replayed by
+    REPLAY_SCRIPT (python3 in the pod), one thread per stream. All pods start
+    at a common time; timestamps are followed at `speed` times the original
+    rate, or ignored with speed 0. Pods report per-operation latency
+    histograms, errors and bytes, merged here.
+    """
+
+    def __init__(self, k8s_client, async_k8s_client, namespace, container=None, config_file="config/settings.toml"):
+        """
+        Initializes the replayer.
+
+        Args:
+            k8s_client (callable): Returns a Kubernetes API client for an API type.
+            async_k8s_client (AsyncKubernetesClient): Async client to run the replays concurrently.
+            namespace (str): Namespace of the pods.
+            container (str): Optional container name.
+            config_file (str): Path to the configuration file.
+        """
+        self.config = load_config(config_file)["replay"]
+        self.async_k8s_client = async_k8s_client
+        self.namespace = namespace
+        self.container = container
+        self.provisioner = DataProvisioner(k8s_client, namespace, container, config_file)
+
+    def replay(self, pod_names, records, speed=1.0, mode="replicate"):
+        """
+        Replay a trace on pods.
+
+        Args:
+            pod_names (list): Pods to replay on.
+            records (list): Trace records.
+            speed (float): Timing multiplier (2 replays twice as fast); 0 ignores timestamps.
+            mode (str): See partition().
+
+        Returns:
+            dict: latency (op -> LogHistogram), errors and bytes (op -> total),
+                skipped operations, lag (latest an operation started, seconds),
+                elapsed (longest pod replay, seconds) and pods.
+        """
+        replay_id = uuid.uuid4().hex[:12]
+        trace_paths = {}
+        for pod_name, part in zip(pod_names, partition(records, len(pod_names), mode)):
+            text = io.StringIO()
+            write_csv_trace(part, text)
+            data = text.getvalue().encode()
+            trace_paths[pod_name] = f"/tmp/trace-{replay_id}-{pod_name}.csv"
+            self.provisioner.upload(pod_name, trace_paths[pod_name], io.BytesIO(data), len(data))
+
+        start_at = time.time() + self.config["barrier_lead"]
+        arguments = [self.config["mount_path"], str(speed), f"{start_at:.3f}", str(self.config["histogram_growth"])]
+        logger.info(f"Replaying {len(records)} operations on {len(pod_names)} pods ({mode}, speed {speed:g})")
+
+        async def replays():
+            return await self.async_k8s_client.gather(
+                self.async_k8s_client.exec_command(pod_name, self.namespace,
+                                                   ["python3", "-c", REPLAY_SCRIPT, trace_paths[pod_name]] + arguments,
+                                                   container=self.container)
+                for pod_name in pod_names
+            )
+
+        outputs = self.async_k8s_client.run(replays())
+        result = {"latency": {}, "errors": {}, "bytes": {}, "skipped": 0, "lag": 0.0, "elapsed": 0.0,
+                  "pods": len(pod_names)}
+        for pod_name, output in zip(pod_names, outputs):
+            if isinstance(output, Exception):
+                raise RuntimeError(f"Replay failed in pod '{pod_name}': {output}")
+            # The prefix also keeps the client from decoding a JSON-only output into a repr
+            lines = [line for line in output.strip().splitlines() if line.startswith("REPLAY ")]
+            if not lines:
+                raise RuntimeError(f"Replay in pod '{pod_name}' reported nothing: {output.strip()[-500:]}")
+            report = json.loads(lines[-1][len("REPLAY "):])
+            for op, data in report["latency"].items():
+                histogram = LogHistogram.from_dict(data)
+                if op in result["latency"]:
+                    result["latency"][op].merge(histogram)
+                else:
+                    result["latency"][op] = histogram
+            for key in ("errors", "bytes"):
+                for op, value in report[key].items():
+                    result[key][op] = result[key].get(op, 0) + value
+            result["skipped"] += report["skipped"]
+            result["lag"] = max(result["lag"], report["lag"])
+            result["elapsed"] = max(result["elapsed"], report["elapsed"])
+        return result
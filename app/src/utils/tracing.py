@@ -0,0 +1,237 @@
+import contextlib
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from src.utils.logging_util import get_logger
+
+logger = get_logger(__name__)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation (test, step, API call, exec) with attributes.
+    """
+
+    __slots__ = ("name", "category", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "thread_id")
+
+    def __init__(self, name, category, parent=None, attributes=None):
+        self.name = name
+        self.category = category
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.thread_id = threading.get_ident()
+
+    @property
+    def duration(self):
+        """float: Duration in seconds (up to now if the span is still open)."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes):
+        """Add or update attributes on the span."""
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """
+    Lightweight in-process tracer.
+
+    Spans are kept in memory until export; the current span is tracked with a
+    context variable so nesting works across threads and asyncio tasks. When
+    the tracer is disabled, span() costs a single attribute check.
+    """
+
+    def __init__(self, max_spans=1_000_000):
+        """
+        Initializes a disabled tracer.
+
+        Args:
+            max_spans (int): Finished spans kept in memory; later spans are dropped.
+        """
+        self.enabled = False
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener):
+        """
+        Call a function with every finished span, whether or not spans are kept.
+
+        Args:
+            listener (callable): Called with the finished Span.
+        """
+        self._listeners.append(listener)
+
+    @property
+    def active(self):
+        """bool: Whether spans are being created (for export or for a listener)."""
+        return self.enabled or bool(self._listeners)
+
+    def current_span(self):
+        """Return the innermost open span of the current context, if any."""
+        return _current_span.get()
+
+    def start_span(self, name, category="internal", /, **attributes):
+        """
+        Open a span as a child of the current one and make it current.
+
+        Args:
+            name (str): Span name.
+            category (str): Span category (e.g. "test", "step", "k8s", "exec").
+            **attributes: Span attributes.
+
+        Returns:
+            tuple: The span and a token to pass to end_span().
+        """
+        span = Span(name, category, parent=_current_span.get(), attributes=attributes)
+        return span, _current_span.set(span)
+
+    def end_span(self, span, token=None, error=None):
+        """
+        Close a span and restore the previously current span.
+
+        Args:
+            span (Span): The span to close.
+            token (contextvars.Token): Token returned by start_span().
+            error (BaseException): Exception that ended the span, if any.
+        """
+        span.end_ns = time.time_ns()
+        if error is not None:
+            span.status = "error"
+            span.attributes.setdefault("error", f"{type(error).__name__}: {error}"[:500])
+        if token is not None:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Closed from a different context (e.g. a pytest hook pair); just clear it
+                _current_span.set(None)
+        if self.enabled:
+            with self._lock:
+                if len(self.spans) < self.max_spans:
+                    self.spans.append(span)
+                else:
+                    self.dropped += 1
+        for listener in self._listeners:
+            try:
+                listener(span)
+            except Exception as e:
+                logger.warning(f"Span listener failed: {e}")
+
+    @contextlib.contextmanager
+    def span(self, name, category="internal", /, **attributes):
+        """
+        Context manager tracing the enclosed block.
+
+        Yields:
+            Span: The open span, or None when tracing is off.
+        """
+        if not self.active:
+            yield None
+            return
+        span, token = self.start_span(name, category, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, token, error=e)
+            raise
+        self.end_span(span, token)
+
+    @contextlib.contextmanager
+    def attach(self, span):
+        """
+        Make a span current in this context, e.g. inside a coroutine run on another thread.
+
+        Args:
+            span (Span): Span to use as parent for spans opened in the block.
+        """
+        token = _current_span.set(span)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+    def export_chrome(self, path):
+        """
+        Write finished spans in Chrome trace event format (loadable in Perfetto).
+
+        Args:
+            path (str): Output file path.
+        """
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": dict(span.attributes, status=span.status),
+            }
+            for span in self.spans
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, default=str)
+        logger.info(f"Wrote {len(events)} spans to Chrome trace {path}")
+
+    def export_otlp(self, path, service_name="gcs-bdd-tests"):
+        """
+        Write finished spans as an OTLP/JSON ExportTraceServiceRequest.
+
+        Args:
+            path (str): Output file path.
+            service_name (str): Value of the service.name resource attribute.
+        """
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        spans = []
+        for span in self.spans:
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                # CLIENT for calls leaving the process, INTERNAL otherwise
+                "kind": 3 if span.category in ("k8s", "exec") else 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [attribute("category", span.category)]
+                + [attribute(key, value) for key, value in span.attributes.items()],
+                "status": {"code": 2 if span.status == "error" else 1},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            spans.append(otlp_span)
+
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": [attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }]
+        }
+        with open(path, "w") as file:
+            json.dump(request, file)
+        logger.info(f"Wrote {len(spans)} spans to OTLP file {path}")
+
+
+# Process-wide tracer used by the pytest hooks and the Kubernetes clients
+tracer = Tracer()